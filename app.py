@@ -1,7 +1,9 @@
 import os
-from flask import Flask, render_template, request, jsonify
+import json
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 from src.query_engine import QueryEngine
+from src.ingestion import IngestionJobQueue
 from pathlib import Path
 
 
@@ -11,7 +13,12 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app = Flask(__name__)
 # Initialize Query Engine
 engine = QueryEngine(llm_provider="gemini")
-documents_ready = False
+# Answer from already processed documents at once; re-ingest stale PDFs in the
+# background (one worker runs the check, the others skip it)
+engine.warm_start(UPLOAD_FOLDER)
+# Uploaded PDFs are ingested one at a time in the background; job status is
+# recorded on disk so a poll answered by another worker still finds the job
+ingestion_jobs = IngestionJobQueue(engine.ingest_file)
 
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
@@ -22,9 +29,8 @@ def index():
 
 @app.route("/ask", methods=["POST"])
 def ask():
-    global documents_ready
-
-    if not documents_ready:
+    engine.refresh()
+    if not engine.documents_ready:
         return jsonify({
             "answer": "📄 Please upload and process a PDF first."
         })
@@ -42,10 +48,41 @@ def ask():
         return jsonify({"answer": f"Error: {str(e)}"})
 
 
+
+def sse_event(data, event=None):
+    """Format one server-sent event."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+@app.route("/ask_stream", methods=["POST"])
+def ask_stream():
+    data = request.get_json()
+    question = data.get("question", "")
+
+    def generate():
+        engine.refresh()
+        if not engine.documents_ready:
+            yield sse_event({"delta": "📄 Please upload and process a PDF first."})
+        elif not question.strip():
+            yield sse_event({"delta": "Please enter a valid question."})
+        else:
+            try:
+                for piece in engine.query_stream(question):
+                    yield sse_event({"delta": piece})
+            except Exception as e:
+                yield sse_event({"error": f"Error: {str(e)}"}, event="error")
+        yield sse_event({}, event="done")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
     
 @app.route("/upload_pdf", methods=["POST"])
 def upload_pdf():
-    global documents_ready
     if "pdf" not in request.files:
         return jsonify({"error": "No file part"}), 400
 
@@ -60,17 +97,47 @@ def upload_pdf():
     pdf_dir = Path("data/pdfs")
     pdf_dir.mkdir(parents=True, exist_ok=True)
 
-    save_path = pdf_dir / file.filename
+    filename = secure_filename(file.filename)
+    save_path = pdf_dir / filename
     file.save(save_path)
 
-    # Ingesting documents after upload
-    engine.ingest_documents("data/pdfs")
-    documents_ready = True
+    # Only the uploaded file is ingested, on a background worker
+    job_id = ingestion_jobs.submit(str(save_path))
 
     return jsonify({
-        "message": "PDF uploaded and processed successfully",
-        "filename": file.filename
-    })
+        "message": "PDF uploaded, processing started",
+        "filename": filename,
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}"
+    }), 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = ingestion_jobs.get(job_id)
+
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    return jsonify(job)
+
+
+@app.route("/documents/<doc_id>", methods=["DELETE"])
+def delete_document(doc_id):
+    if not engine.delete_document(doc_id):
+        return jsonify({"error": "Unknown document"}), 404
+
+    # Otherwise the next consistency check would ingest it again
+    pdf_path = Path(UPLOAD_FOLDER) / f"{secure_filename(doc_id)}.pdf"
+    if pdf_path.exists():
+        pdf_path.unlink()
+
+    return jsonify({"message": "Document deleted", "doc_id": doc_id})
+
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    return jsonify(engine.cache_stats())
 
 
 
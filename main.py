@@ -49,12 +49,20 @@ def main():
     pdf_dir = Config.PDF_DIR
     pdf_files = list(pdf_dir.glob("*.pdf"))
     
-    if pdf_files:
+    # Serve previously processed documents right away
+    stored = engine.warm_start(str(pdf_dir), check=False)
+    
+    if stored:
+        print(f"✓ {stored} processed document(s) ready")
+        print("Checking for new or changed PDFs in the background...")
+        print()
+        engine.start_consistency_check(str(pdf_dir))
+    elif pdf_files:
         print(f"Found {len(pdf_files)} PDF file(s) in {pdf_dir}")
         print("Processing documents...")
         
         try:
-            results = engine.process_documents(str(pdf_dir))
+            results = engine.ingest_documents(str(pdf_dir))
             print(f"✓ Successfully processed {len(results)} document(s)")
             print()
             
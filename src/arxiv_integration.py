@@ -6,9 +6,9 @@ Provides function calling capability to search and fetch papers from ArXiv.
 from typing import Dict, List, Any, Optional
 import arxiv
 from datetime import datetime, timedelta
-import time
 
 from src.utils import setup_logging
+from src.resilience import RetryPolicy, get_circuit_breaker
 
 logger = setup_logging(__name__)
 
@@ -26,7 +26,10 @@ class ArxivIntegration:
             max_results: Maximum number of results to return per search
         """
         self.max_results = max_results
-        self.client = arxiv.Client()
+        # Retries are left to the retry policy so they are not multiplied
+        self.client = arxiv.Client(num_retries=0)
+        self.retry_policy = RetryPolicy()
+        self.breaker = get_circuit_breaker("arxiv")
         logger.info("ArXiv integration initialized")
     
     def search_papers(
@@ -50,31 +53,19 @@ class ArxivIntegration:
         
         max_results = max_results or self.max_results
         
-        # Retry logic for network issues
-        for attempt in range(3):
-            try:
-                search = arxiv.Search(
-                    query=query,
-                    max_results=max_results,
-                    sort_by=sort_by
-                )
-                
-                papers = []
-                for result in self.client.results(search):
-                    paper = self._format_paper(result)
-                    papers.append(paper)
-                
-                logger.info(f"Found {len(papers)} papers on ArXiv")
-                return papers
-                
-            except Exception as e:
-                if attempt < 2:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    logger.error(f"Error searching ArXiv: {str(e)}")
-                    raise
-        
-        return []
+        def search() -> List[Dict[str, Any]]:
+            search = arxiv.Search(
+                query=query,
+                max_results=max_results,
+                sort_by=sort_by
+            )
+            return [self._format_paper(result) for result in self.client.results(search)]
+        
+        # Retry network issues; fail fast while ArXiv keeps failing
+        papers = self.retry_policy.call(search, self.breaker, name="ArXiv search")
+        
+        logger.info(f"Found {len(papers)} papers on ArXiv")
+        return papers
     
     def _format_paper(self, result: arxiv.Result) -> Dict[str, Any]:
         """
@@ -0,0 +1,234 @@
+"""
+Context Packer Module
+Fills a per-model token budget with ranked chunks, without repeating the
+text that overlapping chunks share.
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.utils import setup_logging, count_tokens, truncate_to_tokens, Config
+
+logger = setup_logging(__name__)
+
+# Context window in tokens by model name prefix (longest matching prefix wins)
+MODEL_CONTEXT_WINDOWS = {
+    'gpt-3.5-turbo': 16385,
+    'gpt-4': 8192,
+    'gpt-4-32k': 32768,
+    'gpt-4-turbo': 128000,
+    'gpt-4-1106': 128000,
+    'gpt-4-0125': 128000,
+    'gpt-4o': 128000,
+    'gpt-4.1': 1047576,
+    'gemini-pro': 32760,
+    'gemini-1.0-pro': 32760,
+    'gemini-1.5': 1048576,
+    'gemini-2': 1048576,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Tokens assumed for the instructions wrapped around the context
+PROMPT_OVERHEAD_TOKENS = 200
+
+
+def context_window(model: str) -> int:
+    """
+    Get the context window of a model.
+
+    Args:
+        model: Model name, optionally prefixed with ``models/``
+
+    Returns:
+        Context window in tokens (DEFAULT_CONTEXT_WINDOW for unknown models)
+    """
+    name = (model or "").lower().rsplit('/', 1)[-1]
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+def context_budget(model: str, question: str = "", answer_tokens: int = None) -> int:
+    """
+    Work out how many context tokens fit in a prompt for a model.
+
+    The budget is the model's context window minus room for the answer,
+    the question and the prompt instructions, capped at
+    ``Config.CONTEXT_MAX_TOKENS`` so large windows do not inflate cost.
+
+    Args:
+        model: Model name
+        question: User question that goes into the same prompt
+        answer_tokens: Tokens reserved for the answer (defaults to Config.MAX_TOKENS)
+
+    Returns:
+        Token budget for the context
+    """
+    if answer_tokens is None:
+        answer_tokens = Config.MAX_TOKENS
+
+    budget = context_window(model) - answer_tokens - PROMPT_OVERHEAD_TOKENS - count_tokens(question)
+    if Config.CONTEXT_MAX_TOKENS > 0:
+        budget = min(budget, Config.CONTEXT_MAX_TOKENS)
+
+    return max(budget, 0)
+
+
+def _uncovered(start: int, end: int, covered: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Parts of [start, end) not inside any of the (sorted, disjoint) covered spans."""
+    parts = []
+    position = start
+
+    for covered_start, covered_end in covered:
+        if covered_end <= position:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > position:
+            parts.append((position, covered_start))
+        position = max(position, covered_end)
+
+    if position < end:
+        parts.append((position, end))
+
+    return parts
+
+
+def _add_span(covered: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    """Insert a span into sorted, disjoint spans, merging where they overlap or touch."""
+    merged = []
+
+    for span in sorted(covered + [(start, end)]):
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], span[1]))
+        else:
+            merged.append(span)
+
+    return merged
+
+
+class _Passage:
+    """Text of one document assembled from possibly overlapping chunks."""
+
+    def __init__(self, rank: int):
+        self.rank = rank
+        self.pieces: Dict[int, str] = {}  # start offset -> text of an uncovered part
+        self.covered: List[Tuple[int, int]] = []
+        self.chunks: Dict[int, Tuple[int, int]] = {}  # chunk index -> (start, end)
+        self.joins: Set[Tuple[int, int]] = set()  # gaps holding only whitespace or a page marker
+
+    def add_chunk(self, chunk_index: Optional[int], start: int, end: int) -> None:
+        """
+        Note a taken chunk's span. Chunking only skips whitespace and page
+        markers between consecutive chunks, so the gap between them can be
+        bridged without losing text.
+        """
+        if chunk_index is None:
+            return
+
+        self.chunks[chunk_index] = (start, end)
+        before = self.chunks.get(chunk_index - 1)
+        after = self.chunks.get(chunk_index + 1)
+        if before is not None and before[1] < start:
+            self.joins.add((before[1], start))
+        if after is not None and end < after[0]:
+            self.joins.add((end, after[0]))
+
+    def text(self) -> List[Tuple[int, str]]:
+        """
+        Assemble the pieces into runs of contiguous text.
+
+        Returns:
+            List of (first offset, text), in document order
+        """
+        runs = []
+        end = None
+
+        for start in sorted(self.pieces):
+            piece = self.pieces[start]
+            if end is not None and (start == end or (end, start) in self.joins):
+                glue = "" if start == end else "\n"
+                runs[-1] = (runs[-1][0], runs[-1][1] + glue + piece)
+            else:
+                runs.append((start, piece))
+            end = start + len(piece)
+
+        return runs
+
+
+def pack_context(
+    results: List[Dict[str, Any]],
+    budget: int,
+    separator: str = "\n\n"
+) -> str:
+    """
+    Pack ranked chunks into a context string of at most ``budget`` tokens.
+
+    Chunks are taken best first. Text a chunk shares with chunks already
+    taken from the same document is not repeated, chunks that overlap or
+    follow each other in the document are merged into one passage in
+    document order, and chunks that no longer fit are skipped in
+    favour of smaller, lower ranked ones. Passages are ordered by their best
+    chunk's rank.
+
+    Args:
+        results: Ranked search results with ``doc_id``, ``content``, ``start`` and ``end``
+        budget: Token budget for the packed context
+        separator: Text placed between passages
+
+    Returns:
+        Packed context
+    """
+    passages: Dict[Any, _Passage] = {}
+    used = 0
+    separator_tokens = count_tokens(separator)
+
+    for rank, result in enumerate(results):
+        content = result.get('content') or ""
+        start, end = result.get('start'), result.get('end')
+        if not content.strip():
+            continue
+
+        if start is None or end is None or end - start != len(content):
+            # No usable offsets: the chunk can only be deduplicated as a whole
+            key = (result.get('doc_id'), 'chunk', result.get('chunk_index', rank))
+            start, end = 0, len(content)
+            chunk_index = None
+        else:
+            key = result.get('doc_id')
+            chunk_index = result.get('chunk_index')
+
+        passage = passages.get(key)
+        parts = _uncovered(start, end, passage.covered if passage else [])
+        texts = [content[part_start - start:part_end - start] for part_start, part_end in parts]
+        cost = sum(count_tokens(text) for text in texts)
+        if not cost:
+            continue
+        # Charged even when the chunk joins an existing run, so the estimate never falls short
+        cost += separator_tokens
+
+        if used + cost > budget:
+            if used == 0:
+                # Even the best chunk is too large: keep as much of it as fits
+                texts = [truncate_to_tokens(content, budget)]
+                parts = [(start, start + len(texts[0]))]
+                cost = budget
+            else:
+                continue
+
+        if passage is None:
+            passage = passages[key] = _Passage(rank)
+        for (part_start, part_end), text in zip(parts, texts):
+            passage.pieces[part_start] = text
+            passage.covered = _add_span(passage.covered, part_start, part_end)
+        passage.add_chunk(chunk_index, start, end)
+        used += cost
+
+        if used >= budget:
+            break
+
+    ordered = sorted(passages.values(), key=lambda passage: passage.rank)
+    runs = [text for passage in ordered for _, text in passage.text()]
+
+    logger.debug(f"Packed {len(runs)} passages from {len(results)} chunks into ~{used}/{budget} tokens")
+    return separator.join(runs)
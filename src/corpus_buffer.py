@@ -0,0 +1,301 @@
+"""
+Corpus Buffer Module
+Append-only buffer of document text with a chunk offset table, both
+memory-mapped so that processes serving the same corpus share one copy.
+"""
+
+import os
+import json
+import mmap
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils import setup_logging
+
+logger = setup_logging(__name__)
+
+CORPUS_VERSION = 1
+
+# Attempts at opening the files named by the metadata, which a writer may
+# replace in between
+LOAD_ATTEMPTS = 3
+
+# Chunk table columns
+BYTE_START, BYTE_END, CHAR_START, CHAR_END, PAGE = range(5)
+
+
+def _byte_offsets(text: str, positions: Sequence[int]) -> Dict[int, int]:
+    """Map character offsets in ``text`` to UTF-8 byte offsets."""
+    offsets = {}
+    char_pos = byte_pos = 0
+
+    for position in sorted(set(positions)):
+        byte_pos += len(text[char_pos:position].encode('utf-8'))
+        char_pos = position
+        offsets[position] = byte_pos
+
+    return offsets
+
+
+def _map_file(path: Path) -> bytes:
+    """Map a file read-only, or return empty bytes for an empty file."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class CorpusBuffer:
+    """
+    Full text of every document in one UTF-8 file, plus a chunk table.
+
+    The table is a ``(rows, 5)`` uint64 array of byte start, byte end,
+    character start, character end and page for every chunk, so a chunk is
+    decoded straight from the mapped text without loading its document.
+
+    Text is only ever appended; re-added or removed documents leave
+    garbage that ``save`` compacts away once it makes up half the rows.
+    The metadata file is replaced last and names the text and table files,
+    so readers always see a consistent set; the files of the generation it
+    replaced are kept for readers that are about to open them. Writers in
+    different processes must be serialized by the caller.
+    """
+
+    def __init__(self, directory: str, name: str = "corpus"):
+        """
+        Open the buffer in a directory, creating it on first save.
+
+        Args:
+            directory: Directory holding the buffer files
+            name: Base name of the buffer files
+        """
+        self.directory = Path(directory)
+        self.name = name
+        self.meta_path = self.directory / f"{name}.json"
+
+        # doc_id -> (first chunk row, chunk count)
+        self.docs: Dict[str, Tuple[int, int]] = {}
+        self.garbage_rows = 0
+        self.text_file: Optional[str] = None
+        self.text: bytes = b""
+        self.table = np.empty((0, 5), dtype=np.uint64)
+        self._added: List[np.ndarray] = []
+        self._added_rows = 0
+        self._table_file: Optional[str] = None
+        self._previous_files: List[str] = []
+        self._dirty = False
+        self._lock = threading.RLock()
+
+        self._load()
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.docs
+
+    @property
+    def num_rows(self) -> int:
+        """Number of chunk rows, including garbage."""
+        return self.table.shape[0] + self._added_rows
+
+    def _load(self) -> None:
+        """Map the saved buffer, if there is a readable one."""
+        if not self.meta_path.exists():
+            return
+
+        for attempt in range(LOAD_ATTEMPTS):
+            try:
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+
+                if meta.get('version') != CORPUS_VERSION:
+                    logger.info("Corpus buffer format changed; it will be rebuilt")
+                    return
+
+                text = _map_file(self.directory / meta['text_file'])
+                table = np.load(str(self.directory / meta['table_file']), mmap_mode='r')
+                break
+            except FileNotFoundError as e:
+                # Another process saved a newer generation meanwhile; read its metadata
+                if attempt + 1 == LOAD_ATTEMPTS:
+                    logger.warning(f"Ignoring unreadable corpus buffer: {str(e)}")
+                    return
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable corpus buffer: {str(e)}")
+                return
+
+        self.text_file = meta['text_file']
+        self._table_file = meta['table_file']
+        self.text = text
+        self.table = table
+        self.docs = {doc_id: tuple(span) for doc_id, span in meta['docs'].items()}
+        self.garbage_rows = meta.get('garbage_rows', 0)
+        self._previous_files = meta.get('previous_files', [])
+
+    def add_document(self, doc_id: str, text: str, chunk_offsets: Sequence[int]) -> None:
+        """
+        Append a document's text and chunk offsets (replacing any earlier version).
+
+        Args:
+            doc_id: Document identifier
+            text: Full document text
+            chunk_offsets: Flat (start, end, page) character offsets per chunk
+        """
+        encoded = text.encode('utf-8')
+        count = len(chunk_offsets) // 3
+        byte_offsets = _byte_offsets(
+            text, [chunk_offsets[i] for i in range(len(chunk_offsets)) if i % 3 != 2]
+        )
+
+        with self._lock:
+            if self.text_file is None:
+                self.text_file = f"{self.name}.{os.urandom(6).hex()}.text"
+            text_path = self.directory / self.text_file
+
+            os.makedirs(self.directory, exist_ok=True)
+            with open(text_path, 'ab') as f:
+                base = f.tell()
+                f.write(encoded)
+
+            rows = np.empty((count, 5), dtype=np.uint64)
+            for i in range(count):
+                start, end, page = chunk_offsets[3 * i:3 * i + 3]
+                rows[i] = (base + byte_offsets[start], base + byte_offsets[end], start, end, page)
+
+            self.remove_document(doc_id)
+            self.docs[doc_id] = (self.num_rows, count)
+            self._added.append(rows)
+            self._added_rows += count
+            self._dirty = True
+
+            # Remap so the appended text is readable
+            self.text = _map_file(text_path)
+
+    def remove_document(self, doc_id: str) -> None:
+        """
+        Forget a document; its text stays in the buffer until compaction.
+
+        Args:
+            doc_id: Document identifier
+        """
+        with self._lock:
+            span = self.docs.pop(doc_id, None)
+            if span is not None:
+                self.garbage_rows += span[1]
+                self._dirty = True
+
+    def _row(self, row: int) -> np.ndarray:
+        """Get one row of the chunk table."""
+        if row < self.table.shape[0]:
+            return self.table[row]
+
+        row -= self.table.shape[0]
+        for rows in self._added:
+            if row < rows.shape[0]:
+                return rows[row]
+            row -= rows.shape[0]
+
+        raise IndexError(row)
+
+    def get_chunk(self, doc_id: str, chunk_index: int) -> Optional[Tuple[str, int, int, int]]:
+        """
+        Decode one chunk from the buffer.
+
+        Args:
+            doc_id: Document identifier
+            chunk_index: Chunk position in the document
+
+        Returns:
+            Tuple of (text, character start, character end, page), or None
+            if the document is not in the buffer
+        """
+        with self._lock:
+            span = self.docs.get(doc_id)
+            if span is None or not 0 <= chunk_index < span[1]:
+                return None
+
+            row = [int(value) for value in self._row(span[0] + chunk_index)]
+            text = self.text[row[BYTE_START]:row[BYTE_END]]
+
+        return text.decode('utf-8'), row[CHAR_START], row[CHAR_END], row[PAGE]
+
+    def save(self) -> None:
+        """Write the chunk table and metadata, compacting first if worthwhile."""
+        with self._lock:
+            if not self._dirty:
+                return
+
+            if self.garbage_rows and self.garbage_rows * 2 >= self.num_rows:
+                self._compact()
+            else:
+                table = np.concatenate([np.asarray(self.table)] + self._added) if self._added else self.table
+                self._write(self.text_file, table)
+
+            self._dirty = False
+
+        self._remove_stale_files()
+
+    def _compact(self) -> None:
+        """Rewrite the text and table with live documents only."""
+        text_file = f"{self.name}.{os.urandom(6).hex()}.text"
+        rows = []
+        docs = {}
+
+        with open(self.directory / text_file, 'wb') as f:
+            for doc_id, (first_row, count) in self.docs.items():
+                doc_rows = np.array([self._row(first_row + i) for i in range(count)], dtype=np.uint64)
+                doc_rows = doc_rows.reshape(count, 5)
+                if count:
+                    start, end = int(doc_rows[:, BYTE_START].min()), int(doc_rows[:, BYTE_END].max())
+                    base = f.tell()
+                    f.write(self.text[start:end])
+                    for column in (BYTE_START, BYTE_END):
+                        doc_rows[:, column] = doc_rows[:, column] - np.uint64(start) + np.uint64(base)
+                docs[doc_id] = (sum(r.shape[0] for r in rows), count)
+                rows.append(doc_rows)
+
+        self.docs = docs
+        self.garbage_rows = 0
+        self._write(text_file, np.concatenate(rows) if rows else np.empty((0, 5), dtype=np.uint64))
+        logger.info(f"Compacted corpus buffer to {len(self.docs)} documents")
+
+    def _write(self, text_file: str, table: np.ndarray) -> None:
+        """Save the table under a new generation, then the metadata naming both files."""
+        os.makedirs(self.directory, exist_ok=True)
+        table_file = f"{self.name}.{os.urandom(6).hex()}.npy"
+        np.save(str(self.directory / table_file), table)
+        previous_files = [name for name in (self.text_file, self._table_file) if name and name != text_file]
+
+        meta = {
+            'version': CORPUS_VERSION,
+            'text_file': text_file,
+            'table_file': table_file,
+            'garbage_rows': self.garbage_rows,
+            'previous_files': previous_files,
+            'docs': {doc_id: list(span) for doc_id, span in self.docs.items()},
+        }
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+        self.text_file = text_file
+        self.text = _map_file(self.directory / text_file)
+        self.table = np.load(str(self.directory / table_file), mmap_mode='r')
+        self._added = []
+        self._added_rows = 0
+        self._table_file = table_file
+        self._previous_files = previous_files
+
+    def _remove_stale_files(self) -> None:
+        """
+        Delete files of older generations, except the one just replaced,
+        which processes that read the old metadata may be about to open
+        (processes mapping deleted files keep their pages).
+        """
+        current = {self.text_file, self._table_file, *self._previous_files}
+        for pattern in (f"{self.name}.*.text", f"{self.name}.*.npy"):
+            for old_file in self.directory.glob(pattern):
+                if old_file.name not in current:
+                    old_file.unlink()
@@ -0,0 +1,203 @@
+"""
+Document Cache Module
+Memory-bounded LRU cache of processed documents. Entries are lightweight
+handles whose sections page in from the document store on access.
+"""
+
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Optional
+
+from src.document_store import LazyDocument
+from src.utils import setup_logging, Config
+
+logger = setup_logging(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory held by a decoded section value.
+
+    Args:
+        value: Section value (str, array or JSON-like data)
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(value, array):
+        return sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(key) + estimate_size(item) for key, item in value.items()
+        )
+
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+
+    return sys.getsizeof(value)
+
+
+class DocumentCache:
+    """
+    LRU cache of document handles bounded by the memory of loaded sections.
+
+    A handle costs almost nothing until a section is read through it, at
+    which point the section's size is charged to the handle. When the total
+    exceeds ``max_bytes``, the least recently used handles release their
+    sections and leave the cache. Callers may keep using a released handle;
+    it simply reads from storage again.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Mapping]], max_bytes: int = None):
+        """
+        Initialize the cache.
+
+        Args:
+            loader: Callable returning a document handle (or None) for a doc_id
+            max_bytes: Memory budget for loaded sections (defaults to Config.DOCUMENT_CACHE_MAX_BYTES)
+        """
+        self.loader = loader
+        self.max_bytes = max_bytes if max_bytes is not None else Config.DOCUMENT_CACHE_MAX_BYTES
+
+        self._entries: "OrderedDict[str, Mapping]" = OrderedDict()
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, doc_id: object) -> bool:
+        with self._lock:
+            return doc_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self) -> List[str]:
+        """IDs of the documents currently cached, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, doc_id: str) -> Optional[Mapping]:
+        """
+        Get a document handle, loading it on a miss.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Document handle or None if the loader has no such document
+        """
+        with self._lock:
+            document = self._entries.get(doc_id)
+            if document is not None:
+                self._entries.move_to_end(doc_id)
+                self.hits += 1
+                return document
+            self.misses += 1
+
+        # Load outside the lock so one slow read does not block other lookups
+        document = self.loader(doc_id)
+        if document is None:
+            return None
+
+        with self._lock:
+            current = self._entries.get(doc_id)
+            if current is not None:
+                # Another thread loaded it first
+                return current
+            self._adopt(doc_id, document)
+            self._evict()
+
+        return document
+
+    def _adopt(self, doc_id: str, document: Mapping) -> None:
+        """Start tracking a handle."""
+        self._entries[doc_id] = document
+        self._sizes[doc_id] = {}
+
+        if isinstance(document, LazyDocument):
+            document.on_load = lambda doc, name, value: self._charge(doc_id, doc, name, value)
+        else:
+            # Eagerly loaded documents (legacy JSON) are charged up front
+            self._sizes[doc_id]['*'] = estimate_size(dict(document))
+            self._bytes += self._sizes[doc_id]['*']
+
+    def _charge(self, doc_id: str, document: LazyDocument, name: str, value: Any) -> None:
+        """Account for a section that was just paged in."""
+        size = estimate_size(value)
+
+        with self._lock:
+            if self._entries.get(doc_id) is not document:
+                return
+
+            sizes = self._sizes[doc_id]
+            self._bytes += size - sizes.get(name, 0)
+            sizes[name] = size
+            self._entries.move_to_end(doc_id)
+            self._evict(keep=doc_id)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Release least recently used handles until under the budget."""
+        while self._bytes > self.max_bytes and self._entries:
+            doc_id = next(iter(self._entries))
+            if doc_id == keep:
+                if len(self._entries) == 1:
+                    # A single document larger than the budget stays until replaced
+                    break
+                self._entries.move_to_end(doc_id)
+                continue
+            self._drop(doc_id)
+            self.evictions += 1
+
+    def _drop(self, doc_id: str) -> None:
+        """Stop tracking a handle and free its sections."""
+        document = self._entries.pop(doc_id)
+        self._bytes -= sum(self._sizes.pop(doc_id).values())
+
+        if isinstance(document, LazyDocument):
+            document.on_load = None
+            document.release()
+
+    def invalidate(self, doc_id: str) -> None:
+        """
+        Forget a document, e.g. after it was rewritten or deleted.
+
+        Args:
+            doc_id: Document identifier
+        """
+        with self._lock:
+            if doc_id in self._entries:
+                self._drop(doc_id)
+
+    def clear(self) -> None:
+        """Forget every document."""
+        with self._lock:
+            for doc_id in list(self._entries):
+                self._drop(doc_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, evictions, entries, bytes and budget
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
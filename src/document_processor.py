@@ -5,18 +5,45 @@ Handles multi-modal PDF processing including text, tables, equations, and struct
 
 import os
 import re
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from pathlib import Path
 import json
 import fitz
 import pdfplumber
-from src.utils import setup_logging, Config, chunk_text, save_json
+from src.utils import (
+    setup_logging, Config, chunk_spans, pack_chunk_offsets, get_chunk, get_chunk_span,
+    get_chunks
+)
+from src.corpus_buffer import CorpusBuffer
+from src.document_cache import DocumentCache
+from src.document_store import get_document_store
+from src.file_lock import FileLock
+from src.ingestion import run_in_process_pool, IngestionManifest
+from src.search_index import BM25Index
+from src.vector_store import VectorIndex, get_embedder
 
 logger = setup_logging(__name__)
 
+# Bump whenever extraction or storage changes so existing outputs are rebuilt
+PIPELINE_VERSION = "5"
+
+
+def _extract_document_worker(pdf_path: str) -> Dict[str, Any]:
+    """Extract one PDF inside a worker process (must be a top-level function)."""
+    return DocumentProcessor().extract_document(pdf_path)
+
+
 class DocumentProcessor:
     """
     PDF Document processor with multi-modal extraction capabilities.
+
+    Several processes (e.g. web server workers) may share the processed
+    directory. Changes to the store and indexes are made by one process at
+    a time under a lock file, starting from the latest saved indexes, and
+    are announced by replacing a generation marker file; every process
+    reloads its indexes when it sees the marker change (``refresh``).
     """
 
     def __init__(self):
@@ -24,7 +51,101 @@ class DocumentProcessor:
             Initialize the document processor.
         """
         self.logger = logger
-        self.processed_docs = {}
+        self.store = get_document_store()
+        # Bounded by memory; documents page in from the store on access
+        self.processed_docs = DocumentCache(self._load_document)
+        self.index_path = Config.PROCESSED_DIR / "bm25_index.json"
+
+        # Serializes writers across processes; the marker is replaced after
+        # every saved change
+        self.write_lock = FileLock(Config.PROCESSED_DIR / "write.lock")
+        self.generation_path = Config.PROCESSED_DIR / "generation"
+        self._generation = self._read_generation()
+        self._refresh_lock = threading.Lock()
+        self._sessions = 0
+
+        self._load_indexes()
+        # Bumped whenever searchable content changes; keys the query cache
+        self.corpus_version = 0
+        self._version_lock = threading.Lock()
+
+    def _load_indexes(self) -> None:
+        """Load the manifest, indexes and corpus buffer from the processed directory."""
+        self.manifest = IngestionManifest(Config.PROCESSED_DIR / "manifest.json", PIPELINE_VERSION)
+        # Stores with built-in full-text search replace the BM25 index
+        self.index = None if self.store.searchable else BM25Index.load(str(self.index_path))
+        self.vector_index = None
+        if Config.RETRIEVAL_MODE in ("vector", "hybrid"):
+            self.vector_index = VectorIndex.load(
+                str(Config.PROCESSED_DIR / "vectors.npy"),
+                str(Config.PROCESSED_DIR / "vectors.json"),
+                get_embedder()
+            )
+        # Memory-mapped text and chunk offsets used to materialize search hits
+        self.corpus = CorpusBuffer(Config.PROCESSED_DIR)
+        self._index_dirty = False
+
+    def _read_generation(self) -> Optional[Tuple[int, int]]:
+        """Identify the current generation marker (None before the first change)."""
+        try:
+            stat = os.stat(self.generation_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def refresh(self) -> bool:
+        """
+        Reload the indexes if another process saved changes since they were loaded.
+
+        Costs a single ``stat`` when nothing changed.
+
+        Returns:
+            True if the indexes were reloaded
+        """
+        if self._read_generation() == self._generation:
+            return False
+
+        with self._refresh_lock:
+            generation = self._read_generation()
+            if generation == self._generation:
+                return False
+
+            self.logger.info("Indexes changed in another process; reloading")
+            self._load_indexes()
+            self.processed_docs.clear()
+            self._generation = generation
+            self._bump_version()
+
+        return True
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Hold the write lock for a series of changes.
+
+        The outermost session starts from the latest saved indexes, and on
+        exit saves them and replaces the generation marker if they changed.
+        """
+        with self.write_lock:
+            self._sessions += 1
+            try:
+                if self._sessions == 1:
+                    self.refresh()
+                yield
+            finally:
+                self._sessions -= 1
+                if self._sessions == 0 and self._index_dirty:
+                    self.save_index()
+                    self._publish()
+
+    def _publish(self) -> None:
+        """Replace the generation marker so other processes reload."""
+        with self._refresh_lock:
+            tmp_path = f"{self.generation_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(os.urandom(8).hex())
+            os.replace(tmp_path, self.generation_path)
+            self._generation = self._read_generation()
 
     def process_pdf(self, pdf_path: str) -> Dict[str, Any]:
         """
@@ -36,24 +157,34 @@ class DocumentProcessor:
         Returns:
             Dictionary containing extracted content and metadata
         """
+        document_data = self.extract_document(pdf_path)
+        with self._writing():
+            return self._store_document(document_data)
+
+    def extract_document(self, pdf_path: str) -> Dict[str, Any]:
+        """
+        Extract all content from a PDF without caching or saving it.
+
+        Safe to run in a worker process; the result is a plain picklable dict.
+
+        Args:
+            pdf_path: Path to the PDF file
 
+        Returns:
+            Dictionary containing extracted content and metadata
+        """
         self.logger.info(f"Processing PDF: {pdf_path}")
 
         try:
-            # Extract text content
-            text_content = self._extract_text(pdf_path)
+            # Single pass over the PDF: text, layout, tables and metadata
+            text_content, layout, tables, metadata = self._extract_all(pdf_path)
 
             # Extract structure (like sections, titles, etc.)
             structure = self._extract_structure(text_content)
 
-            # Extract tables
-            tables = self._extract_tables(pdf_path)
-
-            # Extract metadata
-            metadata = self._extract_metadata(pdf_path)
-            
-            # Create chunks for efficient retrieval
-            chunks = chunk_text(text_content, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP)
+            # Create token-bounded chunks, kept as (start, end, page) offsets
+            # into the full text rather than as copies of it
+            spans = chunk_spans(text_content, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP)
 
             doc_id = Path(pdf_path).stem
 
@@ -64,18 +195,12 @@ class DocumentProcessor:
                 'full_text': text_content,
                 'structure': structure,
                 'tables': tables,
-                'chunks': chunks,
+                'layout': layout,
+                'chunk_offsets': pack_chunk_offsets(spans),
                 'num_pages': metadata.get('num_pages', 0),
                 'processed': True
             }
 
-            # Cache processed document
-            self.processed_docs[doc_id] = document_data
-
-            # Save to disk
-            output_path = Config.PROCESSED_DIR / f"{doc_id}.json"
-            save_json(document_data, str(output_path))
-
             self.logger.info(f"Successfully processed PDF: {pdf_path}")
             return document_data
 
@@ -83,41 +208,226 @@ class DocumentProcessor:
             self.logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
             raise
 
-    def _extract_text(self, pdf_path: str) -> str:
+    def _store_document(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Extract text content from PDF using PyMuPDF.
+        Save an extracted document to the store and index it.
+
+        Args:
+            document_data: Output of ``extract_document``
+
+        Returns:
+            Cached handle for the stored document
+        """
+        doc_id = document_data['doc_id']
+
+        # Save to disk
+        self.store.save(document_data)
+
+        # Index chunks for search
+        self._index_document(doc_id, document_data)
+
+        # The extracted data is not kept; the cache pages it back in on access
+        self.processed_docs.invalidate(doc_id)
+        return self.processed_docs.get(doc_id)
+
+    def _index_document(self, doc_id: str, document: Dict[str, Any], only_missing: bool = False) -> None:
+        """
+        Add a document to the keyword and vector indexes and the corpus buffer.
+
+        Args:
+            doc_id: Document identifier
+            document: Processed document data
+            only_missing: Skip the indexes that already contain the document
+        """
+        chunks = get_chunks(document)
+
+        if self.index is not None and not (only_missing and doc_id in self.index):
+            self.index.add_document(doc_id, chunks)
+        if self.vector_index is not None and not (only_missing and doc_id in self.vector_index):
+            self.vector_index.add_document(doc_id, chunks)
+        # Outputs from before chunk offsets existed are served from the store instead
+        if 'chunk_offsets' in document and not (only_missing and doc_id in self.corpus):
+            self.corpus.add_document(doc_id, document['full_text'], document['chunk_offsets'])
+        self._index_dirty = True
+        self._bump_version()
+
+    def _bump_version(self) -> None:
+        """Record that the searchable corpus changed."""
+        with self._version_lock:
+            self.corpus_version += 1
+
+    def delete_document(self, doc_id: str) -> bool:
+        """
+        Remove a document from the store, the indexes and the manifest.
+        
+        Args:
+            doc_id: Document identifier
+            
+        Returns:
+            True if the document was stored
+        """
+        with self._writing():
+            existed = self.store.delete(doc_id)
+            self.processed_docs.invalidate(doc_id)
+            if self.index is not None:
+                self.index.remove_document(doc_id)
+            if self.vector_index is not None:
+                self.vector_index.remove_document(doc_id)
+            self.corpus.remove_document(doc_id)
+            self.manifest.remove(doc_id)
+
+            self._index_dirty = True
+            self._bump_version()
+
+            self.manifest.save()
+
+        self.logger.info(f"Deleted document: {doc_id}")
+        return existed
+
+    def save_index(self) -> None:
+        """Persist the search indexes if they changed since the last save."""
+        if not self._index_dirty:
+            return
+
+        if self.index is not None:
+            self.index.save(str(self.index_path))
+        if self.vector_index is not None:
+            self.vector_index.save(
+                str(Config.PROCESSED_DIR / "vectors.npy"),
+                str(Config.PROCESSED_DIR / "vectors.json")
+            )
+        self.corpus.save()
+        self._index_dirty = False
+
+    def _extract_all(
+        self, pdf_path: str
+    ) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Extract text, layout blocks, tables and metadata with one open of the PDF.
+
+        Every page is visited exactly once. Text is rebuilt from the page's
+        layout blocks, so the blocks are parsed a single time and kept.
 
         Args:
             pdf_path: Path to PDF file
 
         Returns:
-            Extracted text content
+            Tuple of (full text, layout blocks, tables, metadata)
         """
+        text_content = []
+        layout = []
+        tables = []
+
         try:
             doc = fitz.open(pdf_path)
-            text_content = []
-            
+        except Exception as e:
+            self.logger.error(f"Error opening PDF: {str(e)}")
+            raise
+
+        try:
+            metadata = self._extract_metadata(doc, pdf_path)
+            find_tables = hasattr(fitz.Page, 'find_tables')
+
             for page_num in range(len(doc)):
                 page = doc[page_num]
-                text = page.get_text("text")
-                
                 blocks = page.get_text("blocks")
-                
+
+                text = self._extract_page_text(blocks)
+                layout.extend(self._extract_page_layout(blocks, page_num))
+
                 if text.strip():
                     text_content.append(f"\n--- Page {page_num + 1} ---\n")
                     text_content.append(text)
-            
+
+                if find_tables:
+                    tables.extend(self._extract_page_tables(page, page_num))
+        finally:
             doc.close()
-            
-            full_text = "\n".join(text_content)
-            self.logger.debug(f"Extracted {len(full_text)} characters from {pdf_path}")
-            
-            return full_text
-            
+
+        # Older PyMuPDF builds have no table finder; fall back to pdfplumber
+        if not find_tables:
+            tables = self._extract_tables(pdf_path)
+
+        metadata['num_images'] = sum(1 for block in layout if block['type'] == 'image')
+
+        full_text = "\n".join(text_content)
+        self.logger.debug(
+            f"Extracted {len(full_text)} characters, {len(layout)} blocks and "
+            f"{len(tables)} tables from {pdf_path}"
+        )
+
+        return full_text, layout, tables, metadata
+
+    def _extract_page_text(self, blocks: List[tuple]) -> str:
+        """
+        Rebuild page text from PyMuPDF layout blocks.
+
+        Args:
+            blocks: Output of ``page.get_text("blocks")``
+
+        Returns:
+            Page text in reading order
+        """
+        # Block tuples are (x0, y0, x1, y1, text, block_no, block_type);
+        # block_type 1 is an image placeholder, not text
+        return "".join(block[4] for block in blocks if block[6] == 0)
+
+    def _extract_page_layout(self, blocks: List[tuple], page_num: int) -> List[Dict[str, Any]]:
+        """
+        Convert PyMuPDF blocks into compact layout records.
+
+        Args:
+            blocks: Output of ``page.get_text("blocks")``
+            page_num: Zero-based page number
+
+        Returns:
+            List of layout blocks with page, bounding box and type
+        """
+        return [
+            {
+                'page': page_num + 1,
+                'bbox': [round(coord, 1) for coord in block[:4]],
+                'type': 'image' if block[6] == 1 else 'text',
+            }
+            for block in blocks
+        ]
+
+    def _extract_page_tables(self, page: "fitz.Page", page_num: int) -> List[Dict[str, Any]]:
+        """
+        Extract tables from an already opened page using PyMuPDF's table finder.
+
+        Args:
+            page: Open PyMuPDF page
+            page_num: Zero-based page number
+
+        Returns:
+            List of extracted tables with metadata
+        """
+        tables = []
+
+        try:
+            for table_num, table in enumerate(page.find_tables().tables):
+                rows = table.extract()
+                if rows:
+                    tables.append(self._format_table(rows, page_num, table_num))
         except Exception as e:
-            self.logger.error(f"Error extracting text: {str(e)}")
-            raise
-    
+            self.logger.warning(f"Error extracting tables on page {page_num + 1}: {str(e)}")
+
+        return tables
+
+    def _format_table(self, table: List[List[Any]], page_num: int, table_num: int) -> Dict[str, Any]:
+        """Convert a list of table rows to the structured table format."""
+        headers = table[0] if table else []
+        rows = table[1:] if len(table) > 1 else []
+
+        return {
+            'page': page_num + 1,
+            'table_num': table_num + 1,
+            'headers': headers,
+            'rows': rows,
+            'row_count': len(rows),
+            'col_count': len(headers) if headers else 0
+        }
 
     def _extract_structure(self, text: str) -> Dict[str, Any]:
         """
@@ -237,6 +547,8 @@ class DocumentProcessor:
     def _extract_tables(self, pdf_path: str) -> List[Dict[str, Any]]:
         """
         Extract tables from PDF using pdfplumber.
+
+        Only used when the installed PyMuPDF has no table finder.
         
         Args:
             pdf_path: Path to PDF file
@@ -253,20 +565,7 @@ class DocumentProcessor:
                     
                     for table_num, table in enumerate(page_tables):
                         if table and len(table) > 0:
-                            # Converting table to structured format
-                            headers = table[0] if table else []
-                            rows = table[1:] if len(table) > 1 else []
-                            
-                            table_data = {
-                                'page': page_num + 1,
-                                'table_num': table_num + 1,
-                                'headers': headers,
-                                'rows': rows,
-                                'row_count': len(rows),
-                                'col_count': len(headers) if headers else 0
-                            }
-                            
-                            tables.append(table_data)
+                            tables.append(self._format_table(table, page_num, table_num))
             
             self.logger.debug(f"Extracted {len(tables)} tables from {pdf_path}")
             
@@ -275,19 +574,19 @@ class DocumentProcessor:
         
         return tables
     
-    def _extract_metadata(self, pdf_path: str) -> Dict[str, Any]:
+    def _extract_metadata(self, doc: "fitz.Document", pdf_path: str) -> Dict[str, Any]:
         """
-        Extract PDF metadata.
+        Extract PDF metadata from an open document.
         
         Args:
+            doc: Open PyMuPDF document
             pdf_path: Path to PDF file
             
         Returns:
             Dictionary of metadata
         """
         try:
-            doc = fitz.open(pdf_path)
-            metadata = doc.metadata
+            metadata = doc.metadata or {}
             
             enhanced_metadata = {
                 'filename': Path(pdf_path).name,
@@ -301,23 +600,38 @@ class DocumentProcessor:
                 'modification_date': metadata.get('modDate', ''),
             }
             
-            doc.close()
-            
             return enhanced_metadata
             
         except Exception as e:
             self.logger.error(f"Error extracting metadata: {str(e)}")
             return {'filename': Path(pdf_path).name}
     
-    def process_directory(self, directory_path: str) -> Dict[str, Dict[str, Any]]:
+    def process_directory(
+        self,
+        directory_path: str,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        force: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
         """
         Process all PDF files in a directory.
+
+        Files whose content and pipeline version match the ingestion manifest
+        are not re-extracted; their stored output is loaded instead.
+
+        With more than one worker, extraction runs in separate processes (one
+        per file) so a crashing or hung PDF only fails that file; results are
+        cached and saved by this process exactly as in the serial path.
         
         Args:
             directory_path: Path to directory containing PDFs
+            workers: Number of worker processes (defaults to Config.INGEST_WORKERS)
+            timeout: Per-file timeout in seconds for worker processes
+                (defaults to Config.INGEST_TIMEOUT)
+            force: Reprocess every file even if it is unchanged
             
         Returns:
-            Dictionary mapping document IDs to processed data
+            Dictionary mapping document IDs to cached document handles
         """
         self.logger.info(f"Processing directory: {directory_path}")
         
@@ -327,19 +641,110 @@ class DocumentProcessor:
             self.logger.warning(f"No PDF files found in {directory_path}")
             return {}
         
+        workers = workers if workers is not None else Config.INGEST_WORKERS
+        timeout = timeout if timeout is not None else Config.INGEST_TIMEOUT
+        
+        # One writer session, so other processes see the batch at once
+        with self._writing():
+            results = self._process_files(pdf_files, workers, timeout, force)
+        
+        self.logger.info(f"Successfully processed {len(results)} documents")
+        
+        return results
+    
+    def _process_files(
+        self,
+        pdf_files: List[Path],
+        workers: int,
+        timeout: float,
+        force: bool
+    ) -> Dict[str, Dict[str, Any]]:
+        """Ingest new or changed PDFs and load the others (see ``process_directory``)."""
         results = {}
+        changed_files = []
         
         for pdf_file in pdf_files:
-            try:
-                doc_data = self.process_pdf(str(pdf_file))
-                results[doc_data['doc_id']] = doc_data
-            except Exception as e:
-                self.logger.error(f"Failed to process {pdf_file}: {str(e)}")
+            doc_id = pdf_file.stem
+            if not force and self._is_unchanged(str(pdf_file), doc_id):
+                doc_data = self.get_document(doc_id)
+                if doc_data is not None:
+                    results[doc_id] = doc_data
+                    continue
+            changed_files.append(pdf_file)
+        
+        self.logger.info(
+            f"{len(results)} unchanged, {len(changed_files)} new or modified PDFs"
+        )
         
-        self.logger.info(f"Successfully processed {len(results)} documents")
+        if workers > 1 and len(changed_files) > 1:
+            self.logger.info(f"Extracting {len(changed_files)} PDFs with {workers} worker processes")
+            
+            outcomes = run_in_process_pool(
+                _extract_document_worker,
+                [str(pdf_file) for pdf_file in changed_files],
+                workers=workers,
+                timeout=timeout
+            )
+            
+            for pdf_file, succeeded, result in outcomes:
+                if not succeeded:
+                    self.logger.error(f"Failed to process {pdf_file}: {result}")
+                    continue
+                try:
+                    results[result['doc_id']] = self._store_document(result)
+                    self.manifest.record(pdf_file, result['doc_id'])
+                except Exception as e:
+                    self.logger.error(f"Failed to store {pdf_file}: {str(e)}")
+        else:
+            for pdf_file in changed_files:
+                try:
+                    doc_data = self.extract_document(str(pdf_file))
+                    results[doc_data['doc_id']] = self._store_document(doc_data)
+                    self.manifest.record(str(pdf_file), doc_data['doc_id'])
+                except Exception as e:
+                    self.logger.error(f"Failed to process {pdf_file}: {str(e)}")
+        
+        if changed_files:
+            self.manifest.save()
         
         return results
     
+    def process_file(self, pdf_path: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Ingest a single PDF, skipping extraction if it is unchanged.
+
+        Args:
+            pdf_path: Path to the PDF file
+            force: Reprocess the file even if it is unchanged
+
+        Returns:
+            Processed document data
+        """
+        doc_id = Path(pdf_path).stem
+        self.refresh()
+
+        if not force and self._is_unchanged(pdf_path, doc_id):
+            doc_data = self.get_document(doc_id)
+            if doc_data is not None:
+                self.logger.info(f"Skipping unchanged PDF: {pdf_path}")
+                return doc_data
+
+        doc_data = self.extract_document(pdf_path)
+        with self._writing():
+            document = self._store_document(doc_data)
+            self.manifest.record(pdf_path, doc_data['doc_id'])
+            self.manifest.save()
+
+        return document
+
+    def _is_unchanged(self, pdf_path: str, doc_id: str) -> bool:
+        """Check the manifest and that the stored output still exists."""
+        try:
+            return self.store.exists(doc_id) and self.manifest.is_current(pdf_path, doc_id)
+        except OSError as e:
+            self.logger.warning(f"Could not check {pdf_path} against manifest: {str(e)}")
+            return False
+    
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a processed document by ID.
@@ -350,54 +755,106 @@ class DocumentProcessor:
         Returns:
             Document data or None if not found
         """
-        if doc_id in self.processed_docs:
-            return self.processed_docs[doc_id]
+        return self.processed_docs.get(doc_id)
+    
+    def _load_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Open a stored document for the cache; sections are read as they are accessed.
         
-        # Trying to load from disk
-        doc_path = Config.PROCESSED_DIR / f"{doc_id}.json"
-        if doc_path.exists():
-            try:
-                from src.utils import load_json
-                doc_data = load_json(str(doc_path))
-                self.processed_docs[doc_id] = doc_data
+        Args:
+            doc_id: Document identifier
+            
+        Returns:
+            Document handle or None if not stored
+        """
+        try:
+            doc_data = self.store.load(doc_id)
+            if doc_data is not None:
+                # Outputs written before the indexes existed are indexed on first load
+                if self._missing_from_indexes(doc_id, doc_data):
+                    with self._writing():
+                        if self._missing_from_indexes(doc_id, doc_data):
+                            self._index_document(doc_id, doc_data, only_missing=True)
+
                 return doc_data
-            except Exception as e:
-                self.logger.error(f"Error loading document {doc_id}: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Error loading document {doc_id}: {str(e)}")
         
         return None
     
-    def search_content(self, query: str, doc_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _missing_from_indexes(self, doc_id: str, doc_data: Dict[str, Any]) -> bool:
+        """Check whether a stored document is missing from any index."""
+        missing_keywords = self.index is not None and doc_id not in self.index
+        missing_vectors = self.vector_index is not None and doc_id not in self.vector_index
+        missing_text = 'chunk_offsets' in doc_data and doc_id not in self.corpus
+        return missing_keywords or missing_vectors or missing_text
+    
+    def list_documents(self) -> List[str]:
+        """
+        List every document in the store, loaded or not.
+        
+        Returns:
+            Sorted document IDs
+        """
+        return self.store.doc_ids()
+    
+    def search_content(self, query: str, doc_id: Optional[str] = None, k: int = 10) -> List[Dict[str, Any]]:
         """
-        Search for content across processed documents.
+        Search for content across processed documents with BM25, using the
+        store's full-text index when it has one.
         
         Args:
             query: Search query
             doc_id: Optional document ID to search within
+            k: Number of chunks to return
             
         Returns:
             List of relevant text chunks with metadata
         """
+        searcher = self.store if self.index is None else self.index
+        return self._hits_to_results(searcher.search(query, k=k, doc_id=doc_id))
+    
+    def vector_search(self, query: str, doc_id: Optional[str] = None, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search for content by embedding similarity.
+        
+        Args:
+            query: Search query
+            doc_id: Optional document ID to search within
+            k: Number of chunks to return
+            
+        Returns:
+            List of relevant text chunks with metadata
+        """
+        if self.vector_index is None:
+            raise RuntimeError("Vector retrieval is disabled; set RETRIEVAL_MODE=vector or hybrid")
+        
+        return self._hits_to_results(self.vector_index.search(query, k=k, doc_id=doc_id))
+    
+    def _hits_to_results(self, hits: List[Tuple[str, int, float]]) -> List[Dict[str, Any]]:
+        """Materialize (doc_id, chunk_index, score) hits into result dicts."""
         results = []
-        query_lower = query.lower()
         
-        # Determine which documents to search
-        docs_to_search = (
-            {doc_id: self.processed_docs[doc_id]} if doc_id and doc_id in self.processed_docs
-            else self.processed_docs
-        )
+        for hit_doc_id, chunk_index, score in hits:
+            # Chunk text is only materialized for hits, from the shared buffer when possible
+            chunk = self.corpus.get_chunk(hit_doc_id, chunk_index)
+            if chunk is not None:
+                content, start, end, page = chunk
+            else:
+                doc_data = self.get_document(hit_doc_id)
+                if not doc_data:
+                    continue
+                content = get_chunk(doc_data, chunk_index)
+                start, end, page = get_chunk_span(doc_data, chunk_index)
+            
+            results.append({
+                'doc_id': hit_doc_id,
+                'chunk_index': chunk_index,
+                'content': content,
+                'start': start,
+                'end': end,
+                'page': page,
+                'relevance_score': score
+            })
         
-        for doc_id, doc_data in docs_to_search.items():
-            for i, chunk in enumerate(doc_data.get('chunks', [])):
-                if query_lower in chunk.lower():
-                    results.append({
-                        'doc_id': doc_id,
-                        'chunk_index': i,
-                        'content': chunk,
-                        'relevance_score': chunk.lower().count(query_lower)
-                    })
-        
-        # Sorting by relevance
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
-        
-        return results[:10]  # Returning top 10 results
-    
\ No newline at end of file
+        return results
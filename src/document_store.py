@@ -0,0 +1,709 @@
+"""
+Document Store Module
+Persistent storage for processed documents: a versioned binary container
+per document, or a single SQLite database with full-text chunk search.
+Both load document sections on demand.
+"""
+
+import os
+import sys
+import json
+import zlib
+import struct
+import sqlite3
+import threading
+import time
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.utils import setup_logging, Config, load_json, pack_chunk_offsets
+from src.search_index import tokenize
+
+logger = setup_logging(__name__)
+
+DOCUMENT_MAGIC = b"DQA\x00"
+DOCUMENT_FORMAT_VERSION = 1
+
+# Header: magic, format version, section count
+_HEADER = struct.Struct("<4sHH")
+# Table of contents entry: section name, codec, offset, stored length
+_ENTRY = struct.Struct("<16sBQQ")
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+
+# Document keys stored in their own section; every other key goes in 'meta'
+SECTION_KEYS = {
+    'full_text': 'text',
+    'chunk_offsets': 'chunks',
+    'structure': 'structure',
+    'tables': 'tables',
+    'layout': 'layout',
+}
+KEY_SECTIONS = {section: key for key, section in SECTION_KEYS.items()}
+
+
+def _encode_section(section: str, value: Any) -> bytes:
+    """Serialize a section value to bytes."""
+    if section == 'text':
+        return value.encode('utf-8')
+
+    if section == 'chunks':
+        offsets = array('I', pack_chunk_offsets(value))
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        return offsets.tobytes()
+
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _decode_section(section: str, data: bytes) -> Any:
+    """Deserialize a section value from bytes."""
+    if section == 'text':
+        return data.decode('utf-8')
+
+    if section == 'chunks':
+        offsets = array('I')
+        offsets.frombytes(data)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        return offsets
+
+    return json.loads(data.decode('utf-8'))
+
+
+def _read_toc(f) -> Dict[str, Tuple[int, int, int]]:
+    """
+    Read the header and table of contents of an open container.
+
+    Returns:
+        Mapping of section name to (codec, offset, stored length)
+    """
+    magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+
+    if magic != DOCUMENT_MAGIC:
+        raise ValueError("Not a document container")
+    if version != DOCUMENT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported document format version: {version}")
+
+    toc = {}
+    for _ in range(count):
+        name, codec, offset, length = _ENTRY.unpack(f.read(_ENTRY.size))
+        toc[name.rstrip(b"\x00").decode('ascii')] = (codec, offset, length)
+
+    return toc
+
+
+def write_document(document: Dict[str, Any], path: str, compress: bool = True) -> None:
+    """
+    Write a processed document as a binary container.
+
+    Each section is compressed with zlib when ``compress`` is set and that
+    makes it smaller. The file is written atomically.
+
+    Args:
+        document: Processed document data
+        path: Output path
+        compress: Compress sections
+    """
+    sections = {'meta': {key: value for key, value in document.items() if key not in SECTION_KEYS}}
+    for key, section in SECTION_KEYS.items():
+        if key in document:
+            sections[section] = document[key]
+
+    payloads = []
+    for section, value in sections.items():
+        data, codec = _encode_section(section, value), CODEC_RAW
+        if compress:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                data, codec = packed, CODEC_ZLIB
+        payloads.append((section, codec, data))
+
+    offset = _HEADER.size + _ENTRY.size * len(payloads)
+    header = [_HEADER.pack(DOCUMENT_MAGIC, DOCUMENT_FORMAT_VERSION, len(payloads))]
+    for section, codec, data in payloads:
+        header.append(_ENTRY.pack(section.encode('ascii'), codec, offset, len(data)))
+        offset += len(data)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b"".join(header))
+        for _, _, data in payloads:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+class _ContainerReader:
+    """Reads sections from a container file, following atomic replacements."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self.identity = self._file_identity(f)
+            self.toc = _read_toc(f)
+
+    @staticmethod
+    def _file_identity(f) -> Tuple[int, int, int]:
+        """Identify the file version behind an open handle."""
+        stat = os.fstat(f.fileno())
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @property
+    def sections(self) -> List[str]:
+        return list(self.toc)
+
+    def read(self, name: str) -> Tuple[Any, Any]:
+        """
+        Read one section.
+
+        Returns:
+            Tuple of (file identity, decoded value)
+        """
+        with open(self.path, 'rb') as f:
+            identity = self._file_identity(f)
+            if identity != self.identity:
+                self.identity = identity
+                self.toc = _read_toc(f)
+
+            codec, offset, length = self.toc[name]
+            f.seek(offset)
+            data = f.read(length)
+
+        if codec == CODEC_ZLIB:
+            data = zlib.decompress(data)
+
+        return identity, _decode_section(name, data)
+
+
+class LazyDocument(Mapping):
+    """
+    Read-only view of a stored document that loads sections on first access.
+
+    Opening a document reads nothing but the list of sections;
+    ``doc['tables']`` reads and decodes just the tables section. Readers
+    return a version token with every section, and a version change drops
+    the sections cached so far, so a view never mixes two writes.
+
+    ``release`` drops every loaded section; the view stays usable and pages
+    them back in on the next access.
+    """
+
+    def __init__(self, reader: Any, on_load: Optional[Callable[["LazyDocument", str, Any], None]] = None):
+        """
+        Wrap a section reader.
+
+        Args:
+            reader: Object with a ``sections`` list and a ``read(name)``
+                method returning ``(version, value)``
+            on_load: Optional callback invoked with (document, section name,
+                value) after a section is read from storage
+        """
+        self._reader = reader
+        self._version = None
+        self._sections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.on_load = on_load
+
+    def section(self, name: str) -> Any:
+        """
+        Load one section.
+
+        Args:
+            name: Section name ('meta', 'text', 'chunks', 'structure', 'tables' or 'layout')
+
+        Returns:
+            Decoded section value
+        """
+        with self._lock:
+            if name in self._sections:
+                return self._sections[name]
+
+            version, value = self._reader.read(name)
+            if version != self._version:
+                if self._sections:
+                    logger.debug(f"Stored document changed; dropping {len(self._sections)} cached sections")
+                self._sections.clear()
+                self._version = version
+
+            self._sections[name] = value
+
+        # Outside the lock: the callback may release other documents
+        if self.on_load is not None:
+            self.on_load(self, name, value)
+
+        return value
+
+    def release(self) -> None:
+        """Drop every loaded section from memory."""
+        with self._lock:
+            self._sections.clear()
+
+    @property
+    def sections(self) -> List[str]:
+        """Names of the stored sections."""
+        return self._reader.sections
+
+    def __getitem__(self, key: str) -> Any:
+        section = SECTION_KEYS.get(key)
+        if section is not None and section in self.sections:
+            return self.section(section)
+
+        return self.section('meta')[key]
+
+    def __contains__(self, key: object) -> bool:
+        section = SECTION_KEYS.get(key)
+        if section is not None:
+            return section in self.sections
+
+        return key in self.section('meta')
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.section('meta')
+        for section in self.sections:
+            if section in KEY_SECTIONS:
+                yield KEY_SECTIONS[section]
+
+    def __len__(self) -> int:
+        return len(self.section('meta')) + sum(1 for section in self.sections if section in KEY_SECTIONS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Load every section into a plain dictionary."""
+        return {key: self[key] for key in self}
+
+
+class BinaryDocumentStore:
+    """
+    Stores processed documents as ``<doc_id>.dqa`` containers in a directory.
+
+    Documents written by older versions as ``<doc_id>.json`` are still
+    readable; they are loaded eagerly.
+    """
+
+    extension = ".dqa"
+    searchable = False
+
+    def __init__(self, directory: str = None, compress: bool = None):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding the documents (defaults to Config.PROCESSED_DIR)
+            compress: Compress sections (defaults to Config.DOCUMENT_COMPRESSION)
+        """
+        self.directory = Path(directory or Config.PROCESSED_DIR)
+        self.compress = compress if compress is not None else Config.DOCUMENT_COMPRESSION
+
+    def path(self, doc_id: str) -> Path:
+        """Path of the container for a document."""
+        return self.directory / f"{doc_id}{self.extension}"
+
+    def _legacy_path(self, doc_id: str) -> Path:
+        """Path of a JSON output from before the binary format."""
+        return self.directory / f"{doc_id}.json"
+
+    def save(self, document: Dict[str, Any]) -> None:
+        """
+        Save a processed document, replacing any earlier version.
+
+        Args:
+            document: Processed document data with a 'doc_id'
+        """
+        doc_id = document['doc_id']
+        write_document(document, str(self.path(doc_id)), compress=self.compress)
+
+        legacy_path = self._legacy_path(doc_id)
+        if legacy_path.exists():
+            legacy_path.unlink()
+
+    def load(self, doc_id: str) -> Optional[Mapping]:
+        """
+        Open a stored document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Lazily loaded document, a dictionary for legacy JSON outputs,
+            or None if the document is not stored
+        """
+        path = self.path(doc_id)
+        if path.exists():
+            return LazyDocument(_ContainerReader(str(path)))
+
+        legacy_path = self._legacy_path(doc_id)
+        if legacy_path.exists():
+            document = load_json(str(legacy_path))
+            if 'chunk_offsets' in document:
+                document['chunk_offsets'] = pack_chunk_offsets(document['chunk_offsets'])
+            return document
+
+        return None
+
+    def exists(self, doc_id: str) -> bool:
+        """Check whether a document is stored."""
+        return self.path(doc_id).exists() or self._legacy_path(doc_id).exists()
+
+    def doc_ids(self) -> List[str]:
+        """
+        List stored documents.
+
+        Legacy JSON outputs are not listed; they share the directory with
+        the index files and are rewritten on the next ingestion.
+
+        Returns:
+            Sorted document identifiers
+        """
+        if not self.directory.exists():
+            return []
+        return sorted(path.stem for path in self.directory.glob(f"*{self.extension}"))
+
+    def delete(self, doc_id: str) -> bool:
+        """
+        Delete a stored document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            True if something was deleted
+        """
+        deleted = False
+        for path in (self.path(doc_id), self._legacy_path(doc_id)):
+            if path.exists():
+                path.unlink()
+                deleted = True
+        return deleted
+
+
+class _SQLiteReader:
+    """Reads document sections from the SQLite store."""
+
+    def __init__(self, store: "SQLiteDocumentStore", doc_id: str, sections: List[str]):
+        self.store = store
+        self.doc_id = doc_id
+        self.sections = sections
+
+    def read(self, name: str) -> Tuple[Any, Any]:
+        """
+        Read one section.
+
+        Returns:
+            Tuple of (document generation, decoded value)
+        """
+        return self.store._read_section(self.doc_id, name)
+
+
+class SQLiteDocumentStore:
+    """
+    Stores documents, sections, tables and chunks in one SQLite database,
+    with an FTS5 index for chunk search.
+
+    Chunks are rows of offsets into ``documents.full_text``. The FTS5 table
+    uses the ``chunk_text`` view as external content, so chunk text is not
+    stored twice. The database runs in WAL mode and every thread gets its
+    own connection, so web workers keep reading while ingestion writes.
+    """
+
+    searchable = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            doc_id TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL,
+            meta TEXT NOT NULL,
+            full_text TEXT NOT NULL,
+            structure TEXT,
+            layout TEXT
+        );
+        CREATE TABLE IF NOT EXISTS sections (
+            doc_id TEXT NOT NULL REFERENCES documents (doc_id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            text_offset INTEGER,
+            PRIMARY KEY (doc_id, position)
+        );
+        CREATE TABLE IF NOT EXISTS doc_tables (
+            doc_id TEXT NOT NULL REFERENCES documents (doc_id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            page INTEGER,
+            data TEXT NOT NULL,
+            PRIMARY KEY (doc_id, position)
+        );
+        CREATE TABLE IF NOT EXISTS chunks (
+            id INTEGER PRIMARY KEY,
+            doc_id TEXT NOT NULL REFERENCES documents (doc_id) ON DELETE CASCADE,
+            chunk_index INTEGER NOT NULL,
+            start_offset INTEGER NOT NULL,
+            end_offset INTEGER NOT NULL,
+            page INTEGER NOT NULL,
+            UNIQUE (doc_id, chunk_index)
+        );
+        CREATE VIEW IF NOT EXISTS chunk_text AS
+            SELECT c.id AS id, c.doc_id AS doc_id,
+                   substr(d.full_text, c.start_offset + 1, c.end_offset - c.start_offset) AS content
+            FROM chunks c JOIN documents d ON d.doc_id = c.doc_id;
+        CREATE VIRTUAL TABLE IF NOT EXISTS chunk_fts USING fts5(
+            content, content='chunk_text', content_rowid='id'
+        );
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Open (and if needed create) the database.
+
+        Args:
+            path: SQLite database path (defaults to Config.SQLITE_PATH)
+        """
+        self.path = str(path or Config.SQLITE_PATH)
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def save(self, document: Dict[str, Any]) -> None:
+        """
+        Save a processed document and index its chunks, replacing any earlier version.
+
+        Args:
+            document: Processed document data with a 'doc_id'
+        """
+        doc_id = document['doc_id']
+        structure = dict(document.get('structure') or {})
+        sections = structure.pop('sections', [])
+        meta = {key: value for key, value in document.items() if key not in SECTION_KEYS}
+        offsets = pack_chunk_offsets(document.get('chunk_offsets', []))
+
+        # Unique per write, so open views notice a replaced document
+        generation = time.time_ns()
+
+        conn = self._connection()
+        with conn:
+            self._delete(conn, doc_id)
+
+            conn.execute(
+                "INSERT INTO documents (doc_id, generation, meta, full_text, structure, layout) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    doc_id, generation, _dumps(meta), document.get('full_text', ''),
+                    _dumps(structure), _dumps(document.get('layout', []))
+                )
+            )
+            conn.executemany(
+                "INSERT INTO sections (doc_id, position, title, content, text_offset) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (doc_id, i, section.get('title', ''), section.get('content', ''), section.get('position'))
+                    for i, section in enumerate(sections)
+                ]
+            )
+            conn.executemany(
+                "INSERT INTO doc_tables (doc_id, position, page, data) VALUES (?, ?, ?, ?)",
+                [
+                    (doc_id, i, table.get('page'), _dumps(table))
+                    for i, table in enumerate(document.get('tables', []))
+                ]
+            )
+            conn.executemany(
+                "INSERT INTO chunks (doc_id, chunk_index, start_offset, end_offset, page) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (doc_id, i, offsets[3 * i], offsets[3 * i + 1], offsets[3 * i + 2])
+                    for i in range(len(offsets) // 3)
+                ]
+            )
+            conn.execute(
+                "INSERT INTO chunk_fts (rowid, content) SELECT id, content FROM chunk_text WHERE doc_id = ?",
+                (doc_id,)
+            )
+
+    def _delete(self, conn: sqlite3.Connection, doc_id: str) -> int:
+        """Delete a document inside an open transaction; returns rows deleted."""
+        # External content: the FTS entries are removed with the text they were built from
+        conn.execute(
+            "INSERT INTO chunk_fts (chunk_fts, rowid, content) "
+            "SELECT 'delete', id, content FROM chunk_text WHERE doc_id = ?",
+            (doc_id,)
+        )
+        return conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,)).rowcount
+
+    def load(self, doc_id: str) -> Optional[Mapping]:
+        """
+        Open a stored document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Lazily loaded document, or None if the document is not stored
+        """
+        if not self.exists(doc_id):
+            return None
+
+        sections = ['meta', 'text', 'chunks', 'structure', 'tables', 'layout']
+        return LazyDocument(_SQLiteReader(self, doc_id, sections))
+
+    def _read_section(self, doc_id: str, name: str) -> Tuple[int, Any]:
+        """Read one section of a document together with its generation."""
+        conn = self._connection()
+
+        # One read transaction, so the generation matches the section
+        with conn:
+            conn.execute("BEGIN")
+            row = conn.execute(
+                "SELECT generation, meta, structure, layout FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Document '{doc_id}' is no longer stored")
+            generation, meta, structure, layout = row
+
+            if name == 'meta':
+                value = json.loads(meta)
+            elif name == 'layout':
+                value = json.loads(layout)
+            elif name == 'text':
+                value = conn.execute(
+                    "SELECT full_text FROM documents WHERE doc_id = ?", (doc_id,)
+                ).fetchone()[0]
+            elif name == 'chunks':
+                value = array('I')
+                for span in conn.execute(
+                    "SELECT start_offset, end_offset, page FROM chunks WHERE doc_id = ? ORDER BY chunk_index", (doc_id,)
+                ):
+                    value.extend(span)
+            elif name == 'structure':
+                value = json.loads(structure)
+                value['sections'] = [
+                    {'title': title, 'content': content, 'position': position}
+                    for title, content, position in conn.execute(
+                        "SELECT title, content, text_offset FROM sections WHERE doc_id = ? ORDER BY position",
+                        (doc_id,)
+                    )
+                ]
+            elif name == 'tables':
+                value = [
+                    json.loads(data) for (data,) in conn.execute(
+                        "SELECT data FROM doc_tables WHERE doc_id = ? ORDER BY position", (doc_id,)
+                    )
+                ]
+            else:
+                raise KeyError(name)
+
+        return generation, value
+
+    def exists(self, doc_id: str) -> bool:
+        """Check whether a document is stored."""
+        row = self._connection().execute(
+            "SELECT 1 FROM documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        return row is not None
+
+    def doc_ids(self) -> List[str]:
+        """
+        List stored documents.
+
+        Returns:
+            Sorted document identifiers
+        """
+        return [
+            doc_id for (doc_id,) in self._connection().execute(
+                "SELECT doc_id FROM documents ORDER BY doc_id"
+            )
+        ]
+
+    def delete(self, doc_id: str) -> bool:
+        """
+        Delete a stored document and its chunks from the search index.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            True if something was deleted
+        """
+        conn = self._connection()
+        with conn:
+            return self._delete(conn, doc_id) > 0
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        doc_id: Optional[str] = None
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Rank chunks against a query with FTS5's BM25.
+
+        Args:
+            query: Free-text query
+            k: Number of results to return
+            doc_id: Optional document to restrict the search to
+
+        Returns:
+            List of (doc_id, chunk_index, score), best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        match = " OR ".join(f'"{term}"' for term in terms)
+        sql = (
+            "SELECT c.doc_id, c.chunk_index, bm25(chunk_fts) AS rank "
+            "FROM chunk_fts JOIN chunks c ON c.id = chunk_fts.rowid "
+            "WHERE chunk_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if doc_id is not None:
+            sql += " AND c.doc_id = ?"
+            params.append(doc_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(k)
+
+        # FTS5's bm25() is lower-is-better; flip it to match BM25Index
+        return [
+            (hit_doc_id, chunk_index, -rank)
+            for hit_doc_id, chunk_index, rank in self._connection().execute(sql, params)
+        ]
+
+
+def _dumps(value: Any) -> str:
+    """Compact JSON for structured columns."""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+DOCUMENT_STORES = {
+    'binary': BinaryDocumentStore,
+    'sqlite': SQLiteDocumentStore,
+}
+
+
+def get_document_store(backend: str = None):
+    """
+    Create the document store for a storage backend.
+
+    Args:
+        backend: Backend name (defaults to Config.STORAGE_BACKEND)
+
+    Returns:
+        Document store instance
+    """
+    backend = backend or Config.STORAGE_BACKEND
+
+    if backend not in DOCUMENT_STORES:
+        raise ValueError(f"Unsupported storage backend: {backend}")
+
+    return DOCUMENT_STORES[backend]()
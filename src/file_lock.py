@@ -0,0 +1,91 @@
+"""
+File Lock Module
+Exclusive lock shared by the threads of this process and by every other
+process opening the same lock file, used to serialize index writers.
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from src.utils import setup_logging
+
+logger = setup_logging(__name__)
+
+
+class FileLock:
+    """
+    Reentrant exclusive lock on a file.
+
+    ``flock`` excludes other processes; a reentrant thread lock excludes
+    other threads of this process (``flock`` is per open file) and lets the
+    holder take the lock again. Without ``fcntl`` only threads are excluded.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the lock; the file is created when first locked.
+
+        Args:
+            path: Lock file path
+        """
+        self.path = str(path)
+        self._lock = threading.RLock()
+        self._fd = None
+        self._depth = 0
+
+        if fcntl is None:
+            logger.warning("File locking unavailable; writers are only serialized within a process")
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Take the lock.
+
+        Args:
+            blocking: Wait for the lock instead of giving up if it is held
+
+        Returns:
+            True if the lock was taken
+        """
+        if not self._lock.acquire(blocking):
+            return False
+
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                    except BlockingIOError:
+                        os.close(fd)
+                        self._lock.release()
+                        return False
+                self._fd = fd
+            except BaseException:
+                self._lock.release()
+                raise
+
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        """Release the lock taken by ``acquire``."""
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self._lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
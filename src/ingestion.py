@@ -0,0 +1,407 @@
+"""
+Ingestion Module
+Runs CPU-bound document extraction in isolated worker processes, tracks
+ingested files in a manifest and queues uploads for background ingestion.
+"""
+
+import os
+import re
+import time
+import uuid
+import queue
+import hashlib
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.utils import setup_logging, save_json, load_json, Config
+
+logger = setup_logging(__name__)
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _pool_worker(func: Callable[[Any], Any], item: Any, conn) -> None:
+    """
+    Run one task in a child process and send its outcome back to the parent.
+
+    Args:
+        func: Picklable callable to run
+        item: Argument for the callable
+        conn: Write end of the result pipe
+    """
+    try:
+        conn.send((True, func(item)))
+    except BaseException as e:
+        conn.send((False, f"{type(e).__name__}: {str(e)}"))
+    finally:
+        conn.close()
+
+
+def run_in_process_pool(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: int,
+    timeout: Optional[float] = None
+) -> Iterator[Tuple[Any, bool, Any]]:
+    """
+    Run ``func`` over ``items`` with at most ``workers`` child processes.
+
+    Every item gets its own process, so a crash or hang only affects that
+    item: a process that exceeds ``timeout`` is terminated, and one that dies
+    without reporting is recorded as failed. Results are yielded in completion
+    order as they arrive.
+
+    Args:
+        func: Top-level (picklable) callable taking one item
+        items: Items to process
+        workers: Maximum number of concurrent processes
+        timeout: Per-item timeout in seconds (None for no limit)
+
+    Yields:
+        Tuples of (item, succeeded, result or error message)
+    """
+    ctx = multiprocessing.get_context()
+    pending = list(items)
+    pending.reverse()
+    running = {}  # sentinel -> (process, conn, item, started_at)
+
+    def start_next() -> None:
+        item = pending.pop()
+        recv_conn, send_conn = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_pool_worker, args=(func, item, send_conn), daemon=True)
+        process.start()
+        send_conn.close()
+        running[process.sentinel] = (process, recv_conn, item, time.monotonic())
+
+    try:
+        while pending or running:
+            while pending and len(running) < max(1, workers):
+                start_next()
+
+            wait_for = None
+            if timeout is not None:
+                oldest = min(started for _, _, _, started in running.values())
+                wait_for = max(0.0, oldest + timeout - time.monotonic())
+
+            ready = set(wait(
+                [conn for _, conn, _, _ in running.values()] + list(running.keys()),
+                timeout=wait_for
+            ))
+
+            for sentinel, (process, conn, item, started) in list(running.items()):
+                outcome = None
+
+                if conn in ready or sentinel in ready:
+                    # Read before joining: a large result blocks the child until drained
+                    try:
+                        outcome = conn.recv()
+                    except (EOFError, OSError):
+                        process.join()
+                        outcome = (False, f"worker exited with code {process.exitcode}")
+                elif timeout is not None and time.monotonic() - started >= timeout:
+                    process.terminate()
+                    outcome = (False, f"timed out after {timeout:g}s")
+
+                if outcome is None:
+                    continue
+
+                process.join()
+                conn.close()
+                del running[sentinel]
+
+                succeeded, result = outcome
+                if not succeeded:
+                    logger.debug(f"Worker failed on {item}: {result}")
+                yield item, succeeded, result
+    finally:
+        for process, conn, _, _ in running.values():
+            process.terminate()
+            process.join()
+            conn.close()
+
+
+def file_sha256(filepath: str, block_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 hex digest of a file.
+
+    Args:
+        filepath: Path to the file
+        block_size: Read size in bytes
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """
+    Persistent record of ingested files, used to skip unchanged PDFs.
+
+    Each entry is keyed by document ID and stores the source path, content
+    hash, size, mtime and the pipeline version that produced the output.
+    Size and mtime are a cheap first check; the file is only hashed when
+    they differ from the recorded values.
+    """
+
+    def __init__(self, manifest_path: str, pipeline_version: str):
+        """
+        Initialize the manifest, loading existing entries from disk.
+
+        Args:
+            manifest_path: Path to the manifest JSON file
+            pipeline_version: Current processing pipeline version
+        """
+        self.manifest_path = str(manifest_path)
+        self.pipeline_version = pipeline_version
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.manifest_path):
+            try:
+                self.entries = load_json(self.manifest_path).get('files', {})
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {str(e)}")
+
+    def is_current(self, pdf_path: str, doc_id: str) -> bool:
+        """
+        Check whether a file is unchanged since it was last ingested.
+
+        Args:
+            pdf_path: Path to the PDF file
+            doc_id: Document identifier the file is stored under
+
+        Returns:
+            True if the recorded output is still valid for this file
+        """
+        with self._lock:
+            entry = self.entries.get(doc_id)
+
+        if not entry or entry.get('pipeline_version') != self.pipeline_version:
+            return False
+
+        stat = os.stat(pdf_path)
+        if stat.st_size != entry.get('size'):
+            return False
+        if stat.st_mtime == entry.get('mtime'):
+            return True
+
+        # Touched but possibly identical (e.g. copied back in): compare content
+        if file_sha256(pdf_path) != entry.get('sha256'):
+            return False
+
+        with self._lock:
+            entry['mtime'] = stat.st_mtime
+        return True
+
+    def record(self, pdf_path: str, doc_id: str, sha256: Optional[str] = None) -> None:
+        """
+        Record a successfully ingested file.
+
+        Args:
+            pdf_path: Path to the PDF file
+            doc_id: Document identifier the file is stored under
+            sha256: Precomputed content hash (computed if omitted)
+        """
+        stat = os.stat(pdf_path)
+        entry = {
+            'path': str(Path(pdf_path).resolve()),
+            'sha256': sha256 or file_sha256(pdf_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'pipeline_version': self.pipeline_version,
+            'ingested_at': time.time(),
+        }
+
+        with self._lock:
+            self.entries[doc_id] = entry
+
+    def remove(self, doc_id: str) -> None:
+        """Forget a document so it is re-ingested next time."""
+        with self._lock:
+            self.entries.pop(doc_id, None)
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+        with self._lock:
+            data = {'pipeline_version': self.pipeline_version, 'files': dict(self.entries)}
+
+            tmp_path = f"{self.manifest_path}.tmp"
+            save_json(data, tmp_path)
+            os.replace(tmp_path, self.manifest_path)
+
+
+class IngestionJobQueue:
+    """
+    Background queue that ingests uploaded files one job at a time.
+
+    Jobs are processed by daemon worker threads so HTTP handlers can return
+    immediately with a job ID and let clients poll for the result. Each job
+    record is also written to ``jobs_dir``, so a status poll answered by
+    another server process (e.g. another gunicorn worker) finds the job.
+    """
+
+    # Job states
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        handler: Callable[[str], Dict[str, Any]],
+        workers: int = 1,
+        max_history: int = 1000,
+        jobs_dir: Optional[str] = None
+    ):
+        """
+        Initialize the job queue and start its worker threads.
+
+        Args:
+            handler: Callable that ingests one file path and returns its document data
+            workers: Number of worker threads
+            max_history: Number of finished jobs to keep for status lookups
+            jobs_dir: Directory of job records shared with other processes
+                (defaults to Config.INGEST_JOBS_DIR)
+        """
+        self.handler = handler
+        self.max_history = max_history
+        self.jobs_dir = Path(jobs_dir if jobs_dir is not None else Config.INGEST_JOBS_DIR)
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished = []
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._prune_records()
+
+        for i in range(max(1, workers)):
+            thread = threading.Thread(
+                target=self._run, name=f"ingestion-worker-{i}", daemon=True
+            )
+            thread.start()
+
+    def submit(self, filepath: str) -> str:
+        """
+        Queue a file for ingestion.
+
+        Args:
+            filepath: Path to the file to ingest
+
+        Returns:
+            Job identifier
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'filename': Path(filepath).name,
+            'status': self.QUEUED,
+            'doc_id': None,
+            'error': None,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+
+        with self._lock:
+            self.jobs[job_id] = job
+            self._save_record(job)
+        self._queue.put((job_id, filepath))
+
+        logger.info(f"Queued ingestion job {job_id} for {filepath}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a snapshot of a job's status.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Copy of the job record or None if unknown
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return dict(job)
+
+        # Submitted to another process
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            return load_json(str(self._record_path(job_id)))
+        except (OSError, ValueError):
+            return None
+
+    def _run(self) -> None:
+        """Worker loop: process queued jobs forever."""
+        while True:
+            job_id, filepath = self._queue.get()
+            self._update(job_id, status=self.RUNNING, started_at=time.time())
+
+            try:
+                doc_data = self.handler(filepath)
+                self._update(job_id, status=self.COMPLETED, doc_id=doc_data.get('doc_id'))
+                logger.info(f"Ingestion job {job_id} completed")
+            except Exception as e:
+                self._update(job_id, status=self.FAILED, error=str(e))
+                logger.error(f"Ingestion job {job_id} failed: {str(e)}")
+            finally:
+                self._finish(job_id)
+                self._queue.task_done()
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        """Update fields of a job record."""
+        with self._lock:
+            self.jobs[job_id].update(fields)
+            self._save_record(self.jobs[job_id])
+
+    def _finish(self, job_id: str) -> None:
+        """Stamp a job as finished and trim old finished jobs."""
+        with self._lock:
+            self.jobs[job_id]['finished_at'] = time.time()
+            self._save_record(self.jobs[job_id])
+            self._finished.append(job_id)
+
+            while len(self._finished) > self.max_history:
+                old_id = self._finished.pop(0)
+                self.jobs.pop(old_id, None)
+                self._record_path(old_id).unlink(missing_ok=True)
+
+    def _record_path(self, job_id: str) -> Path:
+        """Path of a job's shared record."""
+        return self.jobs_dir / f"{job_id}.json"
+
+    def _save_record(self, job: Dict[str, Any]) -> None:
+        """Atomically write a job's shared record (caller holds the lock)."""
+        path = self._record_path(job['job_id'])
+        tmp_path = f"{path}.tmp"
+        try:
+            save_json(job, tmp_path, indent=None)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write record of ingestion job {job['job_id']}: {str(e)}")
+
+    def _prune_records(self) -> None:
+        """
+        Delete the oldest shared records beyond ``max_history``; records of
+        processes that exited are otherwise never trimmed.
+        """
+        records = []
+        for path in self.jobs_dir.glob("*.json"):
+            try:
+                records.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+
+        records.sort()
+        for _, path in records[:max(0, len(records) - self.max_history)]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,219 @@
+"""
+Intent Classifier Module
+Fast local query intent classification with a word n-gram naive Bayes model,
+so confident queries skip the LLM classification round trip.
+"""
+
+import re
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils import setup_logging
+
+logger = setup_logging(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Small labeled set shipped with the repo; categories match LLMInterface.classify_query_intent
+INTENT_EXAMPLES: List[Tuple[str, str]] = [
+    # direct_lookup
+    ("What is the conclusion of this paper?", "direct_lookup"),
+    ("What does section 3.2 discuss?", "direct_lookup"),
+    ("What dataset was used for training?", "direct_lookup"),
+    ("Which datasets were used in the experiments?", "direct_lookup"),
+    ("What is the main contribution of the paper?", "direct_lookup"),
+    ("Who are the authors of this paper?", "direct_lookup"),
+    ("What architecture does the model use?", "direct_lookup"),
+    ("How many layers does the network have?", "direct_lookup"),
+    ("What loss function is used?", "direct_lookup"),
+    ("What optimizer and learning rate were used?", "direct_lookup"),
+    ("What baselines do they compare against?", "direct_lookup"),
+    ("What does table 2 show?", "direct_lookup"),
+    ("What are the limitations mentioned?", "direct_lookup"),
+    ("Where was the paper published?", "direct_lookup"),
+    ("What is the title of the paper?", "direct_lookup"),
+    ("What hyperparameters were used?", "direct_lookup"),
+    ("List the key findings", "direct_lookup"),
+    ("What future work do the authors propose?", "direct_lookup"),
+    ("How is the data preprocessed?", "direct_lookup"),
+    ("What does figure 3 illustrate?", "direct_lookup"),
+    # summarization
+    ("Summarize the methodology", "summarization"),
+    ("Summarize the methodology section", "summarization"),
+    ("Give me a summary of the results section", "summarization"),
+    ("Summarize this paper", "summarization"),
+    ("Can you summarize the introduction?", "summarization"),
+    ("Provide a brief summary of the conclusion", "summarization"),
+    ("Give me an overview of the paper", "summarization"),
+    ("Summarise the document", "summarization"),
+    ("Write a short summary of the findings", "summarization"),
+    ("TL;DR of this paper", "summarization"),
+    ("Briefly summarize the approach", "summarization"),
+    ("Give a high level overview of the methods", "summarization"),
+    ("Summarize the related work", "summarization"),
+    ("Condense the discussion section into a few sentences", "summarization"),
+    ("What is this paper about in a nutshell?", "summarization"),
+    ("Summarize the key contributions", "summarization"),
+    # metric_extraction
+    ("What are the accuracy and F1-scores reported?", "metric_extraction"),
+    ("What accuracy scores are reported?", "metric_extraction"),
+    ("Extract all performance metrics", "metric_extraction"),
+    ("What is the precision and recall?", "metric_extraction"),
+    ("What F1 score does the model achieve?", "metric_extraction"),
+    ("Report the AUC of the proposed method", "metric_extraction"),
+    ("What was the final test loss?", "metric_extraction"),
+    ("How well does the model perform on the benchmark?", "metric_extraction"),
+    ("What are the evaluation results?", "metric_extraction"),
+    ("List the performance numbers", "metric_extraction"),
+    ("What BLEU score is reported?", "metric_extraction"),
+    ("What is the top-1 accuracy on ImageNet?", "metric_extraction"),
+    ("Show the metrics from the results table", "metric_extraction"),
+    ("What error rate does the method get?", "metric_extraction"),
+    ("Compare the scores against the baselines", "metric_extraction"),
+    ("What is the mean average precision?", "metric_extraction"),
+    # arxiv_search
+    ("Find papers about neural networks", "arxiv_search"),
+    ("Find recent papers about transformers on ArXiv", "arxiv_search"),
+    ("Search ArXiv for recent work on computer vision", "arxiv_search"),
+    ("Search papers on reinforcement learning", "arxiv_search"),
+    ("Look up paper 2103.14030", "arxiv_search"),
+    ("Show me the latest arxiv papers on diffusion models", "arxiv_search"),
+    ("Are there recent papers about graph neural networks?", "arxiv_search"),
+    ("Find research on federated learning", "arxiv_search"),
+    ("Get papers about large language models from arxiv", "arxiv_search"),
+    ("Search for papers by Yoshua Bengio", "arxiv_search"),
+    ("Find related papers in cs.LG", "arxiv_search"),
+    ("Recommend papers about contrastive learning", "arxiv_search"),
+    ("Papers about speech recognition published this month", "arxiv_search"),
+    ("Search arxiv for protein folding", "arxiv_search"),
+    ("Find new research papers on robotics", "arxiv_search"),
+    ("Look up papers about object detection", "arxiv_search"),
+    # general_question
+    ("What is a transformer?", "general_question"),
+    ("Explain attention mechanisms in simple terms", "general_question"),
+    ("How does backpropagation work?", "general_question"),
+    ("What is the difference between precision and recall in general?", "general_question"),
+    ("Why is batch normalization useful?", "general_question"),
+    ("Can you explain what overfitting means?", "general_question"),
+    ("What is transfer learning?", "general_question"),
+    ("Explain gradient descent", "general_question"),
+    ("What is a convolutional neural network?", "general_question"),
+    ("Hello, what can you do?", "general_question"),
+    ("How should I read a research paper?", "general_question"),
+    ("Explain the concept of embeddings", "general_question"),
+]
+
+SUMMARY_FOCUS = [
+    ("method", "methodology"),
+    ("result", "results"),
+    ("conclusion", "conclusion"),
+    ("introduction", "introduction"),
+]
+
+
+def extract_focus(query: str) -> Optional[str]:
+    """
+    Extract the section a summarization query focuses on.
+
+    Args:
+        query: User query
+
+    Returns:
+        Focus area (e.g. "methodology") or None
+    """
+    query_lower = query.lower()
+
+    if "summar" not in query_lower:
+        return None
+
+    for keyword, focus in SUMMARY_FOCUS:
+        if keyword in query_lower:
+            return focus
+
+    return None
+
+
+def _features(text: str) -> List[str]:
+    """Word unigrams and bigrams of a query."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class IntentClassifier:
+    """
+    Multinomial naive Bayes over word unigrams and bigrams.
+
+    Training on the bundled examples takes well under a millisecond at
+    construction, and classification is a handful of dictionary lookups.
+    """
+
+    def __init__(self, examples: List[Tuple[str, str]] = None, alpha: float = 0.5):
+        """
+        Train the classifier.
+
+        Args:
+            examples: Labeled (query, category) pairs (defaults to INTENT_EXAMPLES)
+            alpha: Additive smoothing
+        """
+        examples = examples or INTENT_EXAMPLES
+        self.alpha = alpha
+
+        class_counts = defaultdict(int)
+        feature_counts = defaultdict(lambda: defaultdict(int))
+        vocabulary = set()
+
+        for text, label in examples:
+            class_counts[label] += 1
+            for feature in _features(text):
+                feature_counts[label][feature] += 1
+                vocabulary.add(feature)
+
+        total = sum(class_counts.values())
+        self.vocabulary = vocabulary
+        self.log_priors = {label: math.log(count / total) for label, count in class_counts.items()}
+        self.log_likelihoods: Dict[str, Dict[str, float]] = {}
+        self.log_unseen: Dict[str, float] = {}
+
+        for label in class_counts:
+            label_total = sum(feature_counts[label].values())
+            denominator = label_total + alpha * (len(vocabulary) + 1)
+            self.log_likelihoods[label] = {
+                feature: math.log((count + alpha) / denominator)
+                for feature, count in feature_counts[label].items()
+            }
+            self.log_unseen[label] = math.log(alpha / denominator)
+
+    def classify(self, query: str) -> Dict[str, Any]:
+        """
+        Classify a query.
+
+        Args:
+            query: User query
+
+        Returns:
+            Dictionary with category, confidence (posterior probability of the
+            category), focus and original query
+        """
+        features = [f for f in _features(query) if f in self.vocabulary]
+
+        if not features:
+            category, confidence = "general_question", 0.0
+        else:
+            scores = {
+                label: prior + sum(
+                    self.log_likelihoods[label].get(f, self.log_unseen[label]) for f in features
+                )
+                for label, prior in self.log_priors.items()
+            }
+            best = max(scores.values())
+            normalizer = sum(math.exp(score - best) for score in scores.values())
+            category = max(scores, key=scores.get)
+            confidence = 1.0 / normalizer
+
+        return {
+            'category': category,
+            'confidence': confidence,
+            'focus': extract_focus(query),
+            'original_query': query
+        }
@@ -0,0 +1,222 @@
+"""
+LLM Cache Module
+Disk-backed cache of LLM responses with TTL expiry and size-bounded LRU
+eviction, stored in SQLite so several processes can share it.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from src.utils import setup_logging, Config
+
+logger = setup_logging(__name__)
+
+
+class ResponseCache:
+    """
+    Persistent LLM response cache.
+
+    Entries expire after ``ttl`` seconds. When the stored responses exceed
+    ``max_bytes``, the least recently used entries are evicted. Recency is
+    tracked to within ``touch_interval`` so that most hits are read-only,
+    and the total size is kept up to date by triggers instead of being
+    summed on every write.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        ttl: float = None,
+        max_bytes: int = None,
+        touch_interval: float = None
+    ):
+        """
+        Initialize the cache, creating the database if needed.
+
+        Args:
+            path: SQLite database path (defaults to Config.LLM_CACHE_PATH)
+            ttl: Entry lifetime in seconds (defaults to Config.LLM_CACHE_TTL)
+            max_bytes: Size bound for stored responses (defaults to Config.LLM_CACHE_MAX_BYTES)
+            touch_interval: Minimum age of an entry's access time before a
+                hit updates it (defaults to Config.LLM_CACHE_TOUCH_INTERVAL)
+        """
+        self.path = str(path or Config.LLM_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else Config.LLM_CACHE_TTL
+        self.max_bytes = max_bytes if max_bytes is not None else Config.LLM_CACHE_MAX_BYTES
+        self.touch_interval = (
+            touch_interval if touch_interval is not None else Config.LLM_CACHE_TOUCH_INTERVAL
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # One transaction, so a database from before the size counter is
+        # counted while no other process can write to it
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cache_size (id, bytes) SELECT 0, COALESCE(SUM(size), 0) FROM responses"
+        )
+        for trigger in (
+            """CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses
+               BEGIN UPDATE cache_size SET bytes = bytes + new.size WHERE id = 0; END""",
+            """CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses
+               BEGIN UPDATE cache_size SET bytes = bytes - old.size WHERE id = 0; END""",
+            """CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses
+               BEGIN UPDATE cache_size SET bytes = bytes - old.size + new.size WHERE id = 0; END""",
+        ):
+            self._conn.execute(trigger)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        Build a cache key for a generation request.
+
+        Args:
+            provider: LLM provider name
+            model: Model name
+            prompt: Full prompt text
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Hex digest identifying the request
+        """
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        payload = json.dumps([provider, model, prompt_hash, float(temperature), int(max_tokens)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from ``make_key``
+            count: Count the lookup in the hit and miss counters; repeat
+                lookups of the same request pass False
+
+        Returns:
+            Cached response or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                if count:
+                    self.misses += 1
+                return None
+
+            if now - row[2] >= self.touch_interval:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            if count:
+                self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response and evict old entries if over the size bound.
+
+        Args:
+            key: Cache key from ``make_key``
+            value: Response text
+        """
+        now = time.time()
+        size = len(value.encode('utf-8'))
+
+        with self._lock:
+            # An upsert rather than INSERT OR REPLACE, whose implicit
+            # delete would not fire the size trigger
+            self._conn.execute(
+                "INSERT INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                (key, value, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under ``max_bytes``."""
+        total = self._conn.execute("SELECT bytes FROM cache_size WHERE id = 0").fetchone()[0]
+
+        while total > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+
+            for key, size in oldest:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters for this process and the size of the shared store.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, evictions, entries and bytes
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total = self._conn.execute("SELECT bytes FROM cache_size WHERE id = 0").fetchone()[0]
+            lookups = self.hits + self.misses
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': total,
+            }
@@ -4,17 +4,125 @@ Provides abstraction layer for interacting with different LLM providers (OpenAI,
 """
 
 import os
-from typing import Dict, List, Any, Optional
+import asyncio
+import weakref
+import threading
+from collections import deque
+from functools import partial
+from typing import Dict, List, Any, Optional, Iterator, Callable, Awaitable, TypeVar
 from abc import ABC, abstractmethod
 
-from src.utils import setup_logging, Config, retry_with_backoff, RateLimiter
+from src.utils import setup_logging, Config, count_tokens
+from src.rate_limiter import RateLimiter, get_rate_limiter
+from src.resilience import RetryPolicy, get_circuit_breaker
+from src.llm_cache import ResponseCache
+from src.singleflight import SingleFlight
+from src.intent_classifier import extract_focus
 
 logger = setup_logging(__name__)
 
+T = TypeVar('T')
+
+
+class ProcessSemaphore:
+    """
+    Async semaphore shared by coroutines on every event loop of the process.
+    
+    An ``asyncio.Semaphore`` belongs to one loop, so loops running in
+    different threads (e.g. one per request) would each get the whole
+    allowance. Waiters are served in order; a released slot is handed to
+    the next waiter on that waiter's own loop.
+    """
+    
+    def __init__(self, value: int):
+        """
+        Initialize the semaphore.
+        
+        Args:
+            value: Number of holders allowed at once
+        """
+        self._value = value
+        self._waiters = deque()
+        self._lock = threading.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait for a slot."""
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and waiter.done() and not waiter.cancelled():
+                # Cancelled just after being handed a slot: pass it on
+                self.release()
+            raise
+    
+    def release(self) -> None:
+        """Give a slot back, to the next waiter if there is one."""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.get_loop().call_soon_threadsafe(self._hand_over, waiter)
+                    return
+                except RuntimeError:
+                    # The waiter's loop is closed; it will never run
+                    continue
+            self._value += 1
+    
+    def _hand_over(self, waiter: asyncio.Future) -> None:
+        """Give a released slot to a waiter (runs on the waiter's loop)."""
+        if waiter.cancelled():
+            self.release()
+        else:
+            waiter.set_result(None)
+    
+    async def __aenter__(self) -> "ProcessSemaphore":
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+_provider_semaphores: Dict[str, ProcessSemaphore] = {}
+_provider_semaphores_lock = threading.Lock()
+
+
+def provider_semaphore(provider: str) -> ProcessSemaphore:
+    """
+    Get the semaphore capping in-flight async requests to a provider.
+    
+    Shared by every client of the provider on any event loop in the process.
+    
+    Args:
+        provider: Provider name
+        
+    Returns:
+        Semaphore allowing Config.LLM_MAX_CONCURRENCY holders
+    """
+    with _provider_semaphores_lock:
+        if provider not in _provider_semaphores:
+            _provider_semaphores[provider] = ProcessSemaphore(max(1, Config.LLM_MAX_CONCURRENCY))
+        return _provider_semaphores[provider]
+
 
 class BaseLLM(ABC):
     """Abstract base class for LLM providers."""
     
+    provider = "base"
+    rate_limiter: Optional[RateLimiter] = None
+    retry_policy = RetryPolicy()
+    
     @abstractmethod
     def generate(self, prompt: str, max_tokens: int = None, temperature: float = None) -> str:
         """Generate text from prompt."""
@@ -24,11 +132,106 @@ class BaseLLM(ABC):
     def generate_with_context(self, messages: List[Dict[str, str]], max_tokens: int = None) -> str:
         """Generate text with conversation context."""
         pass
+    
+    def generate_stream(
+        self, prompt: str, max_tokens: int = None, temperature: float = None
+    ) -> Iterator[str]:
+        """Generate text from prompt, yielding pieces as they arrive."""
+        yield self.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+    
+    async def agenerate(self, prompt: str, max_tokens: int = None, temperature: float = None) -> str:
+        """
+        Async variant of ``generate``.
+        
+        Providers without an async client run the blocking call on the
+        default executor, still under the provider's concurrency cap.
+        """
+        async with provider_semaphore(self.provider):
+            return await asyncio.get_running_loop().run_in_executor(
+                None, partial(self.generate, prompt, max_tokens=max_tokens, temperature=temperature)
+            )
+    
+    async def agenerate_with_context(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = None,
+        temperature: float = None
+    ) -> str:
+        """Async variant of ``generate_with_context`` (see ``agenerate``)."""
+        async with provider_semaphore(self.provider):
+            return await asyncio.get_running_loop().run_in_executor(
+                None, partial(self.generate_with_context, messages, max_tokens=max_tokens)
+            )
+    
+    def _acquire(self, prompt: str, max_tokens: int) -> None:
+        """Wait for the rate limiter, reserving the prompt plus the longest possible answer."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(count_tokens(prompt) + max_tokens)
+    
+    def _settle(self, max_tokens: int, text: Optional[str]) -> Optional[str]:
+        """Return the unused part of the answer reservation; passes ``text`` through."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.refund(max_tokens - count_tokens(text or ""))
+        return text
+    
+    def _request(self, request: Callable[[], T], max_tokens: int = 0) -> T:
+        """
+        Send a provider request under the retry policy and the provider's
+        circuit breaker.
+        
+        Args:
+            request: Callable making the request
+            max_tokens: Answer tokens reserved by ``_acquire``, handed back
+                if the request fails
+            
+        Returns:
+            The provider response
+        """
+        try:
+            return self.retry_policy.call(
+                request, get_circuit_breaker(self.provider), name=f"{self.provider} API"
+            )
+        except BaseException:
+            self._settle(max_tokens, None)
+            raise
+    
+    async def _arequest(
+        self,
+        request: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        max_tokens: int = 0
+    ) -> T:
+        """
+        Send an async provider request under the concurrency cap, rate limit,
+        retry policy and circuit breaker.
+        
+        Args:
+            request: Callable starting the request
+            tokens: Tokens to reserve with the rate limiter
+            max_tokens: Part of ``tokens`` reserved for the answer, handed
+                back if the request fails or is cancelled
+            
+        Returns:
+            The provider response
+        """
+        async with provider_semaphore(self.provider):
+            try:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(tokens)
+                
+                return await self.retry_policy.acall(
+                    request, get_circuit_breaker(self.provider), name=f"{self.provider} API"
+                )
+            except BaseException:
+                self._settle(max_tokens, None)
+                raise
 
 
 class OpenAILLM(BaseLLM):
     """OpenAI GPT implementation."""
     
+    provider = "openai"
+    
     def __init__(self, api_key: str = None, model: str = None):
         """
         Initialize OpenAI LLM.
@@ -48,8 +251,12 @@ class OpenAILLM(BaseLLM):
         if not self.api_key:
             raise ValueError("OpenAI API key not found")
         
-        self.client = OpenAI(api_key=self.api_key)
-        self.rate_limiter = RateLimiter(calls_per_minute=50)
+        # Retries are left to the retry policy so they are not multiplied
+        self.client = OpenAI(api_key=self.api_key, max_retries=0)
+        # Async clients hold connection pools bound to the loop that created them
+        self._async_clients = weakref.WeakKeyDictionary()
+        # Shared by all clients of the provider, across processes with the file backend
+        self.rate_limiter = get_rate_limiter("openai", Config.OPENAI_RPM, Config.OPENAI_TPM)
         
         logger.info(f"Initialized OpenAI LLM with model: {self.model}")
     
@@ -65,30 +272,57 @@ class OpenAILLM(BaseLLM):
         Returns:
             Generated text
         """
-        self.rate_limiter.wait_if_needed()
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        temperature = temperature if temperature is not None else Config.TEMPERATURE
+        
+        self._acquire(prompt, max_tokens)
+        
+        response = self._request(lambda: self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature
+        ), max_tokens)
+        
+        return self._settle(max_tokens, response.choices[0].message.content)
+    
+    def generate_stream(
+        self, prompt: str, max_tokens: int = None, temperature: float = None
+    ) -> Iterator[str]:
+        """
+        Stream text from prompt using OpenAI.
         
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            
+        Yields:
+            Text pieces as they are generated
+        """
         max_tokens = max_tokens or Config.MAX_TOKENS
         temperature = temperature if temperature is not None else Config.TEMPERATURE
         
-        # Retry logic built-in
-        for attempt in range(3):
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-                
-                return response.choices[0].message.content
-                
-            except Exception as e:
-                if attempt < 2:
-                    import time
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    logger.error(f"OpenAI API error: {str(e)}")
-                    raise
+        self._acquire(prompt, max_tokens)
+        
+        # Retry opening the stream; errors after the first token propagate
+        stream = self._request(lambda: self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        ), max_tokens)
+        
+        pieces = []
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    pieces.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Also when the stream breaks or the consumer stops reading
+            self._settle(max_tokens, "".join(pieces))
     
     def generate_with_context(
         self, 
@@ -107,35 +341,83 @@ class OpenAILLM(BaseLLM):
         Returns:
             Generated text
         """
-        self.rate_limiter.wait_if_needed()
-        
         max_tokens = max_tokens or Config.MAX_TOKENS
         temperature = temperature if temperature is not None else Config.TEMPERATURE
         
-        # Retry logic built-in
-        for attempt in range(3):
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-                
-                return response.choices[0].message.content
-                
-            except Exception as e:
-                if attempt < 2:
-                    import time
-                    time.sleep(2 ** attempt)
-                else:
-                    logger.error(f"OpenAI API error: {str(e)}")
-                    raise
+        self._acquire("\n".join(msg["content"] for msg in messages), max_tokens)
+        
+        response = self._request(lambda: self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ), max_tokens)
+        
+        return self._settle(max_tokens, response.choices[0].message.content)
+    
+    def _async_client(self) -> Any:
+        """Get the AsyncOpenAI client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        
+        if client is None:
+            from openai import AsyncOpenAI
+            client = self._async_clients[loop] = AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        
+        return client
+    
+    async def agenerate(self, prompt: str, max_tokens: int = None, temperature: float = None) -> str:
+        """
+        Generate text from prompt using the async OpenAI client.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            
+        Returns:
+            Generated text
+        """
+        return await self.agenerate_with_context(
+            [{"role": "user", "content": prompt}], max_tokens=max_tokens, temperature=temperature
+        )
+    
+    async def agenerate_with_context(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = None,
+        temperature: float = None
+    ) -> str:
+        """
+        Generate text with conversation context using the async OpenAI client.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            
+        Returns:
+            Generated text
+        """
+        client = self._async_client()
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        prompt_tokens = count_tokens("\n".join(msg["content"] for msg in messages))
+        
+        response = await self._arequest(lambda: client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature if temperature is not None else Config.TEMPERATURE
+        ), tokens=prompt_tokens + max_tokens, max_tokens=max_tokens)
+        
+        return self._settle(max_tokens, response.choices[0].message.content)
 
 
 class GeminiLLM(BaseLLM):
     """Google Gemini implementation."""
     
+    provider = "gemini"
+    
     def __init__(self, api_key: str = None, model: str = None):
         """
         Initialize Gemini LLM.
@@ -171,7 +453,7 @@ class GeminiLLM(BaseLLM):
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel(self.model_name)
         
-        self.rate_limiter = RateLimiter(calls_per_minute=60)
+        self.rate_limiter = get_rate_limiter("gemini", Config.GEMINI_RPM, Config.GEMINI_TPM)
         
         logger.info(f"Initialized Gemini LLM with model: {self.model_name}")
     
@@ -187,45 +469,83 @@ class GeminiLLM(BaseLLM):
         Returns:
             Generated text
         """
-        self.rate_limiter.wait_if_needed()
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        temperature = temperature if temperature is not None else Config.TEMPERATURE
         
+        self._acquire(prompt, max_tokens)
+        
+        if self.use_new_api:
+            # New API
+            response = self._request(lambda: self.client.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config={
+                    'temperature': temperature,
+                    'max_output_tokens': max_tokens,
+                }
+            ), max_tokens)
+        else:
+            # Old API (deprecated)
+            generation_config = {
+                'temperature': temperature,
+                'max_output_tokens': max_tokens,
+            }
+            
+            response = self._request(lambda: self.model.generate_content(
+                prompt,
+                generation_config=generation_config
+            ), max_tokens)
+        
+        return self._settle(max_tokens, response.text)
+    
+    def generate_stream(
+        self, prompt: str, max_tokens: int = None, temperature: float = None
+    ) -> Iterator[str]:
+        """
+        Stream text from prompt using Gemini.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            
+        Yields:
+            Text pieces as they are generated
+        """
+        max_tokens = max_tokens or Config.MAX_TOKENS
         temperature = temperature if temperature is not None else Config.TEMPERATURE
+        generation_config = {
+            'temperature': temperature,
+            'max_output_tokens': max_tokens,
+        }
         
-        # Retry logic built-in
-        for attempt in range(3):
-            try:
-                if self.use_new_api:
-                    # New API
-                    response = self.client.models.generate_content(
-                        model=self.model,
-                        contents=prompt,
-                        config={
-                            'temperature': temperature,
-                            'max_output_tokens': max_tokens or Config.MAX_TOKENS,
-                        }
-                    )
-                    return response.text
-                else:
-                    # Old API (deprecated)
-                    generation_config = {
-                        'temperature': temperature,
-                        'max_output_tokens': max_tokens or Config.MAX_TOKENS,
-                    }
-                    
-                    response = self.model.generate_content(
-                        prompt,
-                        generation_config=generation_config
-                    )
-                    
-                    return response.text
-                
-            except Exception as e:
-                if attempt < 2:
-                    import time
-                    time.sleep(2 ** attempt)
-                else:
-                    logger.error(f"Gemini API error: {str(e)}")
-                    raise
+        self._acquire(prompt, max_tokens)
+        
+        # Retry opening the stream; errors after the first token propagate
+        if self.use_new_api:
+            # New API
+            stream = self._request(lambda: self.client.models.generate_content_stream(
+                model=self.model,
+                contents=prompt,
+                config=generation_config
+            ), max_tokens)
+        else:
+            # Old API (deprecated)
+            stream = self._request(lambda: self.model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                stream=True
+            ), max_tokens)
+        
+        pieces = []
+        try:
+            for chunk in stream:
+                if chunk.text:
+                    pieces.append(chunk.text)
+                    yield chunk.text
+        finally:
+            # Also when the stream breaks or the consumer stops reading
+            self._settle(max_tokens, "".join(pieces))
     
     def generate_with_context(
         self, 
@@ -244,43 +564,109 @@ class GeminiLLM(BaseLLM):
         Returns:
             Generated text
         """
-        self.rate_limiter.wait_if_needed()
-        
+        max_tokens = max_tokens or Config.MAX_TOKENS
         temperature = temperature if temperature is not None else Config.TEMPERATURE
         
-        # Retry logic built-in
-        for attempt in range(3):
-            try:
-                # Convert messages to Gemini format
-                chat_history = []
-                for msg in messages[:-1]:
-                    role = "user" if msg["role"] == "user" else "model"
-                    chat_history.append({
-                        "role": role,
-                        "parts": [msg["content"]]
-                    })
-                
-                chat = self.model.start_chat(history=chat_history)
-                
-                generation_config = {
-                    'temperature': temperature,
-                    'max_output_tokens': max_tokens or Config.MAX_TOKENS,
-                }
-                
-                response = chat.send_message(
-                    messages[-1]["content"],
-                    generation_config=generation_config
-                )
-                
-                return response.text
-                
-            except Exception as e:
-                if attempt < 2:
-                    import time
-                    time.sleep(2 ** attempt)
-                else:
-                    logger.error(f"Gemini API error: {str(e)}")
-                    raise
+        self._acquire("\n".join(msg["content"] for msg in messages), max_tokens)
+        
+        # Convert messages to Gemini format
+        chat_history = []
+        for msg in messages[:-1]:
+            role = "user" if msg["role"] == "user" else "model"
+            chat_history.append({
+                "role": role,
+                "parts": [msg["content"]]
+            })
+        
+        generation_config = {
+            'temperature': temperature,
+            'max_output_tokens': max_tokens,
+        }
+        
+        def send() -> Any:
+            # Each attempt starts from a fresh chat so a failed send leaves no partial history
+            chat = self.model.start_chat(history=chat_history)
+            return chat.send_message(messages[-1]["content"], generation_config=generation_config)
+        
+        response = self._request(send, max_tokens)
+        
+        return self._settle(max_tokens, response.text)
+    
+    async def agenerate(self, prompt: str, max_tokens: int = None, temperature: float = None) -> str:
+        """
+        Generate text from prompt using Gemini's async API.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            
+        Returns:
+            Generated text
+        """
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        generation_config = {
+            'temperature': temperature if temperature is not None else Config.TEMPERATURE,
+            'max_output_tokens': max_tokens,
+        }
+        tokens = count_tokens(prompt) + max_tokens
+        
+        if self.use_new_api:
+            response = await self._arequest(lambda: self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=generation_config
+            ), tokens=tokens, max_tokens=max_tokens)
+        else:
+            response = await self._arequest(lambda: self.model.generate_content_async(
+                prompt,
+                generation_config=generation_config
+            ), tokens=tokens, max_tokens=max_tokens)
+        
+        return self._settle(max_tokens, response.text)
+    
+    async def agenerate_with_context(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = None,
+        temperature: float = None
+    ) -> str:
+        """
+        Generate text with conversation context using Gemini's async API.
+        
+        Args:
+            messages: List of message dictionaries
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            
+        Returns:
+            Generated text
+        """
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        generation_config = {
+            'temperature': temperature if temperature is not None else Config.TEMPERATURE,
+            'max_output_tokens': max_tokens,
+        }
+        tokens = count_tokens("\n".join(msg["content"] for msg in messages)) + max_tokens
+        # Convert messages to Gemini format
+        contents = [
+            {"role": "user" if msg["role"] == "user" else "model", "parts": [{"text": msg["content"]}]}
+            for msg in messages
+        ]
+        
+        if self.use_new_api:
+            response = await self._arequest(lambda: self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=generation_config
+            ), tokens=tokens, max_tokens=max_tokens)
+        else:
+            response = await self._arequest(lambda: self.model.start_chat(history=contents[:-1]).send_message_async(
+                messages[-1]["content"],
+                generation_config=generation_config
+            ), tokens=tokens, max_tokens=max_tokens)
+        
+        return self._settle(max_tokens, response.text)
 
 
 class LLMInterface:
@@ -305,8 +691,184 @@ class LLMInterface:
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
         
+        self.cache = ResponseCache() if Config.LLM_CACHE_ENABLED else None
+        # Identical cacheable calls in flight at once share one upstream call
+        self.flights = SingleFlight() if Config.LLM_COALESCE_ENABLED else None
+        
         logger.info(f"LLM Interface initialized with provider: {self.provider}")
     
+    @property
+    def model_name(self) -> str:
+        """Name of the model used by the active provider."""
+        return getattr(self.llm, 'model_name', None) or str(self.llm.model)
+    
+    def _generate(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int = None,
+        cache: Optional[bool] = None
+    ) -> str:
+        """
+        Generate text, serving identical requests from the response cache.
+        
+        Calls identical to one already in flight wait for it and share its
+        response instead of calling the provider again, whether or not the
+        response is cached.
+        
+        Args:
+            prompt: Input prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            cache: Force caching on or off; by default only calls at or below
+                Config.LLM_CACHE_MAX_TEMPERATURE are cached
+            
+        Returns:
+            Generated text
+        """
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        if cache is None:
+            cache = temperature <= Config.LLM_CACHE_MAX_TEMPERATURE
+        cache = cache and self.cache is not None
+        
+        key = ResponseCache.make_key(self.provider, self.model_name, prompt, temperature, max_tokens)
+        
+        if cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+        
+        def call() -> str:
+            if cache:
+                # An identical call may have finished since the lookup above
+                cached = self._cache_get(key, count=False)
+                if cached is not None:
+                    return cached
+            
+            response = self.llm.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+            if cache and response:
+                self.cache.set(key, response)
+            return response
+        
+        if self.flights is None:
+            return call()
+        return self.flights.do(key, call)
+    
+    async def _agenerate(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int = None,
+        cache: Optional[bool] = None
+    ) -> str:
+        """Async variant of ``_generate``, using the provider's async client."""
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        if cache is None:
+            cache = temperature <= Config.LLM_CACHE_MAX_TEMPERATURE
+        cache = cache and self.cache is not None
+        
+        key = ResponseCache.make_key(self.provider, self.model_name, prompt, temperature, max_tokens)
+        loop = asyncio.get_running_loop()
+        
+        # SQLite calls can wait on the database lock or the disk, so they
+        # run on the loop's default executor
+        if cache:
+            cached = await loop.run_in_executor(None, self._cache_get, key)
+            if cached is not None:
+                return cached
+        
+        async def call() -> str:
+            if cache:
+                cached = await loop.run_in_executor(None, partial(self._cache_get, key, count=False))
+                if cached is not None:
+                    return cached
+            
+            response = await self.llm.agenerate(prompt, max_tokens=max_tokens, temperature=temperature)
+            if cache and response:
+                await loop.run_in_executor(None, self.cache.set, key, response)
+            return response
+        
+        if self.flights is None:
+            return await call()
+        return await self.flights.ado(key, call)
+    
+    def _cache_get(self, key: str, count: bool = True) -> Optional[str]:
+        """Look up a response in the cache (see ``ResponseCache.get``)."""
+        cached = self.cache.get(key, count=count)
+        if cached is not None:
+            logger.debug("LLM response cache hit")
+        return cached
+    
+    def _generate_stream(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int = None,
+        cache: Optional[bool] = None
+    ) -> Iterator[str]:
+        """
+        Stream generated text, using the response cache like ``_generate``.
+        
+        A cached response is yielded in one piece; otherwise the streamed
+        pieces are collected and the full response is cached at the end.
+        Callers streaming a request identical to one in flight replay its
+        pieces instead of starting another stream.
+        
+        Args:
+            prompt: Input prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            cache: Force caching on or off (see ``_generate``)
+            
+        Yields:
+            Text pieces as they are generated
+        """
+        max_tokens = max_tokens or Config.MAX_TOKENS
+        if cache is None:
+            cache = temperature <= Config.LLM_CACHE_MAX_TEMPERATURE
+        cache = cache and self.cache is not None
+        
+        key = ResponseCache.make_key(self.provider, self.model_name, prompt, temperature, max_tokens)
+        
+        if cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        def stream() -> Iterator[str]:
+            if cache:
+                cached = self._cache_get(key, count=False)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            pieces = []
+            for piece in self.llm.generate_stream(prompt, max_tokens=max_tokens, temperature=temperature):
+                pieces.append(piece)
+                yield piece
+            
+            if cache and pieces:
+                self.cache.set(key, "".join(pieces))
+        
+        if self.flights is None:
+            yield from stream()
+        else:
+            yield from self.flights.do_stream(key, stream)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get LLM response cache statistics.
+        
+        Returns:
+            Dictionary of cache counters
+        """
+        stats = {'enabled': False} if self.cache is None else {'enabled': True, **self.cache.stats()}
+        if self.flights is not None:
+            stats['coalescing'] = self.flights.stats()
+        
+        return stats
+    
     def answer_question(
         self, 
         question: str, 
@@ -324,12 +886,37 @@ class LLMInterface:
         Returns:
             Answer to the question
         """
+        prompt = self._answer_prompt(question, context, system_prompt)
+        return self._generate(prompt, temperature=0.3)
+    
+    def answer_question_stream(
+        self, 
+        question: str, 
+        context: str, 
+        system_prompt: str = None
+    ) -> Iterator[str]:
+        """Streaming variant of ``answer_question``."""
+        prompt = self._answer_prompt(question, context, system_prompt)
+        return self._generate_stream(prompt, temperature=0.3)
+    
+    async def aanswer_question(
+        self, 
+        question: str, 
+        context: str, 
+        system_prompt: str = None
+    ) -> str:
+        """Async variant of ``answer_question``."""
+        prompt = self._answer_prompt(question, context, system_prompt)
+        return await self._agenerate(prompt, temperature=0.3)
+    
+    def _answer_prompt(self, question: str, context: str, system_prompt: str = None) -> str:
+        """Build the question answering prompt."""
         if system_prompt is None:
             system_prompt = """You are an expert research assistant analyzing scientific documents. 
             Provide accurate, detailed answers based on the given context. 
             If the information is not in the context, clearly state that."""
         
-        prompt = f"""{system_prompt}
+        return f"""{system_prompt}
 
 Context:
 {context}
@@ -337,8 +924,6 @@ Context:
 Question: {question}
 
 Answer:"""
-        
-        return self.llm.generate(prompt, temperature=0.3)
     
     def summarize_text(self, text: str, focus: str = None) -> str:
         """
@@ -351,17 +936,118 @@ Answer:"""
         Returns:
             Summary
         """
+        return self._generate(self._summary_prompt(text, focus), temperature=0.5)
+    
+    def summarize_text_stream(self, text: str, focus: str = None) -> Iterator[str]:
+        """Streaming variant of ``summarize_text``."""
+        return self._generate_stream(self._summary_prompt(text, focus), temperature=0.5)
+    
+    async def asummarize_text(self, text: str, focus: str = None) -> str:
+        """Async variant of ``summarize_text``."""
+        return await self._agenerate(self._summary_prompt(text, focus), temperature=0.5)
+    
+    def _summary_prompt(self, text: str, focus: str = None) -> str:
+        """Build the summarization prompt."""
         focus_instruction = f"Focus specifically on the {focus}." if focus else ""
         
-        prompt = f"""Summarize the following text in a clear and concise manner.
+        return f"""Summarize the following text in a clear and concise manner.
         {focus_instruction}
         
 Text:
 {text}
 
 Summary:"""
+    
+    def summarize_section(self, text: str, focus: str = None) -> str:
+        """
+        Summarize one part of a longer document (the map step of
+        ``summarizer.MapReduceSummarizer``).
         
-        return self.llm.generate(prompt, temperature=0.5)
+        Partial summaries are always cached, so the same part is only
+        summarized once.
+        
+        Args:
+            text: Part of the document
+            focus: Optional focus area
+            
+        Returns:
+            Partial summary
+        """
+        return self._generate(
+            self._section_prompt(text, focus), temperature=0.3,
+            max_tokens=Config.SUMMARY_PARTIAL_TOKENS, cache=True
+        )
+    
+    async def asummarize_section(self, text: str, focus: str = None) -> str:
+        """Async variant of ``summarize_section``."""
+        return await self._agenerate(
+            self._section_prompt(text, focus), temperature=0.3,
+            max_tokens=Config.SUMMARY_PARTIAL_TOKENS, cache=True
+        )
+    
+    def combine_summaries(self, summaries: List[str], focus: str = None, final: bool = True) -> str:
+        """
+        Combine partial summaries of consecutive parts of a document.
+        
+        Args:
+            summaries: Partial summaries, in document order
+            focus: Optional focus area
+            final: Write the final summary; otherwise another (cached)
+                partial summary for the next level
+                
+        Returns:
+            Combined summary
+        """
+        if final:
+            return self._generate(self._combine_prompt(summaries, focus, final), temperature=0.5)
+        return self._generate(
+            self._combine_prompt(summaries, focus, final), temperature=0.3,
+            max_tokens=Config.SUMMARY_PARTIAL_TOKENS, cache=True
+        )
+    
+    def combine_summaries_stream(self, summaries: List[str], focus: str = None) -> Iterator[str]:
+        """Streaming variant of ``combine_summaries`` for the final summary."""
+        return self._generate_stream(self._combine_prompt(summaries, focus, True), temperature=0.5)
+    
+    async def acombine_summaries(self, summaries: List[str], focus: str = None, final: bool = True) -> str:
+        """Async variant of ``combine_summaries``."""
+        if final:
+            return await self._agenerate(self._combine_prompt(summaries, focus, final), temperature=0.5)
+        return await self._agenerate(
+            self._combine_prompt(summaries, focus, final), temperature=0.3,
+            max_tokens=Config.SUMMARY_PARTIAL_TOKENS, cache=True
+        )
+    
+    def _section_prompt(self, text: str, focus: str = None) -> str:
+        """Build the prompt summarizing one part of a document."""
+        focus_instruction = f"Keep everything about the {focus}." if focus else ""
+        
+        return f"""The following text is one part of a longer document. Summarize it,
+keeping its key points, methods, results and numbers.
+        {focus_instruction}
+        
+Text:
+{text}
+
+Summary:"""
+    
+    def _combine_prompt(self, summaries: List[str], focus: str, final: bool) -> str:
+        """Build the prompt combining partial summaries."""
+        parts = "\n\n".join(f"Part {i}:\n{summary}" for i, summary in enumerate(summaries, 1))
+        if final:
+            focus_instruction = f"Focus specifically on the {focus}." if focus else ""
+            task = "Write a clear and concise summary of the whole document."
+        else:
+            focus_instruction = f"Keep everything about the {focus}." if focus else ""
+            task = "Combine them into one summary of these parts, keeping the key points and numbers."
+        
+        return f"""The following are summaries of consecutive parts of a document, in order.
+{task}
+        {focus_instruction}
+        
+{parts}
+
+Summary:"""
     
     def extract_metrics(self, text: str) -> str:
         """
@@ -373,7 +1059,19 @@ Summary:"""
         Returns:
             Extracted metrics
         """
-        prompt = f"""Extract all performance metrics from the following text.
+        return self._generate(self._metrics_prompt(text), temperature=0.1)
+    
+    def extract_metrics_stream(self, text: str) -> Iterator[str]:
+        """Streaming variant of ``extract_metrics``."""
+        return self._generate_stream(self._metrics_prompt(text), temperature=0.1)
+    
+    async def aextract_metrics(self, text: str) -> str:
+        """Async variant of ``extract_metrics``."""
+        return await self._agenerate(self._metrics_prompt(text), temperature=0.1)
+    
+    def _metrics_prompt(self, text: str) -> str:
+        """Build the metric extraction prompt."""
+        return f"""Extract all performance metrics from the following text.
         Include metrics such as accuracy, F1-score, precision, recall, AUC, loss, etc.
         Format the output as a structured list with metric names and values.
         
@@ -381,8 +1079,6 @@ Text:
 {text}
 
 Extracted Metrics:"""
-        
-        return self.llm.generate(prompt, temperature=0.1)
     
     def classify_query_intent(self, query: str) -> Dict[str, Any]:
         """
@@ -394,7 +1090,17 @@ Extracted Metrics:"""
         Returns:
             Dictionary with query classification
         """
-        prompt = f"""Classify the following query into one of these categories:
+        response = self._generate(self._intent_prompt(query), temperature=0, max_tokens=50)
+        return self._parse_intent(query, response)
+    
+    async def aclassify_query_intent(self, query: str) -> Dict[str, Any]:
+        """Async variant of ``classify_query_intent``."""
+        response = await self._agenerate(self._intent_prompt(query), temperature=0, max_tokens=50)
+        return self._parse_intent(query, response)
+    
+    def _intent_prompt(self, query: str) -> str:
+        """Build the intent classification prompt."""
+        return f"""Classify the following query into one of these categories:
         1. direct_lookup - Looking for specific content
         2. summarization - Requesting a summary
         3. metric_extraction - Asking for performance metrics
@@ -405,10 +1111,9 @@ Query: {query}
 
 Respond with only the category name (e.g., "summarization").
 Category:"""
-        
-        # category = self.llm.generate(prompt, temperature=0, max_tokens=50).strip().lower()
-        response = self.llm.generate(prompt, temperature=0, max_tokens=50)
-
+    
+    def _parse_intent(self, query: str, response: Optional[str]) -> Dict[str, Any]:
+        """Turn the classification response into an intent dictionary."""
         if not response:
             logger.error("LLM returned empty response while classifying query intent")
             category = "general_question"
@@ -417,16 +1122,7 @@ Category:"""
 
 
         # Extract focus if it's a summarization query
-        focus = None
-        if "summar" in query.lower():
-            if "method" in query.lower():
-                focus = "methodology"
-            elif "result" in query.lower():
-                focus = "results"
-            elif "conclusion" in query.lower():
-                focus = "conclusion"
-            elif "introduction" in query.lower():
-                focus = "introduction"
+        focus = extract_focus(query)
         
         return {
             'category': category,
@@ -467,7 +1163,7 @@ Available Functions:
 Should any function be called? If yes, which one and with what parameters?
 Response:"""
         
-        response = self.llm.generate(prompt, temperature=0.3)
+        response = self._generate(prompt, temperature=0.3)
         
         return {
             'response': response,
@@ -0,0 +1,167 @@
+"""
+Query Cache Module
+In-memory cache of final answers, keyed by the normalized question and
+the corpus version so that any change to the documents invalidates it.
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.utils import setup_logging, Config
+
+logger = setup_logging(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question so trivially different phrasings share an entry.
+
+    Lowercases, collapses whitespace and drops trailing punctuation.
+
+    Args:
+        question: Sanitized user question
+
+    Returns:
+        Normalized question
+    """
+    return re.sub(r'\s+', ' ', question.lower()).strip().rstrip('?!. ')
+
+
+class QueryCache:
+    """
+    LRU cache of answers for (question, doc_id) at a corpus version.
+
+    The key does not include the intent category, which is derived from
+    the question, so a hit is found before the question is classified.
+
+    The cache remembers the corpus version of its entries; the first lookup
+    at a newer version drops them all, and lookups or answers at an older
+    version are ignored. Entries also expire after ``ttl``
+    seconds, and the least recently used ones are evicted beyond
+    ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of answers kept (defaults to Config.QUERY_CACHE_MAX_ENTRIES)
+            ttl: Entry lifetime in seconds, 0 for none (defaults to Config.QUERY_CACHE_TTL)
+        """
+        self.max_entries = max_entries if max_entries is not None else Config.QUERY_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.QUERY_CACHE_TTL
+
+        self._entries = OrderedDict()  # (question, doc_id) -> (answer, time stored)
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: int) -> bool:
+        """
+        Drop every entry if the corpus changed since they were stored.
+
+        Returns:
+            False if ``version`` is older than the cached entries'
+        """
+        if self._version is not None and version < self._version:
+            return False
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logger.debug(f"Corpus version {version}; dropping {len(self._entries)} cached answers")
+            self._entries.clear()
+            self._version = version
+        return True
+
+    def get(self, question: str, doc_id: Optional[str], version: int) -> Optional[str]:
+        """
+        Look up a cached answer.
+
+        Args:
+            question: Sanitized user question
+            doc_id: Document the question was restricted to, if any
+            version: Current corpus version
+
+        Returns:
+            Cached answer or None on a miss
+        """
+        key = (normalize_question(question), doc_id)
+
+        with self._lock:
+            # A lookup that read the version before an ingest neither hits
+            # nor rolls the cache back to its version
+            entry = self._entries.get(key) if self._check_version(version) else None
+            if entry is not None and self.ttl and time.time() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, question: str, doc_id: Optional[str], version: int, answer: str) -> None:
+        """
+        Store an answer computed at a corpus version.
+
+        Answers computed against a version that is no longer current are
+        discarded.
+
+        Args:
+            question: Sanitized user question
+            doc_id: Document the question was restricted to, if any
+            version: Corpus version the answer was computed at
+            answer: Answer text
+        """
+        if self.max_entries <= 0:
+            return
+
+        key = (normalize_question(question), doc_id)
+
+        with self._lock:
+            if not self._check_version(version):
+                return
+
+            self._entries[key] = (answer, time.time())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Forget every answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, evictions, invalidations,
+            entries and corpus version
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'corpus_version': self._version,
+            }
@@ -4,13 +4,23 @@ Orchestrates document processing, LLM interactions, and ArXiv integration
 to provide intelligent query handling.
 """
 
-from typing import Dict, List, Any, Optional
+import time
+import asyncio
+import threading
+from functools import partial
+from typing import Dict, List, Any, Optional, Iterator
 from pathlib import Path
 
 from src.document_processor import DocumentProcessor
+from src.file_lock import FileLock
 from src.llm_interface import LLMInterface
 from src.arxiv_integration import ArxivIntegration, ARXIV_FUNCTIONS
-from src.utils import setup_logging, sanitize_input, extract_metrics
+from src.retrieval import HybridRetriever
+from src.intent_classifier import IntentClassifier
+from src.query_cache import QueryCache
+from src.summarizer import MapReduceSummarizer
+from src.context_packer import context_budget, pack_context
+from src.utils import setup_logging, sanitize_input, extract_metrics, truncate_to_tokens, count_tokens, Config
 
 logger = setup_logging(__name__)
 
@@ -30,18 +40,38 @@ class QueryEngine:
         self.doc_processor = DocumentProcessor()
         self.llm = LLMInterface(provider=llm_provider)
         self.arxiv = ArxivIntegration()
+        self.intent_classifier = IntentClassifier()
+        
+        self.hybrid_retriever = None
+        if Config.RETRIEVAL_MODE == "hybrid":
+            self.hybrid_retriever = HybridRetriever()
+            self.hybrid_retriever.add_retriever(
+                "keyword", self.doc_processor.search_content,
+                weight=Config.KEYWORD_WEIGHT, budget_ms=Config.KEYWORD_BUDGET_MS
+            )
+            self.hybrid_retriever.add_retriever(
+                "vector", self.doc_processor.vector_search,
+                weight=Config.VECTOR_WEIGHT, budget_ms=Config.VECTOR_BUDGET_MS
+            )
+        
+        self.query_cache = QueryCache() if Config.QUERY_CACHE_ENABLED else None
+        self.summarizer = MapReduceSummarizer(self.llm) if Config.SUMMARY_MAP_REDUCE else None
         
         self.conversation_history = []
         self.documents_ready = False
+        self.consistency_check = None
         
         logger.info("Query Engine initialized")
 
-    def ingest_documents(self, pdf_directory: str = "data/pdfs") -> Dict[str, Any]:
+    def ingest_documents(self, pdf_directory: str = "data/pdfs", force: bool = False) -> Dict[str, Any]:
         """
         Ingest and process all PDFs before allowing queries.
 
+        Unchanged PDFs are skipped using the ingestion manifest.
+
         Args:
             pdf_directory: Directory containing PDF files
+            force: Reprocess every PDF even if it is unchanged
 
         Returns:
             Processed documents dictionary
@@ -55,7 +85,7 @@ class QueryEngine:
 
         logger.info("Starting document ingestion...")
         
-        processed_docs = self.process_documents(str(pdf_path))
+        processed_docs = self.process_documents(str(pdf_path), force=force)
 
         if not processed_docs:
             logger.warning("No documents were processed.")
@@ -67,20 +97,122 @@ class QueryEngine:
 
         return processed_docs
 
+
+    def warm_start(self, pdf_directory: str = None, check: bool = True) -> int:
+        """
+        Serve queries from the persisted document store and indexes.
+
+        Stored documents become queryable immediately, without touching the
+        PDFs. If ``check`` is set, a background thread then re-ingests only
+        the PDFs that are new or changed since they were stored.
+
+        Args:
+            pdf_directory: Directory containing PDF files (defaults to Config.PDF_DIR)
+            check: Start the background consistency check
+
+        Returns:
+            Number of stored documents available for queries
+        """
+        start = time.monotonic()
+        doc_ids = self.doc_processor.list_documents()
+
+        if doc_ids:
+            self.documents_ready = True
+
+        logger.info(
+            f"Warm start: {len(doc_ids)} stored documents ready in {time.monotonic() - start:.2f}s"
+        )
+
+        if check:
+            self.start_consistency_check(pdf_directory)
+
+        return len(doc_ids)
+
+    def refresh(self) -> None:
+        """
+        Pick up documents ingested or deleted by other processes.
+
+        Costs a ``stat`` when nothing changed; queries call it first.
+        """
+        if self.doc_processor.refresh():
+            self.documents_ready = bool(self.doc_processor.list_documents())
+
+    def start_consistency_check(self, pdf_directory: str = None) -> threading.Thread:
+        """
+        Re-ingest new or changed PDFs on a background thread.
+
+        Unchanged PDFs are skipped using the ingestion manifest, so this only
+        costs a stat (and at most a hash) per file when nothing changed.
+        Only one process sharing the processed directory (e.g. one of the
+        gunicorn workers) runs the check; the others skip it and pick up its
+        results on their next query.
+
+        Args:
+            pdf_directory: Directory containing PDF files (defaults to Config.PDF_DIR)
+
+        Returns:
+            The started thread
+        """
+        self.consistency_check = threading.Thread(
+            target=self._check_consistency,
+            args=(Path(pdf_directory or Config.PDF_DIR),),
+            name="consistency-check",
+            daemon=True
+        )
+        self.consistency_check.start()
+        return self.consistency_check
+
+    def _check_consistency(self, pdf_path: Path) -> None:
+        """Bring the store up to date with a PDF directory."""
+        if not pdf_path.exists():
+            return
+
+        # Never released, so workers started later skip the check too; the
+        # lock passes to another process only when this one exits
+        self.consistency_lock = FileLock(Config.PROCESSED_DIR / "consistency.lock")
+        if not self.consistency_lock.acquire(blocking=False):
+            logger.info("Consistency check is run by another process; skipping")
+            return
+
+        try:
+            results = self.doc_processor.process_directory(str(pdf_path))
+            if results:
+                self.documents_ready = True
+            logger.info("Consistency check completed")
+        except Exception as e:
+            logger.error(f"Consistency check failed: {str(e)}")
+
+    def ingest_file(self, pdf_file: str) -> Dict[str, Any]:
+        """
+        Ingest a single PDF and make it available for queries.
+
+        Args:
+            pdf_file: Path to the PDF file
+
+        Returns:
+            Processed document data
+        """
+        logger.info(f"Ingesting document: {pdf_file}")
+
+        doc_data = self.doc_processor.process_file(pdf_file)
+        self.documents_ready = True
+
+        return doc_data
     
-    def process_documents(self, pdf_directory: str) -> Dict[str, Any]:
+    def process_documents(self, pdf_directory: str, force: bool = False) -> Dict[str, Any]:
         """
         Process all PDF documents in a directory.
         
         Args:
             pdf_directory: Path to directory containing PDFs
+            force: Reprocess every PDF even if it is unchanged
             
         Returns:
             Dictionary of processed documents
         """
         logger.info(f"Processing documents from: {pdf_directory}")
         
-        results = self.doc_processor.process_directory(pdf_directory)
+        results = self.doc_processor.process_directory(pdf_directory, force=force)
         
         logger.info(f"Processed {len(results)} documents")
         return results
@@ -96,6 +228,7 @@ class QueryEngine:
         Returns:
             Answer to the question
         """
+        self.refresh()
         if not self.documents_ready:
             return "📄 Documents are still not processed. Please upload and ingest PDFs first."
 
@@ -105,21 +238,254 @@ class QueryEngine:
         
         logger.info(f"Processing query: {question[:100]}...")
         
-        # Classify query intent
-        intent = self.llm.classify_query_intent(question)
-        category = intent['category']
+        # Read the version first so an answer racing an ingest is never served stale
+        version = self.doc_processor.corpus_version
+        cached = self._cached_answer(question, doc_id, version)
+        if cached is not None:
+            return cached
         
-        logger.info(f"Query classified as: {category}")
+        # Classify query intent
+        intent = self._classify_intent(question)
         
         # Route to appropriate handler
-        if 'arxiv' in category or self._is_arxiv_query(question):
+        route = self._route(question, intent['category'])
+        if route == "arxiv":
+            # ArXiv answers depend on the outside world, not on the corpus
             return self._handle_arxiv_query(question)
-        elif 'metric' in category or self._is_metric_query(question):
-            return self._handle_metric_extraction(question, doc_id)
-        elif 'summar' in category:
-            return self._handle_summarization(question, doc_id, intent.get('focus'))
+        
+        if route == "metric":
+            answer = self._handle_metric_extraction(question, doc_id)
+        elif route == "summarization":
+            answer = self._handle_summarization(question, doc_id, intent.get('focus'))
         else:
-            return self._handle_direct_lookup(question, doc_id)
+            answer = self._handle_direct_lookup(question, doc_id)
+        
+        if self.query_cache is not None:
+            self.query_cache.set(question, doc_id, version, answer)
+        return answer
+    
+    async def aquery(self, question: str, doc_id: Optional[str] = None) -> str:
+        """
+        Async variant of ``query`` for serving from an event loop.
+        
+        LLM calls use the providers' async clients; retrieval and the ArXiv
+        search, which block on local files or the network, run on the
+        loop's default executor.
+        
+        Args:
+            question: User's question
+            doc_id: Optional specific document to query
+            
+        Returns:
+            Answer to the question
+        """
+        self.refresh()
+        if not self.documents_ready:
+            return "📄 Documents are still not processed. Please upload and ingest PDFs first."
+        
+        # Sanitize input
+        question = sanitize_input(question)
+        
+        logger.info(f"Processing async query: {question[:100]}...")
+        
+        version = self.doc_processor.corpus_version
+        cached = self._cached_answer(question, doc_id, version)
+        if cached is not None:
+            return cached
+        
+        intent = await self._aclassify_intent(question)
+        
+        route = self._route(question, intent['category'])
+        if route == "arxiv":
+            return await self._ahandle_arxiv_query(question)
+        
+        answer = await self._aanswer(question, doc_id, route, intent.get('focus'))
+        
+        if self.query_cache is not None:
+            self.query_cache.set(question, doc_id, version, answer)
+        return answer
+    
+    async def _aanswer(self, question: str, doc_id: Optional[str], route: str, focus: Optional[str]) -> str:
+        """Answer a corpus question for ``aquery`` along the given route."""
+        focus = focus if route == "summarization" else None
+        loop = asyncio.get_running_loop()
+        
+        if route == "summarization":
+            text = await loop.run_in_executor(None, self._long_document_text, question, doc_id, focus)
+            if text:
+                return await self.summarizer.asummarize(text, focus=focus)
+        
+        context = await loop.run_in_executor(
+            None, partial(self._get_relevant_context, question, doc_id, focus=focus)
+        )
+        
+        if not context:
+            return "No relevant documents found. Please process documents first."
+        if route == "metric":
+            return self._format_basic_metrics(context) + await self.llm.aextract_metrics(context)
+        if route == "summarization":
+            return await self.llm.asummarize_text(context, focus=focus)
+        return await self.llm.aanswer_question(question, context)
+    
+    def query_stream(self, question: str, doc_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Streaming query interface - yields the answer in pieces as the LLM
+        generates it.
+        
+        A cached answer is yielded in one piece; a streamed answer is cached
+        once the stream completes.
+        
+        Args:
+            question: User's question
+            doc_id: Optional specific document to query
+            
+        Yields:
+            Pieces of the answer
+        """
+        self.refresh()
+        if not self.documents_ready:
+            yield "📄 Documents are still not processed. Please upload and ingest PDFs first."
+            return
+        
+        # Sanitize input
+        question = sanitize_input(question)
+        
+        logger.info(f"Processing streaming query: {question[:100]}...")
+        
+        version = self.doc_processor.corpus_version
+        cached = self._cached_answer(question, doc_id, version)
+        if cached is not None:
+            yield cached
+            return
+        
+        intent = self._classify_intent(question)
+        route = self._route(question, intent['category'])
+        
+        if route == "arxiv":
+            yield from self._stream_arxiv_query(question)
+            return
+        
+        pieces = []
+        for piece in self._stream_answer(question, doc_id, route, intent.get('focus')):
+            pieces.append(piece)
+            yield piece
+        
+        # Not reached if the client disconnected or the stream failed
+        if self.query_cache is not None:
+            self.query_cache.set(question, doc_id, version, "".join(pieces))
+    
+    def _stream_answer(
+        self, question: str, doc_id: Optional[str], route: str, focus: Optional[str]
+    ) -> Iterator[str]:
+        """Stream the answer to a corpus question for ``query_stream`` along the given route."""
+        focus = focus if route == "summarization" else None
+        
+        if route == "summarization":
+            text = self._long_document_text(question, doc_id, focus)
+            if text:
+                yield from self.summarizer.summarize_stream(text, focus=focus)
+                return
+        
+        context = self._get_relevant_context(question, doc_id, focus=focus)
+        
+        if not context:
+            yield "No relevant documents found. Please process documents first."
+            return
+        
+        if route == "metric":
+            yield self._format_basic_metrics(context)
+            yield from self.llm.extract_metrics_stream(context)
+        elif route == "summarization":
+            yield from self.llm.summarize_text_stream(context, focus=focus)
+        else:
+            yield from self.llm.answer_question_stream(question, context)
+    
+    def _cached_answer(self, question: str, doc_id: Optional[str], version: int) -> Optional[str]:
+        """
+        Look up an answer in the query cache.
+        
+        Done before classification, so a hit costs no LLM call at all.
+        
+        Args:
+            question: Sanitized user question
+            doc_id: Optional document ID
+            version: Corpus version read before answering
+            
+        Returns:
+            Cached answer or None
+        """
+        if self.query_cache is None:
+            return None
+        
+        cached = self.query_cache.get(question, doc_id, version)
+        if cached is not None:
+            logger.info("Answer served from query cache")
+        return cached
+    
+    def _route(self, question: str, category: str) -> str:
+        """
+        Pick the handler for a classified query.
+        
+        Args:
+            question: User's question
+            category: Intent category
+            
+        Returns:
+            One of "arxiv", "metric", "summarization" or "lookup"
+        """
+        if 'arxiv' in category or self._is_arxiv_query(question):
+            return "arxiv"
+        if 'metric' in category or self._is_metric_query(question):
+            return "metric"
+        if 'summar' in category:
+            return "summarization"
+        return "lookup"
+    
+    def _classify_intent(self, question: str) -> Dict[str, Any]:
+        """
+        Classify query intent locally, asking the LLM only when unsure.
+        
+        Args:
+            question: User's question
+            
+        Returns:
+            Dictionary with query classification
+        """
+        intent = self.intent_classifier.classify(question)
+        
+        if intent['confidence'] >= Config.INTENT_CONFIDENCE_THRESHOLD:
+            logger.info(
+                f"Query classified as: {intent['category']} "
+                f"(path=local, confidence={intent['confidence']:.2f})"
+            )
+            return intent
+        
+        local_confidence = intent['confidence']
+        intent = self.llm.classify_query_intent(question)
+        logger.info(
+            f"Query classified as: {intent['category']} "
+            f"(path=llm, local confidence={local_confidence:.2f})"
+        )
+        return intent
+    
+    async def _aclassify_intent(self, question: str) -> Dict[str, Any]:
+        """Async variant of ``_classify_intent``."""
+        intent = self.intent_classifier.classify(question)
+        
+        if intent['confidence'] >= Config.INTENT_CONFIDENCE_THRESHOLD:
+            logger.info(
+                f"Query classified as: {intent['category']} "
+                f"(path=local, confidence={intent['confidence']:.2f})"
+            )
+            return intent
+        
+        local_confidence = intent['confidence']
+        intent = await self.llm.aclassify_query_intent(question)
+        logger.info(
+            f"Query classified as: {intent['category']} "
+            f"(path=llm, local confidence={local_confidence:.2f})"
+        )
+        return intent
     
     def _is_arxiv_query(self, question: str) -> bool:
         """Check if query is related to ArXiv search."""
@@ -148,40 +514,93 @@ class QueryEngine:
         logger.info("Handling ArXiv query")
         
         try:
-            # Parse query
-            search_query = self.arxiv.parse_query_for_arxiv(question)
-            
-            # Determine max results from query
-            max_results = 5
-            if 'recent' in question.lower():
-                papers = self.arxiv.search_recent_papers(search_query, days=30, max_results=max_results)
-            else:
-                papers = self.arxiv.search_papers(search_query, max_results=max_results)
+            summary, analysis_prompt = self._search_arxiv(question)
             
-            if not papers:
-                return "No papers found on ArXiv for your query. Try different keywords."
+            if analysis_prompt is None:
+                return summary
             
-            # Format results
-            summary = self.arxiv.format_papers_summary(papers)
+            analysis = self.llm.llm.generate(analysis_prompt, temperature=0.7)
             
-            # Add LLM analysis
-            analysis_prompt = f"""Based on these ArXiv search results, provide a brief analysis 
-            highlighting the most relevant papers for the query: "{question}"
+            response = f"{summary}\n\n--- AI Analysis ---\n{analysis}"
             
-            {summary}
+            return response
             
-            Analysis:"""
+        except Exception as e:
+            logger.error(f"Error handling ArXiv query: {str(e)}")
+            return f"Error searching ArXiv: {str(e)}"
+    
+    async def _ahandle_arxiv_query(self, question: str) -> str:
+        """Async variant of ``_handle_arxiv_query``."""
+        logger.info("Handling ArXiv query")
+        
+        try:
+            summary, analysis_prompt = await asyncio.get_running_loop().run_in_executor(
+                None, self._search_arxiv, question
+            )
             
-            analysis = self.llm.llm.generate(analysis_prompt, temperature=0.7)
+            if analysis_prompt is None:
+                return summary
             
-            response = f"{summary}\n\n--- AI Analysis ---\n{analysis}"
+            analysis = await self.llm.llm.agenerate(analysis_prompt, temperature=0.7)
             
-            return response
+            return f"{summary}\n\n--- AI Analysis ---\n{analysis}"
             
         except Exception as e:
             logger.error(f"Error handling ArXiv query: {str(e)}")
             return f"Error searching ArXiv: {str(e)}"
     
+    def _stream_arxiv_query(self, question: str) -> Iterator[str]:
+        """Streaming variant of ``_handle_arxiv_query``."""
+        logger.info("Handling ArXiv query")
+        
+        try:
+            summary, analysis_prompt = self._search_arxiv(question)
+            yield summary
+            
+            if analysis_prompt is not None:
+                yield "\n\n--- AI Analysis ---\n"
+                yield from self.llm.llm.generate_stream(analysis_prompt, temperature=0.7)
+                
+        except Exception as e:
+            logger.error(f"Error handling ArXiv query: {str(e)}")
+            yield f"Error searching ArXiv: {str(e)}"
+    
+    def _search_arxiv(self, question: str) -> tuple:
+        """
+        Search ArXiv for a question and build the analysis prompt.
+        
+        Args:
+            question: User's question about ArXiv papers
+            
+        Returns:
+            Tuple of (formatted results or message, analysis prompt or None)
+        """
+        # Parse query
+        search_query = self.arxiv.parse_query_for_arxiv(question)
+        
+        # Determine max results from query
+        max_results = 5
+        if 'recent' in question.lower():
+            papers = self.arxiv.search_recent_papers(search_query, days=30, max_results=max_results)
+        else:
+            papers = self.arxiv.search_papers(search_query, max_results=max_results)
+        
+        if not papers:
+            return "No papers found on ArXiv for your query. Try different keywords.", None
+        
+        # Format results
+        summary = self.arxiv.format_papers_summary(papers)
+        
+        # Add LLM analysis
+        analysis_prompt = f"""Based on these ArXiv search results, provide a brief analysis 
+            highlighting the most relevant papers for the query: "{question}"
+            
+            {summary}
+            
+            Analysis:"""
+        
+        return summary, analysis_prompt
+    
     def _handle_metric_extraction(self, question: str, doc_id: Optional[str] = None) -> str:
         """
         Handle queries asking for performance metrics.
@@ -201,13 +620,24 @@ class QueryEngine:
         if not context:
             return "No relevant documents found. Please process documents first."
         
-        # Extract metrics using both regex and LLM
-        basic_metrics = extract_metrics(context)
-        
         # Use LLM for more sophisticated extraction
         llm_metrics = self.llm.extract_metrics(context)
         
         # Combine results
+        return self._format_basic_metrics(context) + llm_metrics
+    
+    def _format_basic_metrics(self, context: str) -> str:
+        """
+        Format regex-extracted metrics as the start of a metrics response.
+        
+        Args:
+            context: Text containing metrics
+            
+        Returns:
+            Response header, ending where the LLM analysis goes
+        """
+        basic_metrics = extract_metrics(context)
+        
         response = f"**Extracted Metrics:**\n\n"
         
         if basic_metrics:
@@ -216,7 +646,7 @@ class QueryEngine:
                 response += f"- {metric.replace('_', ' ').title()}: {', '.join(map(str, values))}\n"
             response += "\n"
         
-        response += f"**Detailed Analysis:**\n{llm_metrics}"
+        response += "**Detailed Analysis:**\n"
         
         return response
     
@@ -239,6 +669,11 @@ class QueryEngine:
         """
         logger.info(f"Handling summarization query with focus: {focus}")
         
+        # Documents longer than one prompt are summarized part by part
+        text = self._long_document_text(question, doc_id, focus)
+        if text:
+            return self.summarizer.summarize(text, focus=focus)
+        
         # Get relevant context
         context = self._get_relevant_context(question, doc_id, focus=focus)
         
@@ -250,6 +685,57 @@ class QueryEngine:
         
         return summary
     
+    def _long_document_text(
+        self,
+        question: str,
+        doc_id: Optional[str] = None,
+        focus: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Get the text of the document to summarize if it needs map-reduce.
+        
+        Without a ``doc_id`` the document best matching the question (or the
+        first one) is summarized. A focus matching a section title is
+        served from that section as before.
+        
+        Args:
+            question: User's question
+            doc_id: Optional document ID
+            focus: Optional focus area
+            
+        Returns:
+            Full text of the document if it does not fit the context budget, else None
+        """
+        if self.summarizer is None:
+            return None
+        
+        if not doc_id:
+            doc_ids = self.doc_processor.list_documents()
+            if len(doc_ids) > 1:
+                # Like the context fallback, use the first document when nothing matches
+                results = self._search(question, k=1)
+                if results:
+                    doc_ids = [results[0]['doc_id']]
+            if not doc_ids:
+                return None
+            doc_id = doc_ids[0]
+        
+        doc = self.doc_processor.get_document(doc_id)
+        if not doc:
+            return None
+        
+        if focus and any(
+            focus.lower() in section.get('title', '').lower()
+            for section in doc.get('structure', {}).get('sections', [])
+        ):
+            return None
+        
+        text = doc.get('full_text', '')
+        if count_tokens(text) <= context_budget(self.llm.model_name, question):
+            return None
+        
+        return text
+    
     def _handle_direct_lookup(self, question: str, doc_id: Optional[str] = None) -> str:
         """
         Handle direct content lookup queries.
@@ -281,7 +767,8 @@ class QueryEngine:
         focus: Optional[str] = None
     ) -> str:
         """
-        Retrieve relevant context for a query.
+        Retrieve relevant context for a query, packed into the token budget
+        of the active model.
         
         Args:
             query: User's query
@@ -291,6 +778,8 @@ class QueryEngine:
         Returns:
             Relevant context string
         """
+        budget = context_budget(self.llm.model_name, query)
+        
         # If doc_id is specified, use that document
         if doc_id:
             doc = self.doc_processor.get_document(doc_id)
@@ -301,27 +790,38 @@ class QueryEngine:
             if focus and 'structure' in doc:
                 for section in doc['structure'].get('sections', []):
                     if focus.lower() in section.get('title', '').lower():
-                        return section.get('content', '')
-            
-            # Otherwise return full text (truncated)
-            return doc.get('full_text', '')[:10000]
+                        return truncate_to_tokens(section.get('content', ''), budget)
         
-        # Search across all documents
-        search_results = self.doc_processor.search_content(query)
+        # Search across all documents, or within the requested one
+        search_results = self._search(query, doc_id, k=Config.CONTEXT_CANDIDATES)
         
         if not search_results:
-            # Fall back to first processed document
-            if self.doc_processor.processed_docs:
-                first_doc = list(self.doc_processor.processed_docs.values())[0]
-                return first_doc.get('full_text', '')[:10000]
+            # Fall back to the requested or first processed document
+            doc_ids = [doc_id] if doc_id else self.doc_processor.list_documents()
+            if doc_ids:
+                first_doc = self.doc_processor.get_document(doc_ids[0])
+                return truncate_to_tokens(first_doc.get('full_text', ''), budget) if first_doc else ""
             return ""
         
-        # Combine top search results
-        context_parts = []
-        for result in search_results[:5]:  # Top 5 chunks
-            context_parts.append(result['content'])
+        return pack_context(search_results, budget)
+    
+    def _search(self, query: str, doc_id: Optional[str] = None, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Retrieve ranked chunks using the configured retrieval mode.
         
-        return "\n\n".join(context_parts)
+        Args:
+            query: Search query
+            doc_id: Optional document ID to search within
+            k: Number of chunks to return
+            
+        Returns:
+            Ranked list of chunk results
+        """
+        if self.hybrid_retriever is not None:
+            return self.hybrid_retriever.search(query, doc_id, k)
+        if Config.RETRIEVAL_MODE == "vector":
+            return self.doc_processor.vector_search(query, doc_id, k)
+        return self.doc_processor.search_content(query, doc_id, k)
     
     def get_document_summary(self, doc_id: str) -> str:
         """
@@ -367,7 +867,35 @@ class QueryEngine:
         Returns:
             List of document IDs
         """
-        return list(self.doc_processor.processed_docs.keys())
+        return self.doc_processor.list_documents()
+    
+    def delete_document(self, doc_id: str) -> bool:
+        """
+        Remove a document so it is no longer used to answer queries.
+        
+        Args:
+            doc_id: Document identifier
+            
+        Returns:
+            True if the document was stored
+        """
+        deleted = self.doc_processor.delete_document(doc_id)
+        if not self.doc_processor.list_documents():
+            self.documents_ready = False
+        return deleted
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics for the query, document and LLM response caches.
+        
+        Returns:
+            Dictionary of counters per cache
+        """
+        return {
+            'query': {'enabled': True, **self.query_cache.stats()} if self.query_cache is not None else {'enabled': False},
+            'documents': self.doc_processor.processed_docs.stats(),
+            'llm': self.llm.cache_stats(),
+        }
     
     def get_available_functions(self) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,236 @@
+"""
+Rate Limiter Module
+Token-bucket rate limiting of requests and tokens per minute, thread-safe,
+usable from asyncio, and optionally shared by every process on the host
+through a locked state file.
+"""
+
+import os
+import time
+import struct
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from src.utils import setup_logging, Config
+
+logger = setup_logging(__name__)
+
+# requests level, tokens level, time of last refill
+_STATE = struct.Struct("<ddd")
+
+# Waits for another process's flock happen here rather than on an event
+# loop, and not in the default executor behind slow blocking LLM calls
+_file_lock_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rate-limit")
+
+
+class MemoryBucketState:
+    """Bucket levels held in this process, guarded by a lock."""
+
+    def __init__(self):
+        self._state: Optional[Tuple[float, float, float]] = None
+        self._lock = threading.Lock()
+
+    def update(self, func):
+        """
+        Atomically replace the state with ``func(state)``.
+
+        Args:
+            func: Callable taking the current state (None when fresh) and
+                returning (new state, result)
+
+        Returns:
+            The result returned by ``func``
+        """
+        with self._lock:
+            self._state, result = func(self._state)
+            return result
+
+
+class FileBucketState:
+    """
+    Bucket levels kept in a small file and updated under ``flock``, so
+    every process using the same file draws from the same buckets.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the state file.
+
+        Args:
+            path: State file path
+        """
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        # flock is per open file, so threads of this process also need a lock
+        self._lock = threading.Lock()
+
+    def update(self, func):
+        """Atomically replace the state with ``func(state)`` (see MemoryBucketState)."""
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                data = os.pread(self._fd, _STATE.size, 0)
+                state = _STATE.unpack(data) if len(data) == _STATE.size else None
+                state, result = func(state)
+                os.pwrite(self._fd, _STATE.pack(*state), 0)
+                return result
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def __del__(self):
+        try:
+            os.close(self._fd)
+        except (AttributeError, OSError):
+            pass
+
+
+class RateLimiter:
+    """
+    Token buckets for requests per minute and tokens per minute.
+
+    Each bucket holds up to a minute's allowance and refills continuously.
+    A caller takes what it needs up front, possibly driving a bucket
+    negative, and then waits until the deficit would have refilled; no lock
+    is held while waiting, and callers are served in the order they reserve.
+    Unused tokens (e.g. a shorter answer than ``max_tokens``) can be handed
+    back with ``refund``.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 0,
+        state_path: Optional[str] = None
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request allowance (0 = unlimited)
+            tokens_per_minute: Token allowance (0 = unlimited)
+            state_path: File shared with other processes; None keeps the
+                state in this process
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        if state_path is not None and fcntl is None:
+            logger.warning("File locking unavailable; rate limits are per process")
+            state_path = None
+
+        self.state = FileBucketState(state_path) if state_path else MemoryBucketState()
+
+    def _take(self, requests: float, tokens: float) -> float:
+        """Take from both buckets and return how long the caller must wait."""
+        request_capacity = self.requests_per_minute
+        token_capacity = self.tokens_per_minute
+        # Unlimited buckets are not drawn from; a single call larger than
+        # the bucket could never be satisfied, so it takes the whole bucket
+        requests = requests if request_capacity > 0 else 0
+        tokens = min(tokens, token_capacity) if token_capacity > 0 else 0
+
+        def take(state):
+            now = time.time()
+            if state is None:
+                request_level, token_level = request_capacity, token_capacity
+            else:
+                request_level, token_level, updated = state
+                elapsed = max(0.0, now - updated)
+                request_level = min(request_capacity, request_level + elapsed * request_capacity / 60.0)
+                token_level = min(token_capacity, token_level + elapsed * token_capacity / 60.0)
+
+            # Refunds (negative takes) never fill a bucket past capacity
+            request_level = min(request_capacity, request_level - requests)
+            token_level = min(token_capacity, token_level - tokens)
+
+            wait = 0.0
+            if request_capacity > 0 and request_level < 0:
+                wait = max(wait, -request_level * 60.0 / request_capacity)
+            if token_capacity > 0 and token_level < 0:
+                wait = max(wait, -token_level * 60.0 / token_capacity)
+
+            return (request_level, token_level, now), wait
+
+        return self.state.update(take)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until one request using ``tokens`` tokens is allowed.
+
+        Args:
+            tokens: Tokens the request is expected to use
+
+        Returns:
+            Seconds waited
+        """
+        wait = self._take(1, tokens)
+        if wait > 0:
+            logger.debug(f"Rate limited for {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """
+        Like ``acquire``, but waits without blocking the event loop.
+
+        A file-backed bucket may be locked by another process, so it is
+        updated on a worker thread.
+        """
+        if isinstance(self.state, FileBucketState):
+            loop = asyncio.get_running_loop()
+            wait = await loop.run_in_executor(_file_lock_executor, self._take, 1, tokens)
+        else:
+            wait = self._take(1, tokens)
+        if wait > 0:
+            logger.debug(f"Rate limited for {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def refund(self, tokens: int) -> None:
+        """
+        Return tokens that were reserved but not used.
+
+        Args:
+            tokens: Unused tokens
+        """
+        if tokens > 0:
+            self._take(0, -tokens)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, requests_per_minute: float, tokens_per_minute: float = 0) -> RateLimiter:
+    """
+    Get the limiter shared by everything in this process that calls ``name``.
+
+    With ``Config.RATE_LIMIT_BACKEND`` set to ``file``, the limiter state
+    lives in ``Config.RATE_LIMIT_DIR`` and is shared with other processes
+    too (e.g. gunicorn workers).
+
+    Args:
+        name: Limited service, e.g. a provider name
+        requests_per_minute: Request allowance (0 = unlimited)
+        tokens_per_minute: Token allowance (0 = unlimited)
+
+    Returns:
+        Rate limiter
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            state_path = None
+            if Config.RATE_LIMIT_BACKEND == "file":
+                state_path = Path(Config.RATE_LIMIT_DIR) / f"{name}.bucket"
+            limiter = _limiters[name] = RateLimiter(requests_per_minute, tokens_per_minute, state_path)
+        return limiter
@@ -0,0 +1,415 @@
+"""
+Resilience Module
+Retry policy for calls to external services: classifies errors as
+retryable or fatal, honors Retry-After hints, backs off with full jitter,
+and trips a per-service circuit breaker when the service keeps failing.
+"""
+
+import re
+import time
+import socket
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from src.utils import setup_logging, Config
+
+logger = setup_logging(__name__)
+
+T = TypeVar('T')
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# Exception class names (anywhere in the MRO) of transient SDK and HTTP
+# client errors, so the libraries do not need to be importable here
+RETRYABLE_ERROR_NAMES = {
+    # openai / google
+    'APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError',
+    'ServiceUnavailable', 'ResourceExhausted', 'DeadlineExceeded',
+    'TooManyRequests', 'ServerError',
+    # httpx (TransportError covers connect, read and protocol errors)
+    'TransportError', 'TimeoutException',
+    # requests
+    'ConnectionError', 'Timeout', 'ChunkedEncodingError',
+    # urllib3
+    'ProtocolError', 'NewConnectionError', 'ConnectTimeoutError', 'ReadTimeoutError',
+    # arxiv
+    'UnexpectedEmptyPageError',
+}
+
+_DURATION = re.compile(r"^\s*([\d.]+)\s*(ms|s)?\s*$")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an SDK exception, if any."""
+    for attribute in ('status_code', 'status', 'code', 'http_status'):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+
+    response = getattr(error, 'response', None)
+    value = getattr(response, 'status_code', None)
+    if isinstance(value, int):
+        return value
+
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed call is worth retrying.
+
+    HTTP errors are retried for timeouts, conflicts, rate limiting and
+    server errors; other statuses (bad requests, auth, not found) are
+    fatal. Errors without a status are retried only when they are network
+    or timeout errors.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        True if retrying may succeed
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError, socket.gaierror)):
+        return True
+
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return bool(names & RETRYABLE_ERROR_NAMES)
+
+
+def _parse_duration(value: Any) -> Optional[float]:
+    """Parse '30', '30s', '1500ms' or an HTTP date into seconds."""
+    if value is None:
+        return None
+
+    match = _DURATION.match(str(value))
+    if match:
+        seconds = float(match.group(1))
+        return seconds / 1000.0 if match.group(2) == 'ms' else seconds
+
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _find_retry_delay(value: Any) -> Optional[float]:
+    """Search structured error details for a google.rpc.RetryInfo delay."""
+    if isinstance(value, dict):
+        if 'retryDelay' in value:
+            return _parse_duration(value['retryDelay'])
+        values = value.values()
+    elif isinstance(value, (list, tuple)):
+        values = value
+    else:
+        return None
+
+    for item in values:
+        delay = _find_retry_delay(item)
+        if delay is not None:
+            return delay
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Get the delay a service asked for before retrying.
+
+    Reads ``Retry-After`` / ``retry-after-ms`` response headers (OpenAI,
+    HTTP APIs) and RetryInfo error details (Gemini).
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        Delay in seconds, or None if the service gave no hint
+    """
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms') is not None:
+            return _parse_duration(f"{headers.get('retry-after-ms')}ms")
+        if headers.get('retry-after') is not None:
+            return _parse_duration(headers.get('retry-after'))
+    except AttributeError:
+        pass
+
+    for attribute in ('details', 'response_json', 'body'):
+        delay = _find_retry_delay(getattr(error, attribute, None))
+        if delay is not None:
+            return delay
+
+    return None
+
+
+class CircuitBreaker:
+    """
+    Stop calling a service that keeps failing.
+
+    After ``failure_threshold`` consecutive retryable failures the breaker
+    opens and calls fail at once with CircuitOpenError. After
+    ``reset_timeout`` seconds one trial call is let through (half-open): if
+    it succeeds the breaker closes, otherwise it opens again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Service name, used in errors and logs
+            failure_threshold: Consecutive failures that open the breaker
+                (defaults to Config.CIRCUIT_FAILURE_THRESHOLD, 0 disables it)
+            reset_timeout: Seconds before a trial call (defaults to Config.CIRCUIT_RESET_TIMEOUT)
+        """
+        self.name = name
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None else Config.CIRCUIT_FAILURE_THRESHOLD
+        )
+        self.reset_timeout = reset_timeout if reset_timeout is not None else Config.CIRCUIT_RESET_TIMEOUT
+
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """One of "closed", "open" or "half-open"."""
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self) -> None:
+        """
+        Check that a call may go ahead.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a
+                trial call already running
+        """
+        if self.failure_threshold <= 0:
+            return
+
+        with self._lock:
+            if self.opened_at is None:
+                return
+
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"{self.name} is unavailable after repeated failures; retry in {remaining:.0f}s"
+                )
+            if self._trial_running:
+                raise CircuitOpenError(f"{self.name} is recovering; a trial request is in progress")
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_abort(self) -> None:
+        """
+        Forget a call that ended without an outcome (e.g. it was cancelled),
+        so a trial call that never finished does not block the next one.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self, error: BaseException) -> None:
+        """
+        Count a failed call; only retryable errors say the service is unhealthy.
+
+        Args:
+            error: Exception raised by the call
+        """
+        with self._lock:
+            trial = self._trial_running
+            self._trial_running = False
+
+            if not is_retryable(error):
+                return
+
+            self.failures += 1
+            if self.failure_threshold > 0 and (trial or self.failures >= self.failure_threshold):
+                if self.opened_at is None or trial:
+                    logger.warning(
+                        f"Circuit for {self.name} opened after {self.failures} failures: {str(error)}"
+                    )
+                self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Retry retryable errors with full-jitter exponential backoff.
+
+    The wait before retry ``n`` is uniform in ``[0, min(max_delay,
+    base_delay * 2 ** n)]``, or the service's Retry-After hint when that is
+    longer. A hint beyond ``max_retry_after`` is not waited out; the error
+    is raised so the caller fails fast.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        max_retry_after: float = None
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Attempts including the first (defaults to Config.RETRY_MAX_ATTEMPTS)
+            base_delay: Backoff base in seconds (defaults to Config.RETRY_BASE_DELAY)
+            max_delay: Backoff cap in seconds (defaults to Config.RETRY_MAX_DELAY)
+            max_retry_after: Longest Retry-After hint honored (defaults to Config.RETRY_AFTER_MAX)
+        """
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else Config.RETRY_MAX_ATTEMPTS)
+        self.base_delay = base_delay if base_delay is not None else Config.RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.RETRY_MAX_DELAY
+        self.max_retry_after = max_retry_after if max_retry_after is not None else Config.RETRY_AFTER_MAX
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full-jitter delay before the retry following ``attempt`` (0-based).
+
+        Args:
+            attempt: Index of the attempt that failed
+
+        Returns:
+            Delay in seconds
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _next_delay(self, attempt: int, error: BaseException, name: str) -> Optional[float]:
+        """Delay before retrying after ``error``, or None if it should be raised."""
+        if attempt + 1 >= self.max_attempts or not is_retryable(error):
+            logger.error(f"{name} failed: {str(error)}")
+            return None
+
+        delay = self.backoff(attempt)
+        hint = retry_after(error)
+        if hint is not None:
+            if hint > self.max_retry_after:
+                logger.error(f"{name} asked to retry after {hint:.0f}s; giving up: {str(error)}")
+                return None
+            delay = max(delay, hint)
+
+        logger.warning(
+            f"{name} failed (attempt {attempt + 1}/{self.max_attempts}), "
+            f"retrying in {delay:.2f}s: {str(error)}"
+        )
+        return delay
+
+    def call(
+        self,
+        func: Callable[[], T],
+        breaker: Optional[CircuitBreaker] = None,
+        name: str = None
+    ) -> T:
+        """
+        Call ``func`` until it succeeds, fails fatally or runs out of attempts.
+
+        Args:
+            func: Callable making the request
+            breaker: Optional circuit breaker guarding the service
+            name: Service name for logs (defaults to the breaker's name)
+
+        Returns:
+            The result of ``func``
+        """
+        name = name or (breaker.name if breaker is not None else getattr(func, '__name__', 'call'))
+
+        for attempt in range(self.max_attempts):
+            if breaker is not None:
+                breaker.before_call()
+            try:
+                result = func()
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record_failure(e)
+                delay = self._next_delay(attempt, e, name)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            except BaseException:
+                # Cancelled or interrupted: no verdict on the service
+                if breaker is not None:
+                    breaker.record_abort()
+                raise
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+
+    async def acall(
+        self,
+        func: Callable[[], Awaitable[T]],
+        breaker: Optional[CircuitBreaker] = None,
+        name: str = None
+    ) -> T:
+        """Async variant of ``call``; ``func`` returns an awaitable."""
+        name = name or (breaker.name if breaker is not None else getattr(func, '__name__', 'call'))
+
+        for attempt in range(self.max_attempts):
+            if breaker is not None:
+                breaker.before_call()
+            try:
+                result = await func()
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record_failure(e)
+                delay = self._next_delay(attempt, e, name)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancelled or interrupted: no verdict on the service
+                if breaker is not None:
+                    breaker.record_abort()
+                raise
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the circuit breaker shared by every caller of a service in this process.
+
+    Args:
+        name: Service name
+
+    Returns:
+        Circuit breaker
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
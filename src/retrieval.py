@@ -0,0 +1,133 @@
+"""
+Retrieval Module
+Runs several retrievers concurrently and fuses their rankings with
+reciprocal rank fusion (RRF).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils import setup_logging, Config
+
+logger = setup_logging(__name__)
+
+SearchFunction = Callable[[str, Optional[str], int], List[Dict[str, Any]]]
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[Dict[str, Any]]],
+    weights: Dict[str, float],
+    rrf_k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with weighted reciprocal rank fusion.
+
+    Each result contributes ``weight / (rrf_k + rank)`` for every list it
+    appears in (rank starts at 1); results are identified by
+    ``(doc_id, chunk_index)``.
+
+    Args:
+        rankings: Result lists keyed by retriever name, best first
+        weights: Weight per retriever name
+        rrf_k: Rank smoothing constant
+
+    Returns:
+        Fused results, best first, with the fused score as ``relevance_score``
+    """
+    fused: Dict[tuple, Dict[str, Any]] = {}
+
+    for name, results in rankings.items():
+        weight = weights.get(name, 1.0)
+
+        for rank, result in enumerate(results, 1):
+            key = (result['doc_id'], result['chunk_index'])
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = dict(result, relevance_score=0.0, retrievers=[])
+            entry['relevance_score'] += weight / (rrf_k + rank)
+            entry['retrievers'].append(name)
+
+    return sorted(fused.values(), key=lambda x: x['relevance_score'], reverse=True)
+
+
+class HybridRetriever:
+    """
+    Query several retrievers in parallel and fuse their results.
+
+    Every retriever has a weight and a latency budget. A retriever that has
+    not answered within its budget is left out of the fusion, so a hybrid
+    query takes no longer than the largest budget.
+
+    Each retriever is asked for ``depth`` times as many results as the
+    caller wants, since a chunk ranked low by one retriever can still
+    make the fused top ``k``.
+    """
+
+    def __init__(self, rrf_k: int = None, max_workers: int = 4, depth: int = 2):
+        """
+        Initialize the hybrid retriever.
+
+        Args:
+            rrf_k: Rank smoothing constant (defaults to Config.RRF_K)
+            max_workers: Threads used to run retrievers concurrently
+            depth: Candidates fetched per retriever, as a multiple of k
+        """
+        self.rrf_k = rrf_k or Config.RRF_K
+        self.depth = max(1, depth)
+        self.retrievers: Dict[str, Dict[str, Any]] = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retriever")
+
+    def add_retriever(
+        self,
+        name: str,
+        search: SearchFunction,
+        weight: float = 1.0,
+        budget_ms: float = 1000
+    ) -> None:
+        """
+        Register a retriever.
+
+        Args:
+            name: Retriever name
+            search: Callable taking (query, doc_id, k) and returning ranked results
+            weight: Weight of this retriever in the fusion
+            budget_ms: Latency budget in milliseconds
+        """
+        self.retrievers[name] = {'search': search, 'weight': weight, 'budget_ms': budget_ms}
+
+    def search(self, query: str, doc_id: Optional[str] = None, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Run all retrievers concurrently and fuse their rankings.
+
+        Args:
+            query: Search query
+            doc_id: Optional document ID to search within
+            k: Number of fused results to return
+
+        Returns:
+            Top k fused results, best first
+        """
+        start = time.monotonic()
+        futures = {
+            name: self.executor.submit(retriever['search'], query, doc_id, k * self.depth)
+            for name, retriever in self.retrievers.items()
+        }
+
+        rankings = {}
+        for name, future in futures.items():
+            deadline = start + self.retrievers[name]['budget_ms'] / 1000.0
+            try:
+                rankings[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                logger.warning(f"Retriever '{name}' exceeded its {self.retrievers[name]['budget_ms']:g} ms budget")
+            except Exception as e:
+                logger.error(f"Retriever '{name}' failed: {str(e)}")
+
+        weights = {name: retriever['weight'] for name, retriever in self.retrievers.items()}
+        results = reciprocal_rank_fusion(rankings, weights, self.rrf_k)
+
+        logger.debug(
+            f"Hybrid search over {list(rankings)} took {(time.monotonic() - start) * 1000:.1f} ms"
+        )
+        return results[:k]
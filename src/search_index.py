@@ -0,0 +1,709 @@
+"""
+Search Index Module
+Inverted index with BM25 scoring over document chunks. Saved postings are
+memory-mapped, so processes serving the same index share one copy.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import heapq
+import itertools
+import threading
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.utils import setup_logging
+
+logger = setup_logging(__name__)
+
+INDEX_VERSION = 4
+
+# Compact once tombstoned rows make up this share of all rows...
+COMPACT_DELETED_RATIO = 0.5
+# ...or once this many segments have been appended since the last compaction
+MAX_SEGMENTS = 16
+
+# Attempts at opening the files named by the metadata, which a writer may
+# replace in between
+LOAD_ATTEMPTS = 3
+
+# Sentinel row past every real row
+_END = 1 << 32
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this',
+    'to', 'was', 'were', 'what', 'which', 'with', 'how', 'does', 'do', 'did',
+    'paper', 'me', 'tell', 'about',
+])
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase index terms, dropping stop words.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms in order of appearance
+    """
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def write_uint32(path: str, values: array, offset: int = 0) -> None:
+    """
+    Write unsigned 32-bit integers to a flat little-endian file.
+
+    Args:
+        path: Output path
+        values: ``array('I')`` to write
+        offset: Value position to write at; earlier values are kept (so
+            processes mapping them are unaffected) and later ones dropped
+    """
+    if sys.byteorder == 'big':
+        values = array('I', values)
+        values.byteswap()
+
+    with open(path, 'r+b' if offset else 'wb') as f:
+        f.truncate(offset * values.itemsize)
+        f.seek(offset * values.itemsize)
+        values.tofile(f)
+
+
+def map_uint32(path: str) -> Sequence[int]:
+    """
+    Map a flat little-endian uint32 file read-only into memory.
+
+    The mapping is backed by the page cache, so every process mapping the
+    same file shares its pages.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Indexable sequence of ints (a ``memoryview``, or an ``array('I')``
+        when the file is empty or the platform is big-endian)
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+
+        if sys.byteorder == 'big' or size == 0:
+            values = array('I')
+            values.frombytes(f.read())
+            if sys.byteorder == 'big':
+                values.byteswap()
+            return values
+
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return memoryview(mapped).cast('I')
+
+
+def _postings_before(plist: Sequence[int], row: int) -> int:
+    """Number of (row, tf) postings in ``plist`` for rows before ``row``."""
+    lo, hi = 0, len(plist) // 2
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if plist[2 * mid] < row:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _row_spans(rows: set) -> List[List[int]]:
+    """Collapse a set of rows into sorted [start, end) spans."""
+    spans = []
+    for row in sorted(rows):
+        if spans and spans[-1][1] == row:
+            spans[-1][1] = row + 1
+        else:
+            spans.append([row, row + 1])
+    return spans
+
+
+class _PostingCursor:
+    """Forward cursor over the (row, tf) postings of one term."""
+
+    __slots__ = ('segments', 'idf', 'bound', 'segment', 'pos', 'row', 'tf')
+
+    def __init__(self, segments: List[Sequence[int]], idf: float, bound: float):
+        self.segments = segments
+        self.idf = idf
+        self.bound = bound
+        self.segment = 0
+        self.pos = 0
+        self.row = _END
+        self.tf = 0
+        self._settle()
+
+    def _settle(self) -> None:
+        """Load the posting at the current position, moving past exhausted segments."""
+        while self.segment < len(self.segments):
+            plist = self.segments[self.segment]
+            if self.pos < len(plist):
+                self.row = plist[self.pos]
+                self.tf = plist[self.pos + 1]
+                return
+            self.segment += 1
+            self.pos = 0
+        self.row = _END
+
+    def next(self) -> None:
+        """Advance to the next posting."""
+        self.pos += 2
+        self._settle()
+
+    def seek(self, target: int) -> None:
+        """Advance to the first posting with row >= target (binary search)."""
+        if self.row >= target:
+            return
+
+        while self.segment < len(self.segments):
+            plist = self.segments[self.segment]
+            pairs = len(plist) // 2
+            if pairs and plist[2 * (pairs - 1)] >= target:
+                lo, hi = self.pos // 2, pairs
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if plist[2 * mid] < target:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                self.pos = 2 * lo
+                self._settle()
+                return
+            self.segment += 1
+            self.pos = 0
+
+        self.row = _END
+
+
+class BM25Index:
+    """
+    Inverted index over chunks with Okapi BM25 ranking.
+
+    Every chunk gets an integer row. Rows of one document are contiguous and
+    postings are flat lists of ``row, tf`` pairs in row order. Postings of a
+    loaded index live in a memory-mapped file as one or more segments per
+    term; documents added afterwards get in-memory postings that follow
+    them, so row order is kept, and ``save`` appends those as a new segment.
+    Removing a document only tombstones its rows; ``save`` drops them for
+    good with ``compact`` once they make up ``COMPACT_DELETED_RATIO`` of the
+    rows (or the segments pile up), rewriting the files.
+
+    Every term also records its largest tf and the shortest row it occurs
+    in, which bound its BM25 contribution for MaxScore pruning in ``search``.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+
+        # Per-row data: owning document ordinal, chunk index and length in terms
+        self.doc_ids: List[str] = []  # ordinal -> doc_id
+        self.row_docs = array('I')
+        self.row_chunks = array('I')
+        self.row_lengths = array('I')
+
+        self.doc_rows: Dict[str, Tuple[int, int]] = {}  # doc_id -> [start, end) rows
+        self.deleted = set()
+        # Tombstoned rows as spans, and per term how many of its postings
+        # they hold; both are rebuilt lazily after removals
+        self._deleted_spans: Optional[List[List[int]]] = None
+        self._deleted_df: Dict[str, int] = {}
+
+        # Saved postings (memory-mapped) and postings added since
+        # term -> (max tf, min row length, offset, length, offset, length, ...)
+        # with one (offset, length) segment in mapped_postings per save
+        self.lexicon: Dict[str, Tuple[int, ...]] = {}
+        self.mapped_postings: Sequence[int] = array('I')
+        self.postings: Dict[str, array] = {}
+        self.term_stats: Dict[str, Tuple[int, int]] = {}  # term -> (max tf, min row length)
+
+        # Files of the saved generation and how much of them is published
+        self.postings_file: Optional[str] = None
+        self.rows_file: Optional[str] = None
+        self._saved_postings = 0
+        self._saved_rows = 0
+        self.segments = 0
+
+        self._live_rows = 0
+        self._live_length = 0
+        self._lock = threading.RLock()
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_rows
+
+    def __len__(self) -> int:
+        return len(self.doc_rows)
+
+    @property
+    def num_rows(self) -> int:
+        """Number of rows, including tombstoned ones."""
+        return len(self.row_docs)
+
+    def _term_postings(self, term: str) -> List[Sequence[int]]:
+        """Posting segments of a term, in row order."""
+        segments = []
+
+        entry = self.lexicon.get(term)
+        if entry is not None:
+            for i in range(2, len(entry), 2):
+                offset, length = entry[i], entry[i + 1]
+                segments.append(self.mapped_postings[offset:offset + length])
+
+        added = self.postings.get(term)
+        if added:
+            segments.append(added)
+
+        return segments
+
+    def _term_bound_stats(self, term: str) -> Tuple[int, int]:
+        """Largest tf and shortest row length over all postings of a term."""
+        max_tf, min_length = 0, _END
+
+        entry = self.lexicon.get(term)
+        if entry is not None:
+            max_tf, min_length = entry[0], entry[1]
+
+        added = self.term_stats.get(term)
+        if added is not None:
+            max_tf, min_length = max(max_tf, added[0]), min(min_length, added[1])
+
+        return max_tf, min_length
+
+    def _document_frequency(self, term: str, segments: List[Sequence[int]]) -> int:
+        """Number of live rows containing a term, given its posting segments."""
+        df = sum(len(plist) for plist in segments) // 2
+        if not self.deleted:
+            return df
+
+        dead = self._deleted_df.get(term)
+        if dead is None:
+            if self._deleted_spans is None:
+                self._deleted_spans = _row_spans(self.deleted)
+            dead = sum(
+                _postings_before(plist, end) - _postings_before(plist, start)
+                for plist in segments
+                for start, end in self._deleted_spans
+            )
+            self._deleted_df[term] = dead
+
+        return df - dead
+
+    def add_document(self, doc_id: str, chunks: List[str]) -> None:
+        """
+        Index (or re-index) the chunks of a document.
+
+        Args:
+            doc_id: Document identifier
+            chunks: Chunk texts in order
+        """
+        with self._lock:
+            self.remove_document(doc_id)
+
+            ordinal = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+
+            start = self.num_rows
+            for chunk_index, chunk in enumerate(chunks):
+                row = self.num_rows
+                terms = tokenize(chunk)
+
+                counts = defaultdict(int)
+                for term in terms:
+                    counts[term] += 1
+
+                for term, tf in counts.items():
+                    plist = self.postings.get(term)
+                    if plist is None:
+                        plist = self.postings[term] = array('I')
+                    plist.append(row)
+                    plist.append(tf)
+
+                    max_tf, min_length = self.term_stats.get(term, (0, _END))
+                    self.term_stats[term] = (max(max_tf, tf), min(min_length, len(terms)))
+
+                self.row_docs.append(ordinal)
+                self.row_chunks.append(chunk_index)
+                self.row_lengths.append(len(terms))
+                self._live_length += len(terms)
+
+            self.doc_rows[doc_id] = (start, self.num_rows)
+            self._live_rows += len(chunks)
+
+    def remove_document(self, doc_id: str) -> None:
+        """
+        Remove a document from search results.
+
+        Args:
+            doc_id: Document identifier
+        """
+        with self._lock:
+            span = self.doc_rows.pop(doc_id, None)
+            if span is None:
+                return
+
+            for row in range(*span):
+                self.deleted.add(row)
+                self._live_rows -= 1
+                self._live_length -= self.row_lengths[row]
+
+            self._deleted_spans = None
+            self._deleted_df = {}
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        doc_id: Optional[str] = None
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Rank chunks against a query with BM25, keeping only the top ``k``.
+
+        Uses MaxScore pruning: terms are ordered by the upper bound of their
+        contribution, and once the heap holds ``k`` results, terms whose
+        bounds together cannot beat the k-th score stop producing
+        candidates; they are only probed (by binary search) for rows the
+        other terms found. The scores returned are the exhaustive ones.
+
+        Args:
+            query: Free-text query
+            k: Number of results to return
+            doc_id: Optional document to restrict the search to
+
+        Returns:
+            List of (doc_id, chunk_index, score), best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._lock:
+            if not terms or k <= 0 or self._live_rows == 0:
+                return []
+
+            start, end = 0, _END
+            if doc_id is not None:
+                span = self.doc_rows.get(doc_id)
+                if span is None:
+                    return []
+                start, end = span
+
+            n = self._live_rows
+            avgdl = self._live_length / n or 1.0
+            k1, b = self.k1, self.b
+
+            cursors = []
+            for term in terms:
+                segments = self._term_postings(term)
+                if not segments:
+                    continue
+
+                # Tombstoned rows must not count, or df can exceed n
+                df = self._document_frequency(term, segments)
+                idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+                max_tf, min_length = self._term_bound_stats(term)
+                bound = idf * max_tf * (k1 + 1.0) / (max_tf + k1 * (1.0 - b + b * min_length / avgdl))
+
+                # Small margin so float rounding never prunes a qualifying row
+                cursor = _PostingCursor(segments, idf, bound * (1.0 + 1e-9))
+                cursor.seek(start)
+                cursors.append(cursor)
+
+            # Weakest terms first; prefix[i] bounds what cursors[:i + 1] can add
+            cursors.sort(key=lambda cursor: cursor.bound)
+            prefix = list(itertools.accumulate(cursor.bound for cursor in cursors))
+
+            heap: List[Tuple[float, int]] = []
+            threshold = 0.0
+            essential = 0  # cursors[essential:] generate candidates
+
+            while essential < len(cursors):
+                row = min(cursor.row for cursor in cursors[essential:])
+                if row >= end:
+                    break
+
+                if row in self.deleted:
+                    for cursor in cursors[essential:]:
+                        if cursor.row == row:
+                            cursor.next()
+                    continue
+
+                norm = k1 * (1.0 - b + b * self.row_lengths[row] / avgdl)
+                score = 0.0
+                for cursor in cursors[essential:]:
+                    if cursor.row == row:
+                        score += cursor.idf * cursor.tf * (k1 + 1.0) / (cursor.tf + norm)
+                        cursor.next()
+
+                for i in range(essential - 1, -1, -1):
+                    if score + prefix[i] <= threshold:
+                        break
+                    cursor = cursors[i]
+                    cursor.seek(row)
+                    if cursor.row == row:
+                        score += cursor.idf * cursor.tf * (k1 + 1.0) / (cursor.tf + norm)
+
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, row))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, row))
+                else:
+                    continue
+
+                if len(heap) == k:
+                    threshold = heap[0][0]
+                    while essential < len(cursors) and prefix[essential] <= threshold:
+                        essential += 1
+
+            return [
+                (self.doc_ids[self.row_docs[row]], self.row_chunks[row], score)
+                for score, row in sorted(heap, key=lambda item: (-item[0], item[1]))
+            ]
+
+    def compact(self) -> None:
+        """
+        Drop tombstoned rows, renumber the remaining ones and merge all
+        postings into memory (``save`` writes them to a new generation).
+        """
+        with self._lock:
+            if not self.deleted and not self.lexicon:
+                return
+
+            remap = {}
+            doc_ids, ordinals = [], {}
+            row_docs, row_chunks, row_lengths = array('I'), array('I'), array('I')
+
+            for row in range(self.num_rows):
+                if row in self.deleted:
+                    continue
+                doc_id = self.doc_ids[self.row_docs[row]]
+                if doc_id not in ordinals:
+                    ordinals[doc_id] = len(doc_ids)
+                    doc_ids.append(doc_id)
+                remap[row] = len(row_docs)
+                row_docs.append(ordinals[doc_id])
+                row_chunks.append(self.row_chunks[row])
+                row_lengths.append(self.row_lengths[row])
+
+            postings = {}
+            term_stats = {}
+            for term in set(self.lexicon) | set(self.postings):
+                new_plist = array('I')
+                max_tf, min_length = 0, _END
+                for plist in self._term_postings(term):
+                    for i in range(0, len(plist), 2):
+                        new_row = remap.get(plist[i])
+                        if new_row is not None:
+                            tf = plist[i + 1]
+                            new_plist.append(new_row)
+                            new_plist.append(tf)
+                            max_tf = max(max_tf, tf)
+                            min_length = min(min_length, row_lengths[new_row])
+                if new_plist:
+                    postings[term] = new_plist
+                    term_stats[term] = (max_tf, min_length)
+
+            doc_rows = {}
+            for new_row, ordinal in enumerate(row_docs):
+                doc_id = doc_ids[ordinal]
+                start, _ = doc_rows.get(doc_id, (new_row, new_row))
+                doc_rows[doc_id] = (start, new_row + 1)
+            for doc_id in self.doc_rows:
+                # Documents without chunks keep an empty span
+                if doc_id not in doc_rows:
+                    doc_rows[doc_id] = (len(row_docs), len(row_docs))
+                    doc_ids.append(doc_id)
+
+            self.doc_ids = doc_ids
+            self.doc_rows = doc_rows
+            self.row_docs = row_docs
+            self.row_chunks = row_chunks
+            self.row_lengths = row_lengths
+            self.lexicon = {}
+            self.mapped_postings = array('I')
+            self.postings = postings
+            self.term_stats = term_stats
+            self.deleted = set()
+            self._deleted_spans = None
+            self._deleted_df = {}
+
+    def _needs_rewrite(self) -> bool:
+        """Whether ``save`` should compact into a new generation instead of appending."""
+        if self.postings_file is None or self.segments >= MAX_SEGMENTS:
+            return True
+        return bool(self.deleted) and len(self.deleted) >= COMPACT_DELETED_RATIO * self.num_rows
+
+    def save(self, filepath: str) -> None:
+        """
+        Write the index to disk.
+
+        Postings added since the last save are appended to the postings
+        file as one new segment and new rows to the rows file, so a save
+        costs what was added, not the size of the index. When tombstones
+        pass ``COMPACT_DELETED_RATIO`` (or after ``MAX_SEGMENTS`` appends)
+        the index is compacted and written to files of a fresh generation
+        instead. The JSON metadata at ``filepath`` is replaced last and says
+        how much of which files is valid, so readers always see a
+        consistent set. The saved postings are then mapped back in place of
+        the in-memory ones.
+
+        Args:
+            filepath: Path to the index metadata file
+        """
+        path = Path(filepath)
+        os.makedirs(path.parent, exist_ok=True)
+        previous = None
+
+        with self._lock:
+            if self._needs_rewrite():
+                self.compact()
+                if self.postings_file is not None:
+                    previous = [self.postings_file, self.rows_file]
+
+                generation = os.urandom(6).hex()
+                self.postings_file = f"{path.stem}.{generation}.postings"
+                self.rows_file = f"{path.stem}.{generation}.rows"
+                self._saved_postings = 0
+                self._saved_rows = 0
+                self.segments = 0
+
+            lexicon = dict(self.lexicon)
+            segment = array('I')
+            for term in sorted(self.postings):
+                plist = self.postings[term]
+                max_tf, min_length = self.term_stats[term]
+                entry = lexicon.get(term)
+                if entry is not None:
+                    max_tf, min_length = max(max_tf, entry[0]), min(min_length, entry[1])
+                    spans = entry[2:]
+                else:
+                    spans = ()
+                lexicon[term] = (max_tf, min_length, *spans, self._saved_postings + len(segment), len(plist))
+                segment.extend(plist)
+            write_uint32(str(path.parent / self.postings_file), segment, self._saved_postings)
+
+            rows = array('I')
+            for row in range(self._saved_rows, self.num_rows):
+                rows.extend((self.row_docs[row], self.row_chunks[row], self.row_lengths[row]))
+            write_uint32(str(path.parent / self.rows_file), rows, 3 * self._saved_rows)
+
+            self._saved_postings += len(segment)
+            self._saved_rows = self.num_rows
+            if segment:
+                self.segments += 1
+
+            data = {
+                'version': INDEX_VERSION,
+                'k1': self.k1,
+                'b': self.b,
+                'doc_ids': self.doc_ids,
+                'docs': {doc_id: list(span) for doc_id, span in self.doc_rows.items()},
+                'deleted': _row_spans(self.deleted),
+                'postings_file': self.postings_file,
+                'postings_length': self._saved_postings,
+                'rows_file': self.rows_file,
+                'num_rows': self._saved_rows,
+                'segments': self.segments,
+                'previous_files': previous or [],
+                'lexicon': lexicon,
+            }
+
+            tmp_path = f"{filepath}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+            os.replace(tmp_path, filepath)
+
+            # Share the page cache copy instead of keeping a private one
+            self.lexicon = lexicon
+            self.mapped_postings = map_uint32(str(path.parent / self.postings_file))
+            self.postings = {}
+            self.term_stats = {}
+
+        if previous is not None:
+            # The generation just replaced stays for processes that read the
+            # old metadata and are about to open it; older ones go
+            keep = {self.postings_file, self.rows_file, *previous}
+            for pattern in (f"{path.stem}.*.postings", f"{path.stem}.*.rows"):
+                for old_file in path.parent.glob(pattern):
+                    if old_file.name not in keep:
+                        old_file.unlink()
+
+    @classmethod
+    def load(cls, filepath: str) -> "BM25Index":
+        """
+        Load an index from disk, or return an empty one if it is missing or stale.
+
+        Postings are memory-mapped rather than read.
+
+        Args:
+            filepath: Path to the index metadata file
+
+        Returns:
+            Loaded index
+        """
+        if not os.path.exists(filepath):
+            return cls()
+
+        for attempt in range(LOAD_ATTEMPTS):
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                if data.get('version') != INDEX_VERSION:
+                    logger.info("Search index format changed; it will be rebuilt")
+                    return cls()
+
+                directory = Path(filepath).parent
+                mapped_postings = map_uint32(str(directory / data['postings_file']))
+                # Only the published part of the files is valid
+                rows = map_uint32(str(directory / data['rows_file']))[:3 * data['num_rows']]
+                if len(mapped_postings) < data['postings_length'] or len(rows) < 3 * data['num_rows']:
+                    raise ValueError("index files are shorter than their metadata")
+                break
+            except FileNotFoundError as e:
+                # Another process saved a newer generation meanwhile; read its metadata
+                if attempt + 1 == LOAD_ATTEMPTS:
+                    logger.warning(f"Ignoring unreadable search index {filepath}: {str(e)}")
+                    return cls()
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable search index {filepath}: {str(e)}")
+                return cls()
+
+        index = cls(k1=data['k1'], b=data['b'])
+        index.doc_ids = data['doc_ids']
+        index.doc_rows = {doc_id: tuple(span) for doc_id, span in data['docs'].items()}
+        index.lexicon = {term: tuple(entry) for term, entry in data['lexicon'].items()}
+        index.mapped_postings = mapped_postings
+        index.postings_file = data['postings_file']
+        index.rows_file = data['rows_file']
+        index._saved_postings = data['postings_length']
+        index._saved_rows = data['num_rows']
+        index.segments = data['segments']
+
+        # Row data is small and appended to, so it is copied into arrays
+        index.row_docs = array('I', rows[0::3])
+        index.row_chunks = array('I', rows[1::3])
+        index.row_lengths = array('I', rows[2::3])
+        index.deleted = {row for start, end in data['deleted'] for row in range(start, end)}
+        index._live_rows = index.num_rows - len(index.deleted)
+        index._live_length = sum(index.row_lengths) - sum(index.row_lengths[row] for row in index.deleted)
+
+        logger.info(f"Loaded search index with {len(index)} documents")
+        return index
@@ -0,0 +1,214 @@
+"""
+Single-Flight Module
+Coalesces identical concurrent calls: while a call for a key is in flight,
+other callers with the same key wait for it and share its result (or
+replay its stream) instead of starting their own.
+"""
+
+import asyncio
+import weakref
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from src.utils import setup_logging
+
+logger = setup_logging(__name__)
+
+T = TypeVar('T')
+
+
+class _Call:
+    """A call in flight in a thread, waited on by the callers that joined it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Stream:
+    """A stream in flight, buffered so every caller can replay it from the start."""
+
+    def __init__(self):
+        self.pieces: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.changed = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Group of calls deduplicated by key.
+
+    ``do`` coalesces callers in threads, ``ado`` callers on an event loop and
+    ``do_stream`` callers consuming an iterator; the paths are tracked
+    separately. Errors are shared like results, and nothing is remembered
+    once a call completes (caching is the caller's job).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Stream] = {}
+        self._lock = threading.Lock()
+        # event loop -> key -> task; tasks belong to one loop
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        """
+        Call ``func``, or wait for the in-flight call with the same key.
+
+        Args:
+            key: Identity of the call
+            func: Callable making the call
+
+        Returns:
+            The result of ``func``, possibly from another thread's call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            logger.debug("Joined in-flight LLM call")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Async variant of ``do``: await ``func()``, or the in-flight call with the same key.
+
+        The call runs as its own task, so a caller that is cancelled does not
+        cancel it for the others.
+
+        Args:
+            key: Identity of the call
+            func: Callable returning the awaitable making the call
+
+        Returns:
+            The result of ``func()``, possibly from another caller's call
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            tasks = self._tasks.get(loop)
+            if tasks is None:
+                tasks = self._tasks[loop] = {}
+
+            task = tasks.get(key)
+            if task is not None:
+                self.shared += 1
+                logger.debug("Joined in-flight LLM call")
+            else:
+                task = tasks[key] = loop.create_task(func())
+                self.calls += 1
+                task.add_done_callback(lambda done: self._forget(tasks, key, done))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, tasks: Dict[str, "asyncio.Task"], key: str, task: "asyncio.Task") -> None:
+        """Drop a finished task so later callers start a new call."""
+        with self._lock:
+            tasks.pop(key, None)
+        if not task.cancelled():
+            # Mark the error retrieved in case every caller was cancelled
+            task.exception()
+
+    def do_stream(self, key: str, func: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """
+        Iterate ``func()``, or replay the in-flight stream with the same key.
+
+        The stream is consumed on its own thread into a buffer that every
+        caller reads from, so a caller that stops early (e.g. a client that
+        disconnects) does not cut the stream short for the others.
+
+        Args:
+            key: Identity of the call
+            func: Callable returning the iterator making the call
+
+        Yields:
+            Pieces of the stream, from the first one, as they arrive
+        """
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is not None:
+                self.shared += 1
+                logger.debug("Joined in-flight LLM stream")
+            else:
+                stream = self._streams[key] = _Stream()
+                self.calls += 1
+                threading.Thread(
+                    target=self._produce, args=(key, stream, func), name="single-flight-stream", daemon=True
+                ).start()
+
+        position = 0
+        while True:
+            with stream.changed:
+                while position >= len(stream.pieces) and not stream.finished:
+                    stream.changed.wait()
+                pieces = stream.pieces[position:]
+                finished = stream.finished
+
+            position += len(pieces)
+            yield from pieces
+
+            if finished:
+                if stream.error is not None:
+                    raise stream.error
+                return
+
+    def _produce(self, key: str, stream: _Stream, func: Callable[[], Iterator[Any]]) -> None:
+        """Consume a stream into its buffer, waking the callers replaying it."""
+        try:
+            for piece in func():
+                with stream.changed:
+                    stream.pieces.append(piece)
+                    stream.changed.notify_all()
+        except BaseException as e:
+            stream.error = e
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with stream.changed:
+                stream.finished = True
+                stream.changed.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with calls made, callers served by another call's
+            result, and calls in flight
+        """
+        with self._lock:
+            in_flight = len(self._calls) + len(self._streams) + sum(len(tasks) for tasks in self._tasks.values())
+            return {
+                'calls': self.calls,
+                'shared': self.shared,
+                'in_flight': in_flight,
+            }
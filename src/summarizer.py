@@ -0,0 +1,128 @@
+"""
+Summarizer Module
+Map-reduce summarization of documents too long for one prompt: parts of
+the document are summarized in parallel, then the partial summaries are
+combined level by level until one summary remains.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+from src.llm_interface import LLMInterface
+from src.context_packer import context_budget
+from src.utils import setup_logging, chunk_text, Config
+
+logger = setup_logging(__name__)
+
+
+class MapReduceSummarizer:
+    """
+    Hierarchical summarizer.
+
+    The text is split into parts of at most ``part_tokens`` tokens on
+    sentence and page boundaries. Each part is summarized (map), then
+    groups of ``fanout`` partial summaries are combined into one (reduce)
+    until at most ``fanout`` remain for the final summary. Parts and levels
+    run in parallel; every call still goes through the provider's rate
+    limiter, and partial summaries are kept in the LLM response cache,
+    keyed by a hash of their input, so summarizing a document again only
+    repeats the final step.
+    """
+
+    def __init__(
+        self,
+        llm: LLMInterface,
+        fanout: int = None,
+        part_tokens: int = None,
+        max_workers: int = None
+    ):
+        """
+        Initialize the summarizer.
+
+        Args:
+            llm: LLM interface making the calls
+            fanout: Partial summaries combined per reduce call (defaults to Config.SUMMARY_FANOUT)
+            part_tokens: Tokens per map part (defaults to Config.SUMMARY_PART_TOKENS)
+            max_workers: Concurrent calls on the threaded path (defaults to Config.SUMMARY_WORKERS)
+        """
+        self.llm = llm
+        self.partial_tokens = Config.SUMMARY_PARTIAL_TOKENS
+
+        # Parts and groups of partial summaries must fit the model's prompt
+        budget = context_budget(llm.model_name, answer_tokens=self.partial_tokens)
+        self.fanout = max(2, min(fanout or Config.SUMMARY_FANOUT, budget // self.partial_tokens))
+        self.part_tokens = max(1, min(part_tokens or Config.SUMMARY_PART_TOKENS, budget))
+        self.max_workers = max(1, max_workers or Config.SUMMARY_WORKERS)
+
+    def split(self, text: str) -> List[str]:
+        """
+        Split text into the parts summarized by the map step.
+
+        Args:
+            text: Document text
+
+        Returns:
+            Non-empty parts, in document order
+        """
+        return [part for part in chunk_text(text, self.part_tokens, 0) if part.strip()]
+
+    def _groups(self, summaries: List[str]) -> List[List[str]]:
+        """Split one level of summaries into groups of ``fanout``."""
+        return [summaries[i:i + self.fanout] for i in range(0, len(summaries), self.fanout)]
+
+    def _reduce(self, text: str, focus: Optional[str]) -> List[str]:
+        """Map and reduce until at most ``fanout`` summaries remain."""
+        parts = self.split(text)
+        logger.info(f"Summarizing {len(parts)} parts (fan-out {self.fanout})")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            summaries = list(pool.map(lambda part: self.llm.summarize_section(part, focus), parts))
+            summaries = [summary for summary in summaries if summary]
+
+            while len(summaries) > self.fanout:
+                summaries = list(pool.map(
+                    lambda group: self.llm.combine_summaries(group, focus, final=False),
+                    self._groups(summaries)
+                ))
+                summaries = [summary for summary in summaries if summary]
+
+        return summaries
+
+    def summarize(self, text: str, focus: str = None) -> str:
+        """
+        Summarize a long text.
+
+        Args:
+            text: Document text
+            focus: Optional focus area (e.g., "methodology", "results")
+
+        Returns:
+            Summary
+        """
+        return self.llm.combine_summaries(self._reduce(text, focus), focus)
+
+    def summarize_stream(self, text: str, focus: str = None) -> Iterator[str]:
+        """Streaming variant of ``summarize``; only the final step is streamed."""
+        return self.llm.combine_summaries_stream(self._reduce(text, focus), focus)
+
+    async def asummarize(self, text: str, focus: str = None) -> str:
+        """
+        Async variant of ``summarize``.
+
+        Calls run concurrently on the event loop, bounded by the provider's
+        concurrency cap instead of a thread pool.
+        """
+        parts = await asyncio.get_running_loop().run_in_executor(None, self.split, text)
+        logger.info(f"Summarizing {len(parts)} parts (fan-out {self.fanout})")
+
+        summaries = await asyncio.gather(*(self.llm.asummarize_section(part, focus) for part in parts))
+        summaries = [summary for summary in summaries if summary]
+
+        while len(summaries) > self.fanout:
+            summaries = await asyncio.gather(*(
+                self.llm.acombine_summaries(group, focus, final=False) for group in self._groups(summaries)
+            ))
+            summaries = [summary for summary in summaries if summary]
+
+        return await self.llm.acombine_summaries(summaries, focus)
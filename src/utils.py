@@ -4,9 +4,12 @@ Provides logging, configuration, and helper functions.
 """
 
 import os
+import re
 import logging
 import json
-from typing import Dict, List, Any, Optional
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -24,17 +27,92 @@ class Config:
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
     
+    # LLM Concurrency (in-flight async requests per provider and event loop)
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    
+    # Provider rate limits (0 = unlimited); "file" shares them across processes
+    OPENAI_RPM = float(os.getenv("OPENAI_RPM", "50"))
+    OPENAI_TPM = float(os.getenv("OPENAI_TPM", "90000"))
+    GEMINI_RPM = float(os.getenv("GEMINI_RPM", "60"))
+    GEMINI_TPM = float(os.getenv("GEMINI_TPM", "1000000"))
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "file")  # file or memory
+    
+    # Retries and circuit breaking for external services
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+    RETRY_AFTER_MAX = float(os.getenv("RETRY_AFTER_MAX", "60"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+    
     # Processing Settings
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2000"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
-    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
-    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "256"))  # tokens
+    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "32"))  # tokens
+    TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+    # Cap on context tokens packed into a prompt (0 = model window only)
+    CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "4000"))
+    # Ranked chunks considered when packing context
+    CONTEXT_CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", "20"))
+    
+    # Map-reduce summarization of documents longer than the context budget
+    SUMMARY_MAP_REDUCE = os.getenv("SUMMARY_MAP_REDUCE", "true").lower() == "true"
+    SUMMARY_FANOUT = int(os.getenv("SUMMARY_FANOUT", "8"))  # partial summaries per reduce call
+    SUMMARY_PART_TOKENS = int(os.getenv("SUMMARY_PART_TOKENS", "3000"))
+    SUMMARY_PARTIAL_TOKENS = int(os.getenv("SUMMARY_PARTIAL_TOKENS", "400"))
+    SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))
+    
+    # Retrieval Settings
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "keyword")  # keyword, vector or hybrid
+    EMBEDDER = os.getenv("EMBEDDER", "hashing")
+    EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+    RRF_K = int(os.getenv("RRF_K", "60"))
+    KEYWORD_WEIGHT = float(os.getenv("KEYWORD_WEIGHT", "1.0"))
+    VECTOR_WEIGHT = float(os.getenv("VECTOR_WEIGHT", "1.0"))
+    KEYWORD_BUDGET_MS = float(os.getenv("KEYWORD_BUDGET_MS", "500"))
+    VECTOR_BUDGET_MS = float(os.getenv("VECTOR_BUDGET_MS", "500"))
+    
+    # LLM Response Cache
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+    # A hit only records its access time (a write) if the last one is older
+    LLM_CACHE_TOUCH_INTERVAL = float(os.getenv("LLM_CACHE_TOUCH_INTERVAL", "3600"))
+    # Calls at or below this temperature are cached (0 = deterministic calls only)
+    LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0"))
+    # Share one upstream call (or stream) between identical calls in flight at once
+    LLM_COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "true").lower() == "true"
+    
+    # Query Result Cache (invalidated whenever the corpus changes)
+    QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1000"))
+    QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+    
+    # Queries classified locally below this confidence fall back to the LLM
+    INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.9"))
+    
+    # Ingestion Settings
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+    INGEST_TIMEOUT = float(os.getenv("INGEST_TIMEOUT", "300"))
+    
+    # Storage Settings
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "binary")  # binary or sqlite
+    DOCUMENT_COMPRESSION = os.getenv("DOCUMENT_COMPRESSION", "true").lower() == "true"
+    DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
     
     # Paths
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / "data"
     PDF_DIR = DATA_DIR / "pdfs"
     PROCESSED_DIR = DATA_DIR / "processed"
+    CACHE_DIR = DATA_DIR / "cache"
+    RATE_LIMIT_DIR = Path(os.getenv("RATE_LIMIT_DIR", str(CACHE_DIR / "ratelimit")))
+    LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(CACHE_DIR / "llm_responses.sqlite3")))
+    SQLITE_PATH = Path(os.getenv("SQLITE_PATH", str(PROCESSED_DIR / "corpus.sqlite3")))
+    INGEST_JOBS_DIR = Path(os.getenv("INGEST_JOBS_DIR", str(CACHE_DIR / "jobs")))
     
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -103,17 +181,136 @@ def sanitize_input(text: str) -> str:
     return sanitized
 
 
-def chunk_text(text: str, chunk_size: int = None, overlap: int = None) -> List[str]:
+@lru_cache(maxsize=None)
+def _get_encoder(encoding_name: str):
+    """Load a tiktoken encoder, or None if tiktoken or its BPE file is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logging.getLogger(__name__).warning(
+            f"tiktoken encoding '{encoding_name}' unavailable ({type(e).__name__}); "
+            "approximating token counts"
+        )
+        return None
+
+
+_APPROX_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
     """
-    Split text into overlapping chunks.
+    Count tokens with the configured tiktoken encoding.
+    
+    Falls back to counting words and punctuation when the encoding cannot
+    be loaded (e.g. offline without a cached BPE file).
+    
+    Args:
+        text: Text to count
+        
+    Returns:
+        Number of tokens
+    """
+    encoder = _get_encoder(Config.TOKENIZER_ENCODING)
+    if encoder is None:
+        return len(_APPROX_TOKEN_PATTERN.findall(text))
+    return len(encoder.encode_ordinary(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text down to at most ``max_tokens`` tokens.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+        
+    Returns:
+        The longest prefix of ``text`` within the limit
+    """
+    if max_tokens <= 0:
+        return ""
+    
+    encoder = _get_encoder(Config.TOKENIZER_ENCODING)
+    if encoder is not None:
+        tokens = encoder.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoder.decode(tokens[:max_tokens])
+    
+    for i, match in enumerate(_APPROX_TOKEN_PATTERN.finditer(text)):
+        if i == max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
+
+PAGE_MARKER_PATTERN = re.compile(r"\n--- Page (\d+) ---\n")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\S+")
+
+
+def _text_units(text: str, start: int, end: int, max_tokens: int) -> List[Tuple[int, int, int, bool]]:
+    """
+    Split a page of text into sentence units no larger than ``max_tokens``.
+    
+    Returns:
+        List of (start, end, tokens, ends_paragraph) with absolute offsets
+    """
+    units = []
+    
+    paragraph_start = start
+    paragraph_ends = [m.start() for m in _PARAGRAPH_BREAK.finditer(text, start, end)] + [end]
+    
+    for paragraph_end in paragraph_ends:
+        sentence_start = paragraph_start
+        sentence_ends = [
+            m.start() for m in _SENTENCE_BREAK.finditer(text, paragraph_start, paragraph_end)
+        ] + [paragraph_end]
+        
+        for i, sentence_end in enumerate(sentence_ends):
+            # Trim surrounding whitespace so offsets point at real text
+            words = list(_WORD.finditer(text, sentence_start, sentence_end))
+            if words:
+                unit_start, unit_end = words[0].start(), words[-1].end()
+                tokens = count_tokens(text[unit_start:unit_end])
+                is_last = i == len(sentence_ends) - 1
+                
+                if tokens <= max_tokens:
+                    units.append((unit_start, unit_end, tokens, is_last))
+                else:
+                    # Oversized sentence: fall back to word boundaries
+                    piece_start, piece_tokens = words[0].start(), 0
+                    for j, word in enumerate(words):
+                        word_tokens = count_tokens(word.group())
+                        if piece_tokens and piece_tokens + word_tokens > max_tokens:
+                            units.append((piece_start, words[j - 1].end(), piece_tokens, False))
+                            piece_start, piece_tokens = word.start(), 0
+                        piece_tokens += word_tokens
+                    units.append((piece_start, unit_end, piece_tokens, is_last))
+            
+            sentence_start = sentence_end
+        
+        paragraph_start = paragraph_end
+    
+    return units
+
+
+def chunk_spans(text: str, chunk_size: int = None, overlap: int = None) -> List[Tuple[int, int, int]]:
+    """
+    Split text into token-bounded chunks that respect document boundaries.
+    
+    Chunks never cross ``--- Page N ---`` markers, end on sentence
+    boundaries (preferring paragraph ends), and overlap by whole sentences
+    up to ``overlap`` tokens.
     
     Args:
         text: Text to chunk
-        chunk_size: Size of each chunk
-        overlap: Overlap between chunks
+        chunk_size: Maximum tokens per chunk
+        overlap: Maximum tokens repeated from the previous chunk
         
     Returns:
-        List of text chunks
+        List of (start, end, page) character offsets into ``text``
     """
     if chunk_size is None:
         chunk_size = Config.CHUNK_SIZE
@@ -123,17 +320,156 @@ def chunk_text(text: str, chunk_size: int = None, overlap: int = None) -> List[s
     if not text:
         return []
     
-    chunks = []
-    start = 0
-    text_length = len(text)
+    # Page content ranges between markers; text before the first marker is page 1
+    pages = []
+    position, page = 0, 1
+    for marker in PAGE_MARKER_PATTERN.finditer(text):
+        pages.append((position, marker.start(), page))
+        position, page = marker.end(), int(marker.group(1))
+    pages.append((position, len(text), page))
     
-    while start < text_length:
-        end = start + chunk_size
-        chunk = text[start:end]
-        chunks.append(chunk)
-        start += chunk_size - overlap
+    spans = []
+    
+    for page_start, page_end, page in pages:
+        units = _text_units(text, page_start, page_end, chunk_size)
+        i = 0
+        
+        while i < len(units):
+            # Greedily take sentences up to the token budget
+            j, tokens = i, 0
+            while j < len(units) and (j == i or tokens + units[j][2] <= chunk_size):
+                tokens += units[j][2]
+                j += 1
+            
+            # Prefer closing on a paragraph end if one falls in the second half
+            if j < len(units):
+                running, best = 0, None
+                for k in range(i, j):
+                    running += units[k][2]
+                    if units[k][3] and running >= chunk_size // 2:
+                        best = k + 1
+                j = best or j
+            
+            spans.append((units[i][0], units[j - 1][1], page))
+            
+            if j >= len(units):
+                break
+            
+            # Start the next chunk with trailing sentences that fit in the overlap
+            # (and still leave room for the sentence that did not fit)
+            next_i, carried = j, 0
+            while next_i - 1 > i:
+                extra = units[next_i - 1][2]
+                if carried + extra > overlap or carried + extra + units[j][2] > chunk_size:
+                    break
+                next_i -= 1
+                carried += extra
+            i = next_i
     
-    return chunks
+    return spans
+
+
+def chunk_text(text: str, chunk_size: int = None, overlap: int = None) -> List[str]:
+    """
+    Split text into overlapping, token-bounded chunks.
+    
+    Args:
+        text: Text to chunk
+        chunk_size: Maximum tokens per chunk
+        overlap: Maximum tokens repeated from the previous chunk
+        
+    Returns:
+        List of text chunks (see ``chunk_spans`` for their offsets)
+    """
+    return [text[start:end] for start, end, _ in chunk_spans(text, chunk_size, overlap)]
+
+
+def pack_chunk_offsets(spans: Any) -> array:
+    """
+    Pack chunk spans into a flat ``array('I')`` of start, end, page triples.
+    
+    Accepts the output of ``chunk_spans``, an already flat sequence (as
+    stored on disk) or an existing array.
+    
+    Args:
+        spans: Chunk spans in any of the above forms
+        
+    Returns:
+        Flat unsigned int array, three entries per chunk
+    """
+    if isinstance(spans, array):
+        return spans
+    
+    spans = list(spans)
+    if spans and isinstance(spans[0], (list, tuple)):
+        return array('I', [value for span in spans for value in span])
+    return array('I', spans)
+
+
+def chunk_count(document: Dict[str, Any]) -> int:
+    """
+    Number of chunks in a processed document.
+    
+    Args:
+        document: Processed document data
+        
+    Returns:
+        Chunk count
+    """
+    if 'chunk_offsets' in document:
+        return len(document['chunk_offsets']) // 3
+    return len(document.get('chunks', []))
+
+
+def get_chunk_span(document: Dict[str, Any], chunk_index: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """
+    Get the (start, end, page) offsets of a chunk.
+    
+    Args:
+        document: Processed document data
+        chunk_index: Chunk position in the document
+        
+    Returns:
+        Offsets into ``full_text``, or Nones for documents stored without offsets
+    """
+    offsets = document.get('chunk_offsets')
+    if offsets is None:
+        return None, None, None
+    
+    base = 3 * chunk_index
+    return offsets[base], offsets[base + 1], offsets[base + 2]
+
+
+def get_chunk(document: Dict[str, Any], chunk_index: int) -> str:
+    """
+    Materialize one chunk of a processed document from its offsets.
+    
+    Args:
+        document: Processed document data
+        chunk_index: Chunk position in the document
+        
+    Returns:
+        Chunk text
+    """
+    if 'chunk_offsets' not in document:
+        # Outputs written before chunks were stored as offsets
+        return document['chunks'][chunk_index]
+    
+    start, end, _ = get_chunk_span(document, chunk_index)
+    return document['full_text'][start:end]
+
+
+def get_chunks(document: Dict[str, Any]) -> List[str]:
+    """
+    Materialize every chunk of a processed document.
+    
+    Args:
+        document: Processed document data
+        
+    Returns:
+        Chunk texts in order
+    """
+    return [get_chunk(document, i) for i in range(chunk_count(document))]
 
 
 def extract_metrics(text: str) -> Dict[str, Any]:
@@ -168,17 +504,26 @@ def extract_metrics(text: str) -> Dict[str, Any]:
     return metrics
 
 
-def save_json(data: Dict, filepath: str) -> None:
+def _json_default(value: Any) -> Any:
+    """Serialize values the json module does not handle natively."""
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def save_json(data: Dict, filepath: str, indent: Optional[int] = 2) -> None:
     """
     Save data as JSON file.
     
     Args:
         data: Dictionary to save
         filepath: Path to save file
+        indent: Indentation level, or None for compact output
     """
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    separators = None if indent is not None else (',', ':')
     with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        json.dump(data, f, indent=indent, separators=separators, ensure_ascii=False, default=_json_default)
 
 
 def load_json(filepath: str) -> Dict:
@@ -207,44 +552,13 @@ def create_directories() -> None:
         directory.mkdir(parents=True, exist_ok=True)
 
 
-class RateLimiter:
-    """Simple rate limiter for API calls."""
-    
-    def __init__(self, calls_per_minute: int = 60):
-        """
-        Initialize rate limiter.
-        
-        Args:
-            calls_per_minute: Maximum calls allowed per minute
-        """
-        import time
-        from collections import deque
-        
-        self.calls_per_minute = calls_per_minute
-        self.calls = deque()
-        self.time = time
-    
-    def wait_if_needed(self) -> None:
-        """Wait if rate limit would be exceeded."""
-        now = self.time.time()
-        
-        # Remove calls older than 1 minute
-        while self.calls and self.calls[0] < now - 60:
-            self.calls.popleft()
-        
-        # Wait if at limit
-        if len(self.calls) >= self.calls_per_minute:
-            sleep_time = 60 - (now - self.calls[0])
-            if sleep_time > 0:
-                self.time.sleep(sleep_time)
-        
-        self.calls.append(now)
-
-
 def retry_with_backoff(max_retries: int = 3, initial_delay: float = 1.0):
     """
     Decorator for retrying functions with exponential backoff.
     
+    Uses ``resilience.RetryPolicy``: only retryable errors are retried,
+    with full jitter and Retry-After hints honored.
+    
     Args:
         max_retries: Maximum number of retries
         initial_delay: Initial delay in seconds
@@ -253,27 +567,15 @@ def retry_with_backoff(max_retries: int = 3, initial_delay: float = 1.0):
         Decorator function
     """
     from functools import wraps
-    import time
+    from src.resilience import RetryPolicy
+    
+    policy = RetryPolicy(max_attempts=max_retries + 1, base_delay=initial_delay)
     
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            delay = initial_delay
-            last_exception = None
-            
-            for attempt in range(max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    if attempt < max_retries:
-                        time.sleep(delay)
-                        delay *= 2  # Exponential backoff
-                    else:
-                        raise last_exception
-            
-            raise last_exception
+            return policy.call(lambda: func(*args, **kwargs), name=func.__name__)
         
         return wrapper
     
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,415 @@
+"""
+Vector Store Module
+Dense chunk retrieval over a contiguous float32 embedding matrix with
+pluggable embedders. Saved matrices are memory-mapped, so processes
+serving the same index share one copy.
+"""
+
+import os
+import json
+import math
+import zlib
+import threading
+from pathlib import Path
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils import setup_logging, Config
+from src.search_index import LOAD_ATTEMPTS, tokenize
+
+logger = setup_logging(__name__)
+
+VECTOR_INDEX_VERSION = 2
+
+
+class BaseEmbedder(ABC):
+    """Abstract base class for text embedders."""
+
+    name: str = ""
+    dim: int = 0
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dim) with L2-normalized rows
+        """
+        pass
+
+
+class HashingEmbedder(BaseEmbedder):
+    """
+    Offline embedder using signed feature hashing of words and word bigrams.
+
+    Needs no model download or network access, and is deterministic across
+    processes (CRC32 rather than Python's salted ``hash``).
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = None):
+        """
+        Initialize the hashing embedder.
+
+        Args:
+            dim: Embedding dimension
+        """
+        self.dim = dim or Config.EMBEDDING_DIM
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into hashed, sublinear-tf, L2-normalized vectors."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        for i, text in enumerate(texts):
+            terms = tokenize(text)
+            features = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+
+            counts: Dict[int, float] = {}
+            for feature in features:
+                h = zlib.crc32(feature.encode('utf-8'))
+                slot = h % self.dim
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                counts[slot] = counts.get(slot, 0.0) + sign
+
+            for slot, value in counts.items():
+                vectors[i, slot] = math.copysign(1.0 + math.log(abs(value)), value) if value else 0.0
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class OpenAIEmbedder(BaseEmbedder):
+    """OpenAI embeddings API implementation."""
+
+    name = "openai"
+
+    def __init__(self, model: str = None, api_key: str = None):
+        """
+        Initialize the OpenAI embedder.
+
+        Args:
+            model: Embedding model name
+            api_key: OpenAI API key
+        """
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError("openai package is required. Install with: pip install openai")
+
+        self.model = model or Config.OPENAI_EMBEDDING_MODEL
+        self.client = OpenAI(api_key=api_key or Config.OPENAI_API_KEY)
+        self.dim = 0  # Known after the first call
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts with the OpenAI embeddings endpoint."""
+        response = self.client.embeddings.create(model=self.model, input=texts)
+        vectors = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        self.dim = vectors.shape[1]
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+EMBEDDERS = {
+    HashingEmbedder.name: HashingEmbedder,
+    OpenAIEmbedder.name: OpenAIEmbedder,
+}
+
+
+def get_embedder(name: str = None) -> BaseEmbedder:
+    """
+    Create an embedder by name.
+
+    Args:
+        name: Embedder name (defaults to Config.EMBEDDER)
+
+    Returns:
+        Embedder instance
+    """
+    name = name or Config.EMBEDDER
+
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unsupported embedder: {name}")
+
+    return EMBEDDERS[name]()
+
+
+class VectorIndex:
+    """
+    Brute-force cosine similarity index over chunk embeddings.
+
+    Embeddings live in one contiguous float32 matrix (grown by doubling), so a
+    query is a single matrix-vector product followed by ``argpartition``.
+    Rows are laid out like ``BM25Index``: contiguous per document, with
+    removed documents masked until the next ``compact``. A loaded matrix is
+    a read-only memory map; adding documents copies it into a private,
+    growable array.
+    """
+
+    def __init__(self, embedder: BaseEmbedder, batch_size: int = None):
+        """
+        Initialize an empty vector index.
+
+        Args:
+            embedder: Embedder used for chunks and queries
+            batch_size: Number of chunks embedded per call
+        """
+        self.embedder = embedder
+        self.batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+
+        self.matrix = np.empty((0, embedder.dim), dtype=np.float32)
+        self.size = 0
+        self.rows: List[Tuple[str, int]] = []
+        self.doc_rows: Dict[str, Tuple[int, int]] = {}
+        self.deleted = np.zeros(0, dtype=bool)
+        self._lock = threading.RLock()
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_rows
+
+    def __len__(self) -> int:
+        return len(self.doc_rows)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches."""
+        batches = [
+            self.embedder.embed(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        return np.vstack(batches) if batches else np.empty((0, self.embedder.dim), dtype=np.float32)
+
+    def _reserve(self, extra: int, dim: int) -> None:
+        """Grow the matrix so ``extra`` more rows fit."""
+        needed = self.size + extra
+
+        if self.matrix.shape[1] != dim:
+            if self.size:
+                raise ValueError(f"Embedding dimension changed from {self.matrix.shape[1]} to {dim}")
+            self.matrix = np.empty((0, dim), dtype=np.float32)
+
+        if needed <= self.matrix.shape[0]:
+            return
+
+        capacity = max(needed, 2 * self.matrix.shape[0], 256)
+        grown = np.empty((capacity, dim), dtype=np.float32)
+        grown[:self.size] = self.matrix[:self.size]
+        self.matrix = grown
+
+        deleted = np.zeros(capacity, dtype=bool)
+        deleted[:self.size] = self.deleted[:self.size]
+        self.deleted = deleted
+
+    def add_document(self, doc_id: str, chunks: List[str]) -> None:
+        """
+        Embed and index (or re-index) the chunks of a document.
+
+        Args:
+            doc_id: Document identifier
+            chunks: Chunk texts in order
+        """
+        # Embedding is the slow part; do it outside the lock
+        vectors = self._embed(chunks)
+
+        with self._lock:
+            self.remove_document(doc_id)
+
+            start = self.size
+            if len(chunks):
+                self._reserve(len(chunks), vectors.shape[1])
+                self.matrix[start:start + len(chunks)] = vectors
+                self.size += len(chunks)
+
+            self.rows.extend((doc_id, i) for i in range(len(chunks)))
+            self.doc_rows[doc_id] = (start, self.size)
+
+    def remove_document(self, doc_id: str) -> None:
+        """
+        Remove a document from search results.
+
+        Args:
+            doc_id: Document identifier
+        """
+        with self._lock:
+            span = self.doc_rows.pop(doc_id, None)
+            if span is not None:
+                self.deleted[span[0]:span[1]] = True
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        doc_id: Optional[str] = None
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Find the chunks most similar to a query.
+
+        Args:
+            query: Free-text query
+            k: Number of results to return
+            doc_id: Optional document to restrict the search to
+
+        Returns:
+            List of (doc_id, chunk_index, cosine similarity), best first
+        """
+        query_vector = self.embedder.embed([query])[0]
+
+        with self._lock:
+            start, end = 0, self.size
+            if doc_id is not None:
+                if doc_id not in self.doc_rows:
+                    return []
+                start, end = self.doc_rows[doc_id]
+
+            if end <= start:
+                return []
+
+            scores = self.matrix[start:end] @ query_vector
+            scores[self.deleted[start:end]] = -np.inf
+
+            k = min(k, end - start)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                (*self.rows[start + i], float(scores[i]))
+                for i in top
+                if np.isfinite(scores[i])
+            ]
+
+    def compact(self) -> None:
+        """Drop masked rows and renumber the remaining ones."""
+        with self._lock:
+            live = ~self.deleted[:self.size]
+            if live.all():
+                return
+
+            self.matrix = np.ascontiguousarray(self.matrix[:self.size][live])
+            self.rows = [row for row, keep in zip(self.rows, live) if keep]
+            self.size = len(self.rows)
+            self.deleted = np.zeros(self.size, dtype=bool)
+
+            doc_rows = {}
+            for new_row, (doc_id, _) in enumerate(self.rows):
+                start, _ = doc_rows.get(doc_id, (new_row, new_row))
+                doc_rows[doc_id] = (start, new_row + 1)
+            for doc_id in self.doc_rows:
+                doc_rows.setdefault(doc_id, (self.size, self.size))
+            self.doc_rows = doc_rows
+
+    def save(self, matrix_path: str, meta_path: str) -> None:
+        """
+        Compact the index and write the matrix and row metadata to disk.
+
+        The matrix is written under a fresh generation name derived from
+        ``matrix_path`` and the metadata, replaced last, points at it, so
+        readers never pair a new matrix with old rows. The matrix it
+        replaced is kept for readers that are about to open it. The saved
+        matrix is then mapped back in place of the private copy.
+
+        Args:
+            matrix_path: Path of the ``.npy`` embedding matrix (the generation
+                is inserted before the suffix)
+            meta_path: Path to the JSON row metadata
+        """
+        matrix_path = Path(matrix_path)
+        os.makedirs(matrix_path.parent, exist_ok=True)
+
+        previous_file = None
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    previous_file = json.load(f).get('matrix_file')
+            except (OSError, ValueError):
+                pass
+
+        with self._lock:
+            self.compact()
+            matrix = self.matrix[:self.size]
+
+            matrix_file = f"{matrix_path.stem}.{os.urandom(6).hex()}{matrix_path.suffix}"
+            np.save(str(matrix_path.parent / matrix_file), matrix)
+
+            meta = {
+                'version': VECTOR_INDEX_VERSION,
+                'embedder': self.embedder.name,
+                'dim': int(matrix.shape[1]),
+                'matrix_file': matrix_file,
+                'docs': {doc_id: list(span) for doc_id, span in self.doc_rows.items()},
+                'rows': self.rows,
+            }
+
+            tmp_path = f"{meta_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, separators=(',', ':'), ensure_ascii=False)
+            os.replace(tmp_path, meta_path)
+
+            self.matrix = np.load(str(matrix_path.parent / matrix_file), mmap_mode='r')
+
+        # Older generations stay valid for processes that still map them
+        for old_file in matrix_path.parent.glob(f"{matrix_path.stem}.*{matrix_path.suffix}"):
+            if old_file.name not in (matrix_file, previous_file):
+                old_file.unlink()
+
+    @classmethod
+    def load(cls, matrix_path: str, meta_path: str, embedder: BaseEmbedder) -> "VectorIndex":
+        """
+        Load a vector index, or return an empty one if it is missing or
+        was built with a different embedder.
+
+        The matrix is memory-mapped read-only rather than read.
+
+        Args:
+            matrix_path: Path of the ``.npy`` embedding matrix as given to ``save``
+            meta_path: Path to the JSON row metadata
+            embedder: Embedder the index must have been built with
+
+        Returns:
+            Loaded index
+        """
+        index = cls(embedder)
+
+        if not os.path.exists(meta_path):
+            return index
+
+        for attempt in range(LOAD_ATTEMPTS):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+
+                stale = (
+                    meta.get('version') != VECTOR_INDEX_VERSION
+                    or meta.get('embedder') != embedder.name
+                    or (embedder.dim and meta.get('dim') != embedder.dim)
+                )
+                if stale:
+                    logger.info("Vector index was built differently; it will be rebuilt")
+                    return index
+
+                matrix = np.load(str(Path(matrix_path).parent / meta['matrix_file']), mmap_mode='r')
+                break
+            except FileNotFoundError as e:
+                # Another process saved a newer generation meanwhile; read its metadata
+                if attempt + 1 == LOAD_ATTEMPTS:
+                    logger.warning(f"Ignoring unreadable vector index: {str(e)}")
+                    return index
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable vector index: {str(e)}")
+                return index
+
+        index.matrix = matrix
+        index.size = matrix.shape[0]
+        index.rows = [tuple(row) for row in meta['rows']]
+        index.doc_rows = {doc_id: tuple(span) for doc_id, span in meta['docs'].items()}
+        index.deleted = np.zeros(index.size, dtype=bool)
+
+        logger.info(f"Loaded vector index with {len(index)} documents")
+        return index
@@ -92,8 +92,8 @@ async function uploadFile(file) {
     const formData = new FormData();
     formData.append('pdf', file);
     
-    showUploadStatus('loading', `⏳ Uploading and processing ${file.name}...`);
-    updateStatus('processing', 'Processing...');
+    showUploadStatus('loading', `⏳ Uploading ${file.name}...`);
+    updateStatus('processing', 'Uploading...');
     
     try {
         const response = await fetch('/upload_pdf', {
@@ -103,15 +103,27 @@ async function uploadFile(file) {
         
         const data = await response.json();
         
-        if (response.ok) {
-            showUploadStatus('success', `✅ ${data.message}`);
+        if (!response.ok) {
+            showUploadStatus('error', `❌ ${data.error}`);
+            updateStatus('ready', 'Upload failed');
+            return;
+        }
+        
+        showUploadStatus('loading', `⏳ Processing ${data.filename}...`);
+        updateStatus('processing', 'Processing...');
+        
+        // Ingestion runs in the background; wait for the job to finish
+        const job = await pollJob(data.status_url);
+        
+        if (job.status === 'completed') {
+            showUploadStatus('success', `✅ ${data.filename} processed successfully`);
             documentReady = true;
             enableChat();
             updateStatus('active', 'Ready');
             showBotMessage(`📄 Document processed successfully! You can now ask questions about: **${data.filename}**`);
         } else {
-            showUploadStatus('error', `❌ ${data.error}`);
-            updateStatus('ready', 'Upload failed');
+            showUploadStatus('error', `❌ Processing failed: ${job.error || 'unknown error'}`);
+            updateStatus(documentReady ? 'active' : 'ready', documentReady ? 'Ready' : 'Processing failed');
         }
     } catch (error) {
         showUploadStatus('error', '❌ Upload failed. Please try again.');
@@ -120,6 +132,24 @@ async function uploadFile(file) {
     }
 }
 
+// Poll an ingestion job until it completes or fails
+async function pollJob(statusUrl, intervalMs = 1000) {
+    while (true) {
+        const response = await fetch(statusUrl);
+        const job = await response.json();
+        
+        if (!response.ok) {
+            return { status: 'failed', error: job.error };
+        }
+        
+        if (job.status === 'completed' || job.status === 'failed') {
+            return job;
+        }
+        
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 // Upload Status Display
 function showUploadStatus(type, message) {
     uploadStatus.className = `upload-status ${type}`;
@@ -173,7 +203,7 @@ async function sendMessage() {
     disableChat();
     
     try {
-        const response = await fetch('/ask', {
+        const response = await fetch('/ask_stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -181,13 +211,35 @@ async function sendMessage() {
             body: JSON.stringify({ question: question })
         });
         
-        const data = await response.json();
+        if (!response.ok || !response.body) {
+            throw new Error(`Request failed with status ${response.status}`);
+        }
         
-        // Remove typing indicator
-        removeTypingIndicator(typingId);
+        // Render the answer incrementally as server-sent events arrive
+        let messageDiv = null;
+        let answer = '';
         
-        // Show bot response
-        showBotMessage(data.answer);
+        await readEventStream(response, (event, data) => {
+            if (event === 'error') {
+                answer += (answer ? '\n\n' : '') + data.error;
+            } else if (event === 'message' && data.delta) {
+                answer += data.delta;
+            } else {
+                return;
+            }
+            
+            if (!messageDiv) {
+                removeTypingIndicator(typingId);
+                messageDiv = showBotMessage(answer);
+            } else {
+                updateBotMessage(messageDiv, answer);
+            }
+        });
+        
+        removeTypingIndicator(typingId);
+        if (!messageDiv) {
+            showBotMessage('❌ No answer was returned. Please try again.');
+        }
         
     } catch (error) {
         removeTypingIndicator(typingId);
@@ -198,6 +250,42 @@ async function sendMessage() {
     }
 }
 
+// Read a text/event-stream response body, calling onEvent(event, data) per event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            const dataLines = [];
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    dataLines.push(line.slice(5).trim());
+                }
+            });
+            
+            if (dataLines.length) {
+                onEvent(event, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
 // Display Messages
 function showUserMessage(text) {
     const messageDiv = document.createElement('div');
@@ -221,6 +309,12 @@ function showBotMessage(text) {
     `;
     chatMessages.appendChild(messageDiv);
     scrollToBottom();
+    return messageDiv;
+}
+
+function updateBotMessage(messageDiv, text) {
+    messageDiv.querySelector('.message-content').innerHTML = formatBotMessage(text);
+    scrollToBottom();
 }
 
 // Typing Indicator
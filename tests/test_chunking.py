@@ -0,0 +1,85 @@
+"""
+Tests for the token-aware chunker: token bounds, offsets, page boundaries
+and overlap.
+"""
+
+import random
+
+import pytest
+
+from src.utils import PAGE_MARKER_PATTERN, chunk_spans, chunk_text, count_tokens
+
+WORDS = "alpha beta gamma delta epsilon model data result".split()
+
+
+def make_text(seed: int) -> str:
+    """Pages of paragraphs of sentences, plus a page that is one long run-on sentence."""
+    rng = random.Random(seed)
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25))) + "."
+
+    pages = []
+    for page in range(1, 5):
+        paragraphs = [
+            " ".join(sentence() for _ in range(rng.randint(1, 5)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        pages.append(f"\n--- Page {page} ---\n" + "\n\n".join(paragraphs))
+    pages.append("\n--- Page 5 ---\n" + " ".join(rng.choice(WORDS) for _ in range(300)))
+
+    return "\n".join(pages)
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(16, 0), (32, 8), (64, 16)])
+def test_chunks_respect_token_bound(chunk_size, overlap):
+    text = make_text(chunk_size)
+
+    for start, end, _ in chunk_spans(text, chunk_size, overlap):
+        assert 0 < count_tokens(text[start:end]) <= chunk_size
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(16, 0), (32, 8), (64, 16)])
+def test_chunk_offsets_stay_on_their_page(chunk_size, overlap):
+    text = make_text(chunk_size)
+    markers = list(PAGE_MARKER_PATTERN.finditer(text))
+    spans = chunk_spans(text, chunk_size, overlap)
+
+    for start, end, page in spans:
+        assert 0 <= start < end <= len(text)
+        assert not PAGE_MARKER_PATTERN.search(text[start:end])
+
+        # The chunk lies after its own page's marker and before the next one
+        marker = markers[page - 1]
+        assert int(marker.group(1)) == page
+        assert marker.end() <= start
+        if page < len(markers):
+            assert end <= markers[page].start()
+
+    assert [start for start, _, _ in spans] == sorted(start for start, _, _ in spans)
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(16, 0), (32, 8), (64, 16)])
+def test_chunks_cover_text_with_bounded_overlap(chunk_size, overlap):
+    text = make_text(chunk_size)
+    spans = chunk_spans(text, chunk_size, overlap)
+
+    covered = [False] * len(text)
+    for start, end, _ in spans:
+        covered[start:end] = [True] * (end - start)
+    for marker in PAGE_MARKER_PATTERN.finditer(text):
+        covered[marker.start():marker.end()] = [True] * (marker.end() - marker.start())
+    assert all(covered[i] or text[i].isspace() for i in range(len(text)))
+
+    for (_, previous_end, previous_page), (start, _, page) in zip(spans, spans[1:]):
+        if page == previous_page and start < previous_end:
+            assert count_tokens(text[start:previous_end]) <= overlap
+        else:
+            assert start >= previous_end
+
+
+def test_chunk_text_matches_spans():
+    text = make_text(0)
+
+    assert chunk_text(text, 32, 8) == [text[start:end] for start, end, _ in chunk_spans(text, 32, 8)]
+    assert chunk_spans("", 32, 8) == []
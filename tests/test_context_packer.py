@@ -0,0 +1,93 @@
+"""
+Tests for context packing: the token budget, passage order, and merging of
+overlapping and consecutive chunks without repeating or inventing text.
+"""
+
+from src.context_packer import pack_context
+from src.utils import chunk_spans, count_tokens
+
+SENTENCES = [f"Sentence {i} talks about topic {i % 7} in some detail." for i in range(60)]
+TEXT = " ".join(SENTENCES)
+
+
+def chunk_results(doc_id: str = "doc", text: str = TEXT, chunk_size: int = 40, overlap: int = 10):
+    """Every chunk of ``text`` as a search result, in document order."""
+    return [
+        {'doc_id': doc_id, 'chunk_index': i, 'content': text[start:end], 'start': start, 'end': end}
+        for i, (start, end, _) in enumerate(chunk_spans(text, chunk_size=chunk_size, overlap=overlap))
+    ]
+
+
+def test_packed_context_stays_within_budget():
+    results = chunk_results()
+    for budget in (5, 30, 100, 250):
+        context = pack_context(results, budget)
+        assert context
+        assert count_tokens(context) <= budget
+
+
+def test_oversized_best_chunk_is_truncated_to_the_budget():
+    result = {'doc_id': "doc", 'chunk_index': 0, 'content': TEXT, 'start': 0, 'end': len(TEXT)}
+
+    context = pack_context([result], 20)
+
+    assert TEXT.startswith(context)
+    assert 0 < count_tokens(context) <= 20
+
+
+def test_passages_are_ordered_by_best_rank():
+    first = chunk_results("first")[3]
+    second = chunk_results("second", text="Another document entirely. " * 10)[0]
+    third = chunk_results("third", text="A third one, ranked last. " * 10)[0]
+
+    passages = pack_context([second, first, third], 1000).split("\n\n")
+
+    assert passages == [second['content'], first['content'], third['content']]
+
+
+def test_overlapping_chunks_are_merged_without_repetition():
+    results = chunk_results()
+    assert results[1]['start'] < results[0]['end']  # the chunks overlap
+
+    context = pack_context([results[1], results[0]], 1000)
+
+    assert context == TEXT[results[0]['start']:results[1]['end']]
+    assert context.count(SENTENCES[0]) == 1
+
+
+def test_consecutive_chunks_are_joined_in_document_order():
+    results = chunk_results(overlap=0)
+    assert results[0]['end'] < results[1]['start']  # only a space between them
+
+    context = pack_context([results[1], results[0]], 1000)
+
+    assert context == results[0]['content'] + "\n" + results[1]['content']
+
+
+def test_chunks_with_text_between_them_stay_separate():
+    results = chunk_results(overlap=0)
+    skipped = TEXT[results[0]['end']:results[2]['start']]
+
+    context = pack_context([results[0], results[2]], 1000)
+
+    assert context == results[0]['content'] + "\n\n" + results[2]['content']
+    assert skipped.strip() not in context
+
+
+def test_short_skipped_chunk_is_not_papered_over():
+    text = "Alpha beta gamma delta. Tiny. Epsilon zeta eta theta."
+    results = chunk_results(text=text, chunk_size=5, overlap=0)
+    assert [r['content'] for r in results] == ["Alpha beta gamma delta.", "Tiny.", "Epsilon zeta eta theta."]
+
+    context = pack_context([results[0], results[2]], 1000)
+
+    assert context.split("\n\n") == [results[0]['content'], results[2]['content']]
+
+
+def test_chunks_without_offsets_are_deduplicated_whole():
+    chunk = {'doc_id': "doc", 'chunk_index': 4, 'content': "Some retrieved text."}
+    other = {'doc_id': "doc", 'chunk_index': 5, 'content': "Other retrieved text."}
+
+    context = pack_context([chunk, dict(chunk), other], 1000)
+
+    assert context == "Some retrieved text.\n\nOther retrieved text."
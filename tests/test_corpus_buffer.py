@@ -0,0 +1,101 @@
+"""
+Tests for the memory-mapped corpus buffer: chunk decoding, persistence and
+compaction of removed documents.
+"""
+
+import json
+
+from src.corpus_buffer import CorpusBuffer
+
+TEXTS = {
+    f"doc{i}": f"Document {i} — naïve café text. " * (i + 1) + "Ünïcode ends it."
+    for i in range(6)
+}
+
+
+def spans_of(text: str, size: int = 20):
+    """Flat (start, end, page) offsets of fixed-size chunks."""
+    offsets = []
+    for start in range(0, len(text), size):
+        offsets.extend((start, min(start + size, len(text)), 1))
+    return offsets
+
+
+def chunks_of(text: str, size: int = 20):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+def assert_buffer_holds(buffer: CorpusBuffer, doc_ids) -> None:
+    assert sorted(buffer.docs) == sorted(doc_ids)
+    for doc_id in doc_ids:
+        for i, chunk in enumerate(chunks_of(TEXTS[doc_id])):
+            content, start, end, page = buffer.get_chunk(doc_id, i)
+            assert content == chunk
+            assert TEXTS[doc_id][start:end] == chunk
+            assert page == 1
+        assert buffer.get_chunk(doc_id, len(chunks_of(TEXTS[doc_id]))) is None
+
+
+def fill(buffer: CorpusBuffer, doc_ids) -> None:
+    for doc_id in doc_ids:
+        buffer.add_document(doc_id, TEXTS[doc_id], spans_of(TEXTS[doc_id]))
+
+
+def test_chunks_decode_before_and_after_reload(tmp_path):
+    buffer = CorpusBuffer(str(tmp_path))
+    fill(buffer, TEXTS)
+    assert_buffer_holds(buffer, TEXTS)
+
+    buffer.save()
+    assert_buffer_holds(buffer, TEXTS)
+    assert_buffer_holds(CorpusBuffer(str(tmp_path)), TEXTS)
+
+
+def test_removed_documents_are_garbage_until_compaction(tmp_path):
+    buffer = CorpusBuffer(str(tmp_path))
+    fill(buffer, TEXTS)
+    buffer.save()
+    text_file = buffer.text_file
+
+    # Under half the rows removed: the text file is kept as is
+    buffer.remove_document("doc0")
+    buffer.save()
+    assert buffer.text_file == text_file
+    assert buffer.garbage_rows > 0
+    assert buffer.get_chunk("doc0", 0) is None
+
+    reloaded = CorpusBuffer(str(tmp_path))
+    assert reloaded.garbage_rows == buffer.garbage_rows
+    assert_buffer_holds(reloaded, [f"doc{i}" for i in range(1, 6)])
+
+
+def test_compaction_rewrites_live_documents(tmp_path):
+    buffer = CorpusBuffer(str(tmp_path))
+    fill(buffer, TEXTS)
+    buffer.save()
+    text_file = buffer.text_file
+    size_before = (tmp_path / text_file).stat().st_size
+
+    for doc_id in ("doc5", "doc4", "doc3"):
+        buffer.remove_document(doc_id)
+    # Re-adding a document also leaves its old rows behind
+    fill(buffer, ["doc1"])
+    buffer.save()
+
+    live = ["doc0", "doc1", "doc2"]
+    assert buffer.text_file != text_file
+    assert buffer.garbage_rows == 0
+    assert buffer.num_rows == sum(len(chunks_of(TEXTS[doc_id])) for doc_id in live)
+    assert (tmp_path / buffer.text_file).stat().st_size < size_before
+    assert_buffer_holds(buffer, live)
+    assert_buffer_holds(CorpusBuffer(str(tmp_path)), live)
+
+    # The replaced generation stays for readers of the old metadata; older ones go
+    meta = json.loads((tmp_path / "corpus.json").read_text())
+    assert text_file in meta['previous_files']
+    fill(buffer, ["doc3"])
+    for doc_id in live:
+        buffer.remove_document(doc_id)
+    buffer.save()
+    assert not (tmp_path / text_file).exists()
+    assert_buffer_holds(CorpusBuffer(str(tmp_path)), ["doc3"])
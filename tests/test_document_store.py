@@ -0,0 +1,115 @@
+"""
+Round-trip tests for the binary and SQLite document stores.
+"""
+
+import json
+
+import pytest
+
+from src.document_store import BinaryDocumentStore, SQLiteDocumentStore
+from src.utils import chunk_spans, get_chunks, pack_chunk_offsets
+
+TEXT = (
+    "\n--- Page 1 ---\nA Study of Things. Abstract: we study attention.\n\n"
+    "\n--- Page 2 ---\nResults are reported on ImageNet. Accuracy is 93.5%. Ünïcode survives too."
+)
+
+
+def make_document(doc_id: str = "paper") -> dict:
+    return {
+        'doc_id': doc_id,
+        'filepath': f"data/pdfs/{doc_id}.pdf",
+        'metadata': {'filename': f"{doc_id}.pdf", 'num_pages': 2, 'title': "A Study of Things"},
+        'full_text': TEXT,
+        'structure': {
+            'title': "A Study of Things",
+            'abstract': "we study attention.",
+            'sections': [{'title': "Results", 'content': "Results are reported", 'position': 70}],
+            'references': [],
+            'authors': ["Jane Doe"],
+        },
+        'tables': [{
+            'page': 2, 'table_num': 1, 'headers': ["model", "acc"], 'rows': [["ours", "93.5"]],
+            'row_count': 1, 'col_count': 2,
+        }],
+        'layout': [{'page': 1, 'bbox': [72.0, 60.1, 300.0, 80.5], 'type': 'text'}],
+        'chunk_offsets': pack_chunk_offsets(chunk_spans(TEXT, 8, 2)),
+        'num_pages': 2,
+        'processed': True,
+    }
+
+
+@pytest.fixture(params=["binary", "binary-uncompressed", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteDocumentStore(str(tmp_path / "corpus.sqlite3"))
+    return BinaryDocumentStore(str(tmp_path), compress=request.param == "binary")
+
+
+def test_round_trip(store):
+    document = make_document()
+    store.save(document)
+
+    loaded = store.load("paper")
+    assert sorted(loaded.keys()) == sorted(document)
+    for key, value in document.items():
+        assert loaded[key] == value, key
+    assert get_chunks(loaded) == get_chunks(document)
+
+
+def test_save_replaces_earlier_version(store):
+    store.save(make_document())
+    document = make_document()
+    document['full_text'] = TEXT.upper()
+    document['tables'] = []
+    store.save(document)
+
+    loaded = store.load("paper")
+    assert loaded['full_text'] == TEXT.upper()
+    assert loaded['tables'] == []
+    assert store.doc_ids() == ["paper"]
+
+
+def test_listing_and_delete(store):
+    store.save(make_document("b"))
+    store.save(make_document("a"))
+
+    assert store.doc_ids() == ["a", "b"]
+    assert store.exists("a")
+
+    assert store.delete("a")
+    assert not store.delete("a")
+    assert not store.exists("a")
+    assert store.load("a") is None
+    assert store.doc_ids() == ["b"]
+
+
+def test_binary_store_reads_legacy_json(tmp_path):
+    document = make_document()
+    document['chunk_offsets'] = list(document['chunk_offsets'])
+    (tmp_path / "paper.json").write_text(json.dumps(document), encoding='utf-8')
+    store = BinaryDocumentStore(str(tmp_path))
+
+    assert store.exists("paper")
+    assert get_chunks(store.load("paper")) == get_chunks(make_document())
+
+    # Saving in the binary format replaces the legacy output
+    store.save(make_document())
+    assert not (tmp_path / "paper.json").exists()
+    assert store.load("paper")['full_text'] == TEXT
+
+
+def test_sqlite_search_finds_chunks(tmp_path):
+    store = SQLiteDocumentStore(str(tmp_path / "corpus.sqlite3"))
+    store.save(make_document())
+
+    hits = store.search("imagenet accuracy", k=3)
+    assert hits
+    doc_id, chunk_index, _ = hits[0]
+    chunk = get_chunks(make_document())[chunk_index]
+    assert doc_id == "paper"
+    assert "ImageNet" in chunk or "Accuracy" in chunk
+    assert store.search("imagenet", k=3, doc_id="other") == []
+
+    store.delete("paper")
+    assert store.search("imagenet", k=3) == []
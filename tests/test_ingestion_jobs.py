@@ -0,0 +1,74 @@
+"""
+Tests for the upload job queue: job status is visible to other processes
+through the shared job records, and old records are trimmed.
+"""
+
+import threading
+
+import pytest
+
+from src.ingestion import IngestionJobQueue
+
+
+def ingest(filepath: str):
+    if "broken" in filepath:
+        raise ValueError("not a PDF")
+    return {'doc_id': filepath.rsplit("/", 1)[-1]}
+
+
+def test_job_status_is_visible_to_another_process(tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    worker = IngestionJobQueue(ingest, jobs_dir=jobs_dir)
+    # Another gunicorn worker: same records directory, no jobs of its own
+    other = IngestionJobQueue(ingest, jobs_dir=jobs_dir)
+
+    done = worker.submit("/uploads/paper.pdf")
+    failed = worker.submit("/uploads/broken.pdf")
+    worker._queue.join()
+
+    assert other.get(done)['status'] == IngestionJobQueue.COMPLETED
+    assert other.get(done)['doc_id'] == "paper.pdf"
+    assert other.get(failed)['status'] == IngestionJobQueue.FAILED
+    assert other.get(failed)['error'] == "not a PDF"
+    assert other.get(done) == worker.get(done)
+
+
+def test_running_job_is_reported_to_another_process(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_ingest(filepath):
+        started.set()
+        release.wait(5)
+        return {'doc_id': "slow"}
+
+    worker = IngestionJobQueue(slow_ingest, jobs_dir=tmp_path)
+    other = IngestionJobQueue(slow_ingest, jobs_dir=tmp_path)
+
+    job_id = worker.submit("/uploads/slow.pdf")
+    assert started.wait(5)
+    assert other.get(job_id)['status'] == IngestionJobQueue.RUNNING
+
+    release.set()
+    worker._queue.join()
+    assert other.get(job_id)['status'] == IngestionJobQueue.COMPLETED
+
+
+@pytest.mark.parametrize("job_id", ["0" * 32, "../../etc/passwd", "a" * 31, ""])
+def test_unknown_or_malformed_job_ids(tmp_path, job_id):
+    assert IngestionJobQueue(ingest, jobs_dir=tmp_path).get(job_id) is None
+
+
+def test_finished_job_records_are_trimmed(tmp_path):
+    worker = IngestionJobQueue(ingest, max_history=2, jobs_dir=tmp_path)
+
+    job_ids = [worker.submit(f"/uploads/paper{i}.pdf") for i in range(5)]
+    worker._queue.join()
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == sorted(job_ids[-2:])
+    assert worker.get(job_ids[0]) is None
+
+    # Records left by processes that exited are trimmed at startup
+    for i in range(3):
+        (tmp_path / f"{i:032x}.json").write_text("{}")
+    IngestionJobQueue(ingest, max_history=2, jobs_dir=tmp_path)
+    assert len(list(tmp_path.glob("*.json"))) == 2
@@ -0,0 +1,110 @@
+"""
+Tests for the LLM response cache: key derivation, TTL expiry, LRU
+eviction under the size bound, and the shared size counter.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.llm_cache import ResponseCache
+
+REQUEST = dict(provider="openai", model="gpt-4o", prompt="Summarize the paper.", temperature=0.0, max_tokens=500)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr("src.llm_cache.time.time", fake)
+    return fake
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def make(**kwargs):
+        kwargs.setdefault('ttl', 0)
+        kwargs.setdefault('max_bytes', 1 << 20)
+        kwargs.setdefault('touch_interval', 0)
+        return ResponseCache(path=str(tmp_path / "llm_responses.sqlite3"), **kwargs)
+    return make
+
+
+@pytest.mark.parametrize("field, value", [
+    ("provider", "gemini"),
+    ("model", "gpt-4o-mini"),
+    ("prompt", "Summarize the paper!"),
+    ("temperature", 0.2),
+    ("max_tokens", 501),
+])
+def test_key_changes_with_every_request_parameter(field, value):
+    assert ResponseCache.make_key(**{**REQUEST, field: value}) != ResponseCache.make_key(**REQUEST)
+
+
+def test_key_is_stable_for_equal_requests():
+    assert ResponseCache.make_key(**REQUEST) == ResponseCache.make_key(**{**REQUEST, 'temperature': 0})
+
+
+def test_entries_expire_after_ttl(make_cache, clock):
+    cache = make_cache(ttl=60)
+    cache.set("key", "response")
+
+    clock.now += 60
+    assert cache.get("key") == "response"
+    clock.now += 1
+    assert cache.get("key") is None
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(make_cache, clock):
+    cache = make_cache(max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.set(key, key * 10)
+        clock.now += 1
+
+    cache.get("a")  # now more recent than b and c
+    clock.now += 1
+    cache.set("d", "d" * 10)
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a" * 10, "c" * 10, "d" * 10]
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 30
+
+
+def test_recency_is_only_updated_after_touch_interval(make_cache, clock):
+    cache = make_cache(max_bytes=20, touch_interval=60)
+    cache.set("a", "a" * 10)
+    clock.now += 1
+    cache.set("b", "b" * 10)
+    clock.now += 1
+
+    cache.get("a")  # too soon after it was stored to count as a use
+    cache.set("c", "c" * 10)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "b" * 10
+
+
+def test_size_counter_tracks_overwrites_and_other_processes(make_cache, tmp_path):
+    cache = make_cache()
+    cache.set("key", "x" * 100)
+    cache.set("key", "x" * 40)
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] == 40
+
+    other = make_cache()
+    other.set("other", "y" * 10)
+    assert cache.stats()['bytes'] == 50
+
+    cache.clear()
+    with sqlite3.connect(str(tmp_path / "llm_responses.sqlite3")) as conn:
+        assert conn.execute("SELECT bytes FROM cache_size").fetchone()[0] == 0
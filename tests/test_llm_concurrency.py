@@ -0,0 +1,105 @@
+"""
+Tests for the per-provider cap on in-flight async LLM requests, which must
+hold across every event loop in the process.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src import llm_interface
+from src.llm_interface import BaseLLM, ProcessSemaphore, provider_semaphore
+from src.utils import Config
+
+LIMIT = 3
+
+
+class SlowLLM(BaseLLM):
+    """Blocking provider stub recording how many calls overlap."""
+
+    provider = "slow-stub"
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, max_tokens=None, temperature=None):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return prompt
+
+    def generate_with_context(self, messages, max_tokens=None):
+        return self.generate(messages[-1]["content"], max_tokens=max_tokens)
+
+
+@pytest.fixture(autouse=True)
+def fresh_semaphores(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_MAX_CONCURRENCY", LIMIT)
+    monkeypatch.setattr(llm_interface, "_provider_semaphores", {})
+
+
+def test_concurrency_is_bounded_across_event_loops():
+    llm = SlowLLM()
+
+    async def burst(loop_id: int):
+        return await asyncio.gather(*(llm.agenerate(f"{loop_id}-{i}") for i in range(6)))
+
+    results = {}
+
+    def run_loop(loop_id: int):
+        results[loop_id] = asyncio.run(burst(loop_id))
+
+    threads = [threading.Thread(target=run_loop, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert llm.calls == 24
+    assert llm.peak == LIMIT
+    assert results[2] == [f"2-{i}" for i in range(6)]
+
+
+def test_semaphore_is_shared_by_every_loop():
+    async def get():
+        return provider_semaphore("slow-stub")
+
+    assert asyncio.run(get()) is asyncio.run(get())
+    assert provider_semaphore("slow-stub") is not provider_semaphore("other-stub")
+
+
+def test_cancelled_waiters_do_not_leak_slots():
+    semaphore = ProcessSemaphore(2)
+
+    async def scenario():
+        await semaphore.acquire()
+        await semaphore.acquire()
+        waiters = [asyncio.ensure_future(semaphore.acquire()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        # Both cancelled before the released slot reaches them
+        waiters[0].cancel()
+        semaphore.release()
+        waiters[1].cancel()
+        await asyncio.sleep(0.01)
+
+        assert waiters[2].done() and not waiters[2].cancelled()
+        semaphore.release()
+        semaphore.release()
+
+        # Both slots are free again
+        await asyncio.wait_for(semaphore.acquire(), 1)
+        await asyncio.wait_for(semaphore.acquire(), 1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(semaphore.acquire(), 0.05)
+
+    asyncio.run(scenario())
@@ -0,0 +1,76 @@
+"""
+Tests for the answer cache: corpus version invalidation, stale writes,
+question normalization, expiry and LRU eviction.
+"""
+
+from src.query_cache import QueryCache
+
+
+def test_hit_for_normalized_question():
+    cache = QueryCache(max_entries=10, ttl=0)
+    cache.set("What is BM25?", None, 1, "A ranking function.")
+
+    assert cache.get("  what is   bm25 ", None, 1) == "A ranking function."
+    assert cache.get("What is BM25?", "doc1", 1) is None
+
+
+def test_version_bump_invalidates_every_entry():
+    cache = QueryCache(max_entries=10, ttl=0)
+    cache.set("first question", None, 1, "first answer")
+    cache.set("second question", "doc1", 1, "second answer")
+
+    assert cache.get("first question", None, 2) is None
+    assert cache.get("second question", "doc1", 2) is None
+    # Going back to the old version does not resurrect the entries
+    assert cache.get("first question", None, 1) is None
+
+    stats = cache.stats()
+    assert stats['entries'] == 0
+    assert stats['invalidations'] == 1
+    assert stats['corpus_version'] == 2
+
+
+def test_stale_write_after_version_change_is_rejected():
+    cache = QueryCache(max_entries=10, ttl=0)
+    cache.set("question", None, 2, "fresh answer")
+
+    # An answer computed before an ingest finishes after it
+    cache.set("question", None, 1, "stale answer")
+    cache.set("other question", None, 1, "stale answer")
+
+    assert cache.get("question", None, 2) == "fresh answer"
+    assert cache.get("other question", None, 2) is None
+
+
+def test_stale_write_after_lookup_at_newer_version_is_rejected():
+    cache = QueryCache(max_entries=10, ttl=0)
+    assert cache.get("question", None, 3) is None
+
+    cache.set("question", None, 2, "stale answer")
+
+    assert cache.get("question", None, 3) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.query_cache.time.time", lambda: now[0])
+    cache = QueryCache(max_entries=10, ttl=60)
+    cache.set("question", None, 1, "answer")
+
+    now[0] += 60
+    assert cache.get("question", None, 1) == "answer"
+    now[0] += 1
+    assert cache.get("question", None, 1) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=2, ttl=0)
+    cache.set("a", None, 1, "answer a")
+    cache.set("b", None, 1, "answer b")
+    cache.get("a", None, 1)
+    cache.set("c", None, 1, "answer c")
+
+    assert cache.get("b", None, 1) is None
+    assert cache.get("a", None, 1) == "answer a"
+    assert cache.get("c", None, 1) == "answer c"
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,172 @@
+"""
+Tests for the token-bucket rate limiter: waits, refunds, buckets shared
+through a state file, and reservations handed back by failed LLM requests.
+"""
+
+import asyncio
+import os
+import threading
+
+import fcntl
+import pytest
+
+from src.llm_interface import BaseLLM
+from src.rate_limiter import RateLimiter
+from src.resilience import RetryPolicy
+
+
+class Clock:
+    """Stands in for ``time.time`` and ``time.sleep`` so waits pass instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr("src.rate_limiter.time.time", fake.time)
+    monkeypatch.setattr("src.rate_limiter.time.sleep", fake.sleep)
+    return fake
+
+
+def levels(limiter: RateLimiter):
+    """Current (requests, tokens) levels, read without changing them."""
+    state = limiter.state.update(lambda state: (state, state))
+    return state[0], state[1]
+
+
+def test_requests_beyond_the_allowance_wait_for_refill(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+
+    for _ in range(60):
+        assert limiter.acquire() == 0
+    assert limiter.acquire() == pytest.approx(1.0)
+
+    clock.now += 10
+    assert limiter.acquire() == 0
+
+
+def test_tokens_are_limited_separately(clock):
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=600)
+
+    assert limiter.acquire(500) == 0
+    assert limiter.acquire(200) == pytest.approx(10.0)
+    # A request larger than the bucket takes the whole bucket instead of never running
+    clock.now += 60
+    assert limiter.acquire(5000) == 0
+    assert limiter.acquire(60) == pytest.approx(6.0)
+
+
+def test_unlimited_buckets_never_wait(clock):
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+    assert all(limiter.acquire(10_000) == 0 for _ in range(1000))
+    assert clock.sleeps == []
+
+
+def test_refund_returns_unused_tokens_up_to_capacity(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+
+    limiter.acquire(800)
+    limiter.refund(300)
+    assert levels(limiter) == (59, 500)
+
+    limiter.refund(5000)
+    assert levels(limiter) == (59, 1000)
+    assert limiter.acquire(1000) == 0
+    assert limiter.acquire(100) > 0
+
+
+def test_file_state_is_shared_between_limiters(clock, tmp_path):
+    path = str(tmp_path / "service.bucket")
+    first = RateLimiter(requests_per_minute=2, state_path=path)
+    second = RateLimiter(requests_per_minute=2, state_path=path)
+
+    assert first.acquire() == 0
+    assert second.acquire() == 0
+    assert first.acquire() == pytest.approx(30.0)
+
+
+def test_acquire_async_does_not_block_the_loop_on_a_held_file_lock(tmp_path):
+    path = str(tmp_path / "service.bucket")
+    limiter = RateLimiter(requests_per_minute=60, state_path=path)
+
+    # Another process holding the state file lock
+    fd = os.open(path, os.O_RDWR)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    release = threading.Timer(0.3, fcntl.flock, (fd, fcntl.LOCK_UN))
+
+    async def scenario():
+        ticks = 0
+        acquire = asyncio.ensure_future(limiter.acquire_async())
+        while not acquire.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return ticks, await acquire
+
+    release.start()
+    try:
+        ticks, waited = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    finally:
+        release.join()
+        os.close(fd)
+
+    assert ticks > 5
+    assert waited == 0
+
+
+class FailingLLM(BaseLLM):
+    """Provider stub whose requests raise after reserving tokens."""
+
+    provider = "failing-stub"
+    retry_policy = RetryPolicy(max_attempts=1)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+        self.rate_limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+
+    def request(self):
+        raise self.error
+
+    async def arequest(self):
+        raise self.error
+
+    def generate(self, prompt, max_tokens=None, temperature=None):
+        self._acquire(prompt, max_tokens)
+        return self._settle(max_tokens, self._request(self.request, max_tokens))
+
+    def generate_with_context(self, messages, max_tokens=None):
+        raise NotImplementedError
+
+    async def agenerate(self, prompt, max_tokens=None, temperature=None):
+        response = await self._arequest(self.arequest, tokens=max_tokens, max_tokens=max_tokens)
+        return self._settle(max_tokens, response)
+
+
+def test_failed_request_returns_its_answer_reservation(clock):
+    llm = FailingLLM(ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        llm.generate("", max_tokens=400)
+    assert levels(llm.rate_limiter)[1] == 1000
+
+    with pytest.raises(ValueError):
+        asyncio.run(llm.agenerate("", max_tokens=400))
+    assert levels(llm.rate_limiter)[1] == 1000
+
+
+def test_cancelled_request_returns_its_answer_reservation(clock):
+    llm = FailingLLM(asyncio.CancelledError())
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(llm.agenerate("", max_tokens=400))
+    assert levels(llm.rate_limiter)[1] == 1000
@@ -0,0 +1,243 @@
+"""
+Tests for the retry policy: error classification, Retry-After and RetryInfo
+hints, and the circuit breaker's closed / open / half-open transitions.
+"""
+
+import asyncio
+from email.utils import formatdate
+import time
+
+import pytest
+
+from src.resilience import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, _parse_duration, is_retryable, retry_after,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = None, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+class RateLimitError(Exception):
+    """Named like the openai SDK error, which is matched by class name."""
+
+
+class DetailsError(Exception):
+    def __init__(self, details):
+        super().__init__("quota exceeded")
+        self.details = details
+
+
+class Clock:
+    """Stands in for ``time.monotonic`` so breaker timeouts pass instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr("src.resilience.time.monotonic", fake)
+    return fake
+
+
+@pytest.mark.parametrize("status, retryable", [
+    (408, True), (429, True), (500, True), (503, True),
+    (400, False), (401, False), (404, False), (422, False),
+])
+def test_http_errors_are_classified_by_status(status, retryable):
+    assert is_retryable(StatusError(status)) is retryable
+
+
+def test_errors_without_status_are_retried_only_for_transient_failures():
+    assert is_retryable(ConnectionResetError())
+    assert is_retryable(TimeoutError())
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(RateLimitError())
+
+    assert not is_retryable(ValueError("bad prompt"))
+    assert not is_retryable(KeyError("model"))
+    assert not is_retryable(CircuitOpenError("open"))
+
+
+def test_parse_duration_formats():
+    assert _parse_duration("30") == 30.0
+    assert _parse_duration("2.5s") == 2.5
+    assert _parse_duration("1500ms") == 1.5
+    assert _parse_duration(None) is None
+    assert _parse_duration("soon") is None
+
+    in_a_minute = _parse_duration(formatdate(time.time() + 60, usegmt=True))
+    assert 55 <= in_a_minute <= 60
+    assert _parse_duration(formatdate(time.time() - 60, usegmt=True)) == 0.0
+
+
+def test_retry_after_headers():
+    assert retry_after(StatusError(429, {"retry-after": "7"})) == 7.0
+    assert retry_after(StatusError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after(StatusError(429, {"retry-after-ms": "250", "retry-after": "7"})) == 0.25
+    assert retry_after(StatusError(503)) is None
+
+
+def test_retry_after_reads_nested_retry_info():
+    details = [
+        {"@type": "type.googleapis.com/google.rpc.QuotaFailure", "violations": []},
+        {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "12s"},
+    ]
+    assert retry_after(DetailsError(details)) == 12.0
+    assert retry_after(DetailsError({"error": {"details": details}})) == 12.0
+    assert retry_after(DetailsError([{"reason": "RATE_LIMIT_EXCEEDED"}])) is None
+
+
+def test_breaker_opens_after_threshold_of_retryable_failures(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=3, reset_timeout=30)
+
+    breaker.record_failure(ValueError("fatal errors say nothing about health"))
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure(StatusError(503))
+    assert breaker.state == "closed"
+
+    breaker.before_call()
+    breaker.record_failure(StatusError(503))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure(StatusError(503))
+    breaker.record_success()
+    breaker.record_failure(StatusError(503))
+
+    assert breaker.state == "closed"
+
+
+def test_half_open_trial_closes_on_success(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure(StatusError(503))
+
+    clock.now += 30
+    assert breaker.state == "half-open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_half_open_trial_reopens_on_failure(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure(StatusError(503))
+
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure(StatusError(503))
+
+    assert breaker.state == "open"
+    clock.now += 29
+    assert breaker.state == "open"
+    clock.now += 1
+    assert breaker.state == "half-open"
+
+
+def test_zero_threshold_disables_breaker():
+    breaker = CircuitBreaker("svc", failure_threshold=0)
+    for _ in range(10):
+        breaker.before_call()
+        breaker.record_failure(StatusError(503))
+
+    assert breaker.state == "closed"
+
+
+def test_call_retries_retryable_errors_and_honors_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("src.resilience.time.sleep", sleeps.append)
+    outcomes = [StatusError(429, {"retry-after": "3"}), ConnectionResetError(), "ok"]
+
+    def func():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01, max_retry_after=10)
+    assert policy.call(func) == "ok"
+    assert sleeps[0] == 3.0 and sleeps[1] <= 0.01
+
+
+def test_call_raises_fatal_errors_and_long_hints_at_once(monkeypatch):
+    monkeypatch.setattr("src.resilience.time.sleep", lambda delay: pytest.fail("should not wait"))
+    policy = RetryPolicy(max_attempts=5, base_delay=0.01, max_delay=0.01, max_retry_after=10)
+    calls = []
+
+    def fatal():
+        calls.append(1)
+        raise StatusError(401)
+
+    def throttled():
+        calls.append(1)
+        raise StatusError(429, {"retry-after": "3600"})
+
+    with pytest.raises(StatusError):
+        policy.call(fatal)
+    with pytest.raises(StatusError):
+        policy.call(throttled)
+    assert len(calls) == 2
+
+
+def test_cancelled_trial_lets_the_next_trial_through(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure(StatusError(503))
+    clock.now += 30
+    policy = RetryPolicy(max_attempts=1)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def ok():
+        return "ok"
+
+    async def scenario():
+        trial = asyncio.ensure_future(policy.acall(hang, breaker))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        return await policy.acall(ok, breaker)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_interrupted_trial_is_not_counted_as_a_failure(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure(StatusError(503))
+    breaker.record_failure(StatusError(503))
+    clock.now += 30
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        RetryPolicy(max_attempts=1).call(interrupted, breaker)
+
+    assert breaker.state == "half-open"
+    breaker.before_call()
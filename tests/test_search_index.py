@@ -0,0 +1,202 @@
+"""
+Tests for the BM25 index: MaxScore search against exhaustive scoring of
+the live documents, through removals, appended saves and compaction.
+"""
+
+import json
+import math
+import random
+from typing import Dict, List
+
+import pytest
+
+from src.search_index import BM25Index, MAX_SEGMENTS, tokenize
+
+VOCABULARY = [f"term{i}" for i in range(200)]
+
+
+def random_chunk(rng: random.Random) -> str:
+    """A chunk drawing on a skewed slice of the vocabulary, so terms differ in frequency."""
+    words = VOCABULARY[:rng.randint(5, len(VOCABULARY))]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(1, 40)))
+
+
+class Corpus:
+    """An index together with the plain chunk texts of the documents it should hold."""
+
+    def __init__(self, index: BM25Index = None, documents: Dict[str, List[str]] = None):
+        self.index = index if index is not None else BM25Index()
+        self.documents = dict(documents or {})
+
+    def add(self, doc_id: str, chunks: List[str]) -> None:
+        self.index.add_document(doc_id, chunks)
+        self.documents.pop(doc_id, None)
+        self.documents[doc_id] = chunks
+
+    def remove(self, doc_id: str) -> None:
+        self.index.remove_document(doc_id)
+        self.documents.pop(doc_id, None)
+
+    def reload(self, path: str) -> "Corpus":
+        return Corpus(BM25Index.load(path), self.documents)
+
+
+def exhaustive_scores(documents: Dict[str, List[str]], query: str, k: int, doc_id: str = None,
+                      k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Textbook BM25 over every chunk of the given documents, computed from the texts alone."""
+    rows = [(row_doc_id, tokenize(chunk)) for row_doc_id, chunks in documents.items() for chunk in chunks]
+    if not rows:
+        return []
+
+    n = len(rows)
+    avgdl = sum(len(terms) for _, terms in rows) / n or 1.0
+    query_terms = list(dict.fromkeys(tokenize(query)))
+    df = {term: sum(1 for _, terms in rows if term in terms) for term in query_terms}
+
+    scores = []
+    for row_doc_id, terms in rows:
+        if doc_id is not None and row_doc_id != doc_id:
+            continue
+        matched = [term for term in query_terms if term in terms]
+        if not matched:
+            continue
+        norm = k1 * (1.0 - b + b * len(terms) / avgdl)
+        score = 0.0
+        for term in matched:
+            tf = terms.count(term)
+            idf = math.log(1.0 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf * (k1 + 1.0) / (tf + norm)
+        scores.append(score)
+
+    return sorted(scores, reverse=True)[:k]
+
+
+def assert_matches_exhaustive(corpus: Corpus, rng: random.Random, doc_ids, trials: int = 100) -> None:
+    for _ in range(trials):
+        query = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 6)))
+        k = rng.choice([1, 3, 10, 50])
+        doc_id = rng.choice([None, *doc_ids])
+
+        got = [score for _, _, score in corpus.index.search(query, k=k, doc_id=doc_id)]
+        expected = exhaustive_scores(corpus.documents, query, k, doc_id)
+
+        assert got == pytest.approx(expected, rel=1e-9), (query, k, doc_id)
+        assert all(score > 0 for score in got)
+
+
+def build_corpus(rng: random.Random, documents: int, prefix: str = "doc") -> Corpus:
+    corpus = Corpus()
+    for i in range(documents):
+        corpus.add(f"{prefix}{i}", [random_chunk(rng) for _ in range(rng.randint(0, 12))])
+    return corpus
+
+
+def test_search_matches_exhaustive_scoring():
+    rng = random.Random(1)
+    corpus = build_corpus(rng, 40)
+
+    assert_matches_exhaustive(corpus, rng, ["doc3", "doc17"])
+
+
+def test_search_matches_exhaustive_scoring_after_removal():
+    rng = random.Random(2)
+    corpus = build_corpus(rng, 40)
+    for i in range(0, 40, 3):
+        corpus.remove(f"doc{i}")
+
+    assert_matches_exhaustive(corpus, rng, ["doc3", "doc4"])
+    assert all(hit[0] != "doc3" for hit in corpus.index.search("term1 term2 term3", k=100))
+
+
+def test_search_matches_exhaustive_scoring_after_readding():
+    rng = random.Random(6)
+    corpus = build_corpus(rng, 20)
+    for i in range(0, 20, 2):
+        corpus.add(f"doc{i}", [random_chunk(rng) for _ in range(rng.randint(1, 5))])
+
+    assert_matches_exhaustive(corpus, rng, ["doc2", "doc3"])
+
+
+def test_search_matches_exhaustive_scoring_after_save_and_load(tmp_path):
+    rng = random.Random(3)
+    path = str(tmp_path / "bm25_index.json")
+    corpus = build_corpus(rng, 30, prefix="a")
+    corpus.index.save(path)
+
+    # Later saves append segments to the same files; tombstones persist
+    for batch in range(3):
+        corpus = corpus.reload(path)
+        for i in range(10):
+            corpus.add(f"b{batch}_{i}", [random_chunk(rng) for _ in range(rng.randint(1, 8))])
+        corpus.remove(f"a{batch}")
+        assert_matches_exhaustive(corpus, rng, ["a5"], trials=20)
+        corpus.index.save(path)
+
+    meta = json.loads((tmp_path / "bm25_index.json").read_text())
+    assert meta['segments'] == 4
+    assert len(list(tmp_path.glob("*.postings"))) == 1
+
+    loaded = corpus.reload(path)
+    assert loaded.index._live_rows == corpus.index._live_rows
+    assert loaded.index.search("term0 term1", k=500, doc_id="a0") == []
+    assert_matches_exhaustive(loaded, rng, ["a5", "b1_3"])
+
+    query = "term4 term9 term20"
+    assert loaded.index.search(query, k=20) == corpus.index.search(query, k=20)
+
+
+def test_save_compacts_once_tombstones_pass_threshold(tmp_path):
+    rng = random.Random(4)
+    path = str(tmp_path / "bm25_index.json")
+    corpus = build_corpus(rng, 20)
+    corpus.index.save(path)
+    first_generation = corpus.index.postings_file
+
+    for i in range(15):
+        corpus.remove(f"doc{i}")
+    corpus.index.save(path)
+
+    assert corpus.index.postings_file != first_generation
+    assert not corpus.index.deleted
+
+    loaded = corpus.reload(path)
+    assert sorted(loaded.index.doc_rows) == [f"doc{i}" for i in range(15, 20)]
+    assert_matches_exhaustive(loaded, rng, ["doc16"])
+
+
+def test_save_compacts_after_max_segments(tmp_path):
+    rng = random.Random(5)
+    path = str(tmp_path / "bm25_index.json")
+    corpus = build_corpus(rng, 2)
+    corpus.index.save(path)
+
+    for i in range(MAX_SEGMENTS):
+        corpus.add(f"extra{i}", [random_chunk(rng)])
+        corpus.index.save(path)
+
+    assert corpus.index.segments < MAX_SEGMENTS
+    assert_matches_exhaustive(corpus.reload(path), rng, ["extra3"])
+
+
+def test_removal_scores_like_an_index_without_the_document(tmp_path):
+    chunks = {
+        "a": ["results on imagenet", "training details", "imagenet accuracy table"],
+        "b": ["graph networks", "imagenet pretraining", "ablation study"],
+        "c": ["imagenet imagenet baseline", "more imagenet numbers", "imagenet again"],
+    }
+    index = BM25Index()
+    for doc_id, doc_chunks in chunks.items():
+        index.add_document(doc_id, doc_chunks)
+    index.remove_document("c")
+
+    expected = BM25Index()
+    for doc_id in ("a", "b"):
+        expected.add_document(doc_id, chunks[doc_id])
+
+    hits = index.search("imagenet", k=10)
+    assert hits == pytest.approx(expected.search("imagenet", k=10))
+    assert all(score > 0 for _, _, score in hits)
+
+    path = str(tmp_path / "bm25_index.json")
+    index.save(path)
+    assert BM25Index.load(path).search("imagenet", k=10) == pytest.approx(hits)
@@ -0,0 +1,178 @@
+"""
+Tests for call coalescing: identical concurrent calls run once, share
+results and errors with every waiter, and leave nothing behind.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_threads(target, count: int = CALLERS):
+    """Run ``target`` on ``count`` threads; returns each thread's result or exception."""
+    outcomes = [None] * count
+
+    def run(i):
+        try:
+            outcomes[i] = target()
+        except BaseException as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_concurrent_identical_calls_run_once():
+    group = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def func():
+        runs.append(1)
+        release.wait(5)
+        return "answer"
+
+    threads, outcomes = run_threads(lambda: group.do("key", func))
+    wait_for(lambda: group.stats()['shared'] == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert runs == [1]
+    assert outcomes == ["answer"] * CALLERS
+    assert group.stats() == {'calls': 1, 'shared': CALLERS - 1, 'in_flight': 0}
+
+
+def test_error_reaches_every_waiter_and_key_is_cleared():
+    group = SingleFlight()
+    release = threading.Event()
+    error = RuntimeError("provider down")
+
+    def failing():
+        release.wait(5)
+        raise error
+
+    threads, outcomes = run_threads(lambda: group.do("key", failing))
+    wait_for(lambda: group.stats()['shared'] == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(outcome is error for outcome in outcomes)
+    assert group.stats()['in_flight'] == 0
+    # The failure is not remembered: the next call runs again
+    assert group.do("key", lambda: "recovered") == "recovered"
+    assert group.stats()['calls'] == 2
+
+
+def test_different_keys_are_not_coalesced():
+    group = SingleFlight()
+
+    assert group.do("a", lambda: 1) == 1
+    assert group.do("b", lambda: 2) == 2
+    assert group.stats() == {'calls': 2, 'shared': 0, 'in_flight': 0}
+
+
+def test_async_calls_run_once_and_share_errors():
+    group = SingleFlight()
+    runs = []
+
+    async def func():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad request")
+
+    async def scenario():
+        results = await asyncio.gather(*(group.ado("key", func) for _ in range(CALLERS)))
+        errors = await asyncio.gather(*(group.ado("bad", failing) for _ in range(CALLERS)),
+                                      return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(scenario())
+
+    assert runs == [1]
+    assert results == ["answer"] * CALLERS
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert group.stats() == {'calls': 2, 'shared': 2 * (CALLERS - 1), 'in_flight': 0}
+
+
+def test_cancelled_async_caller_does_not_cancel_the_call():
+    group = SingleFlight()
+
+    async def func():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def scenario():
+        first = asyncio.ensure_future(group.ado("key", func))
+        second = asyncio.ensure_future(group.ado("key", func))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "answer"
+    assert group.stats()['in_flight'] == 0
+
+
+def test_stream_is_replayed_from_the_start_for_late_joiners():
+    group = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def stream():
+        runs.append(1)
+        yield "first "
+        release.wait(5)
+        yield "second"
+
+    leader = group.do_stream("key", stream)
+    assert next(leader) == "first "
+    late = group.do_stream("key", stream)
+    assert next(late) == "first "
+    release.set()
+
+    assert "".join(leader) == "second"
+    assert "".join(late) == "second"
+    assert runs == [1]
+    wait_for(lambda: group.stats()['in_flight'] == 0)
+
+
+def test_stream_error_reaches_every_reader():
+    group = SingleFlight()
+    release = threading.Event()
+
+    def stream():
+        yield "partial"
+        release.wait(5)
+        raise RuntimeError("stream broke")
+
+    readers = [group.do_stream("key", stream) for _ in range(3)]
+    assert [next(reader) for reader in readers] == ["partial"] * 3
+    release.set()
+
+    for reader in readers:
+        with pytest.raises(RuntimeError, match="stream broke"):
+            list(reader)
+    wait_for(lambda: group.stats()['in_flight'] == 0)
+    assert group.stats() == {'calls': 1, 'shared': 2, 'in_flight': 0}
@@ -0,0 +1,140 @@
+"""
+Tests for map-reduce summarization with a stub LLM: how a document fans out
+into parts and how partial summaries are reduced level by level.
+"""
+
+import asyncio
+import re
+import threading
+
+from src.summarizer import MapReduceSummarizer
+
+FACTS = 40
+TEXT = " ".join(f"Fact {i} is recorded here." for i in range(FACTS))
+
+
+class StubLLM:
+    """
+    Summaries list the fact numbers they cover, and combining wraps the
+    group in parentheses, so the result shows the whole reduce tree.
+    """
+
+    model_name = "stub-model"
+
+    def __init__(self):
+        self.sections = []
+        self.combines = []
+        self._lock = threading.Lock()
+
+    def summarize_section(self, text, focus=None):
+        with self._lock:
+            self.sections.append((text, focus))
+        return " ".join(re.findall(r"Fact (\d+)", text))
+
+    def combine_summaries(self, summaries, focus=None, final=True):
+        with self._lock:
+            self.combines.append((list(summaries), focus, final))
+        return "(" + " ".join(summaries) + ")"
+
+    def combine_summaries_stream(self, summaries, focus=None):
+        yield self.combine_summaries(summaries, focus)
+
+    async def asummarize_section(self, text, focus=None):
+        await asyncio.sleep(0)
+        return self.summarize_section(text, focus)
+
+    async def acombine_summaries(self, summaries, focus=None, final=True):
+        await asyncio.sleep(0)
+        return self.combine_summaries(summaries, focus, final)
+
+
+def covered_facts(summary: str):
+    return [int(number) for number in re.findall(r"\d+", summary)]
+
+
+def depth(summary: str) -> int:
+    deepest = level = 0
+    for char in summary:
+        level += {"(": 1, ")": -1}.get(char, 0)
+        deepest = max(deepest, level)
+    return deepest
+
+
+def test_document_fans_out_into_parts_in_order():
+    llm = StubLLM()
+    summarizer = MapReduceSummarizer(llm, fanout=3, part_tokens=14)
+    parts = summarizer.split(TEXT)
+
+    summarizer.summarize(TEXT)
+
+    assert len(parts) > 9  # enough parts for more than one reduce level
+    assert sorted(text for text, _ in llm.sections) == sorted(parts)
+    assert covered_facts(" ".join(parts)) == list(range(FACTS))
+
+
+def test_partial_summaries_are_reduced_in_groups_of_fanout():
+    llm = StubLLM()
+    summarizer = MapReduceSummarizer(llm, fanout=3, part_tokens=14)
+    parts = len(summarizer.split(TEXT))
+
+    summary = summarizer.summarize(TEXT)
+
+    *intermediate, final = llm.combines
+    assert all(not is_final and 1 <= len(group) <= 3 for group, _, is_final in intermediate)
+    assert final[2] is True and 1 <= len(final[0]) <= 3
+
+    # Every level shrinks by the fan-out until the final call
+    levels, remaining = [], parts
+    while remaining > 3:
+        remaining = -(-remaining // 3)
+        levels.append(remaining)
+    assert len(intermediate) == sum(levels)
+    assert depth(summary) == len(levels) + 1
+
+    # Nothing is lost or reordered on the way up
+    assert covered_facts(summary) == list(range(FACTS))
+
+
+def test_short_document_needs_only_the_final_combine():
+    llm = StubLLM()
+    summarizer = MapReduceSummarizer(llm, fanout=8, part_tokens=100)
+
+    summary = summarizer.summarize(TEXT)
+
+    assert len(llm.sections) <= 8
+    assert len(llm.combines) == 1 and llm.combines[0][2] is True
+    assert covered_facts(summary) == list(range(FACTS))
+
+
+def test_focus_is_passed_to_every_call():
+    llm = StubLLM()
+    MapReduceSummarizer(llm, fanout=3, part_tokens=14).summarize(TEXT, focus="results")
+
+    assert {focus for _, focus in llm.sections} == {"results"}
+    assert {focus for _, focus, _ in llm.combines} == {"results"}
+
+
+def test_empty_partial_summaries_are_dropped():
+    llm = StubLLM()
+    text = TEXT + " " + " ".join("Nothing to see." for _ in range(20))
+
+    summary = MapReduceSummarizer(llm, fanout=3, part_tokens=14).summarize(text)
+
+    assert all(group and all(group) for group, _, _ in llm.combines)
+    assert covered_facts(summary) == list(range(FACTS))
+
+
+def test_async_and_stream_match_threaded_summary():
+    summary = MapReduceSummarizer(StubLLM(), fanout=3, part_tokens=14, max_workers=4).summarize(TEXT)
+
+    async_llm = StubLLM()
+    async_summary = asyncio.run(MapReduceSummarizer(async_llm, fanout=3, part_tokens=14).asummarize(TEXT))
+    streamed = "".join(MapReduceSummarizer(StubLLM(), fanout=3, part_tokens=14).summarize_stream(TEXT))
+
+    assert async_summary == summary
+    assert streamed == summary
+
+
+def test_fanout_is_at_least_two():
+    # Combining one summary at a time would never shrink a level
+    assert MapReduceSummarizer(StubLLM(), fanout=1).fanout == 2